@@ -297,7 +297,7 @@ class StrategyDownloaderApp(ctk.CTk):
             "resolucaoEscolhida",
             1,
             widget_type="combo",
-            options=["720p", "480p", "360p"],
+            options=["720p", "480p", "360p", "auto"],
             config_path=("videoConfig",)
         )
         
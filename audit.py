@@ -0,0 +1,303 @@
+"""
+Auditoria de Integridade da Biblioteca
+Recalcula o SHA-256 e valida a estrutura de cada PDF/MP4 registrado no progresso,
+em paralelo (um processo por núcleo), de forma incremental e retomável
+
+Uso:
+    python audit.py              # Audita arquivos novos ou alterados desde a última auditoria
+    python audit.py --completo   # Audita tudo de novo
+    python audit.py --aplicar    # Marca os itens com problema para serem baixados de novo
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from config_manager import ProgressManager
+from progress_store import AUDIT_OK, AUDIT_MISSING, AUDIT_CORRUPT, AUDIT_MISMATCH
+from reconcile import check_structure
+from utils import file_sha256, format_bytes, setup_logger
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 4 * 1024 * 1024  # Leituras grandes e sequenciais, memória constante
+PENDING_PER_WORKER = 4             # Tarefas enfileiradas por processo
+REPORT_FILE = "audit_report.json"
+REPORT_LIMIT = 20                  # Problemas listados por categoria no log
+
+RESULT_LABELS = {
+    AUDIT_OK: "✅ Íntegros",
+    AUDIT_MISSING: "❓ Ausentes",
+    AUDIT_CORRUPT: "💥 Corrompidos",
+    AUDIT_MISMATCH: "⚠️  Divergentes (tamanho/hash)"
+}
+
+
+def audit_file(
+    path: str,
+    expected_size: Optional[int],
+    expected_sha256: Optional[str]
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Audita um arquivo (executado nos processos do pool).
+    
+    Args:
+        path: Caminho do arquivo
+        expected_size: Tamanho registrado no download
+        expected_sha256: Hash registrado no download (None se não calculado)
+    
+    Returns:
+        Tupla (resultado, detalhe, sha256 calculado)
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return AUDIT_MISSING, "arquivo não encontrado", None
+    
+    if expected_size is not None and size != expected_size:
+        return AUDIT_MISMATCH, f"tamanho {size} bytes, registrado {expected_size}", None
+    
+    problem = check_structure(path)
+    if problem:
+        return AUDIT_CORRUPT, problem, None
+    
+    try:
+        digest = file_sha256(Path(path), HASH_CHUNK_SIZE)
+    except OSError as e:
+        return AUDIT_CORRUPT, f"erro de leitura: {e}", None
+    
+    if expected_sha256 and digest != expected_sha256:
+        return AUDIT_MISMATCH, "SHA-256 diferente do registrado", digest
+    
+    return AUDIT_OK, None, digest
+
+
+class LibraryAuditor:
+    """Audita os arquivos concluídos do progresso"""
+    
+    def __init__(self, progress: ProgressManager, processes: int):
+        """
+        Inicializa o auditor.
+        
+        Args:
+            progress: Gerenciador de progresso
+            processes: Número de processos de verificação
+        """
+        self.progress = progress
+        self.processes = max(1, processes)
+        
+        self.issues: List[dict] = []
+        self.counts: Dict[str, int] = {result: 0 for result in RESULT_LABELS}
+        self.checked = 0
+        self.skipped = 0
+        self.bytes_read = 0
+    
+    def run(self, full: bool = False) -> None:
+        """
+        Executa a auditoria.
+        
+        Só arquivos novos ou alterados (tamanho/data) desde a última auditoria são
+        relidos; os demais reaproveitam o resultado gravado. Cada resultado é gravado
+        assim que sai do pool, então uma auditoria interrompida continua de onde parou.
+        
+        Args:
+            full: Relê todos os arquivos, ignorando auditorias anteriores
+        """
+        started = time.monotonic()
+        previous = {} if full else self.progress.store.audit_records()
+        
+        pending_items = []
+        for row in self.progress.store.completed_files():
+            try:
+                stat = os.stat(row["path"])
+            except OSError:
+                self._record(row, None, None, AUDIT_MISSING, "arquivo não encontrado", None)
+                continue
+            
+            audit = previous.get(row["key"])
+            if (audit is not None and audit["path"] == row["path"]
+                    and audit["size"] == stat.st_size and audit["mtime"] == stat.st_mtime):
+                self.skipped += 1
+                self._count(row, audit["result"], audit["detail"])
+                continue
+            
+            pending_items.append((row, stat.st_size, stat.st_mtime))
+        
+        total_bytes = sum(size for _, size, _ in pending_items)
+        logger.info(
+            f"🔍 {len(pending_items)} arquivo(s) para auditar ({format_bytes(total_bytes)}), "
+            f"{self.skipped} sem alteração desde a última auditoria"
+        )
+        
+        self._run_pool(pending_items, total_bytes)
+        
+        self.progress.flush()
+        logger.info(f"⏱️  Auditoria concluída em {time.monotonic() - started:.1f}s")
+    
+    def _run_pool(self, items: List[tuple], total_bytes: int) -> None:
+        """Distribui os arquivos no pool mantendo poucas tarefas em memória"""
+        if not items:
+            return
+        
+        limit = self.processes * PENDING_PER_WORKER
+        queue = iter(items)
+        running = {}
+        last_log = time.monotonic()
+        
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            try:
+                while True:
+                    while len(running) < limit:
+                        item = next(queue, None)
+                        if item is None:
+                            break
+                        row = item[0]
+                        future = pool.submit(audit_file, row["path"], row["size"], row["sha256"])
+                        running[future] = item
+                    
+                    if not running:
+                        break
+                    
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        row, size, mtime = running.pop(future)
+                        result, detail, digest = future.result()
+                        self.checked += 1
+                        self.bytes_read += size
+                        self._record(row, size, mtime, result, detail, digest)
+                    
+                    if time.monotonic() - last_log >= 10:
+                        last_log = time.monotonic()
+                        percent = self.bytes_read / total_bytes * 100 if total_bytes else 100
+                        logger.info(
+                            f"   {self.checked}/{len(items)} arquivo(s), "
+                            f"{format_bytes(self.bytes_read)} ({percent:.0f}%)"
+                        )
+            except KeyboardInterrupt:
+                logger.warning("⚠ Auditoria interrompida, resultados parciais gravados")
+                for future in running:
+                    future.cancel()
+                raise
+    
+    def _record(
+        self,
+        row,
+        size: Optional[int],
+        mtime: Optional[float],
+        result: str,
+        detail: Optional[str],
+        digest: Optional[str]
+    ) -> None:
+        """Grava o resultado de um arquivo e o contabiliza"""
+        self.progress.record_audit(row["key"], row["path"], size, mtime, digest, result, detail)
+        self._count(row, result, detail)
+    
+    def _count(self, row, result: str, detail: Optional[str]) -> None:
+        """Contabiliza um resultado e guarda os problemas para o relatório"""
+        self.counts[result] = self.counts.get(result, 0) + 1
+        if result != AUDIT_OK:
+            self.issues.append({
+                "key": row["key"],
+                "course_id": row["course_id"],
+                "path": row["path"],
+                "result": result,
+                "detail": detail
+            })
+    
+    def queue_redownload(self) -> int:
+        """
+        Desfaz a conclusão dos itens com problema (baixados de novo na próxima execução).
+        
+        Returns:
+            Quantidade de itens marcados
+        """
+        for issue in self.issues:
+            self.progress.invalidate(issue["key"], f"auditoria: {issue['detail'] or issue['result']}")
+        self.progress.flush()
+        return len(self.issues)
+    
+    def save_report(self, report_path: Path) -> None:
+        """
+        Grava o relatório em JSON (lista de itens para baixar de novo).
+        
+        Args:
+            report_path: Arquivo de saída
+        """
+        report = {
+            "generated_at": int(time.time()),
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "counts": self.counts,
+            "issues": self.issues
+        }
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    def log_report(self) -> None:
+        """Loga o resumo e exemplos de cada problema"""
+        logger.info("=" * 70)
+        logger.info("📊 AUDITORIA DE INTEGRIDADE")
+        logger.info("=" * 70)
+        logger.info(f"🔍 Relidos: {self.checked} ({format_bytes(self.bytes_read)})")
+        logger.info(f"⏭️  Sem alteração: {self.skipped}")
+        
+        for result, label in RESULT_LABELS.items():
+            logger.info(f"{label}: {self.counts.get(result, 0)}")
+            if result == AUDIT_OK:
+                continue
+            entries = [issue for issue in self.issues if issue["result"] == result]
+            for issue in entries[:REPORT_LIMIT]:
+                logger.info(f"   {issue['path']} ({issue['detail']})")
+            if len(entries) > REPORT_LIMIT:
+                logger.info(f"   ... e mais {len(entries) - REPORT_LIMIT}")
+        
+        logger.info("=" * 70)
+
+
+def main() -> int:
+    """
+    Função principal para execução via linha de comando.
+    
+    Returns:
+        Código de saída (0 = biblioteca íntegra, 1 = há problemas)
+    """
+    global logger
+    logger = setup_logger(__name__)
+    
+    parser = argparse.ArgumentParser(description="Audita a integridade dos arquivos baixados")
+    parser.add_argument("--completo", action="store_true", help="relê todos os arquivos")
+    parser.add_argument("--aplicar", action="store_true",
+                        help="marca os itens com problema para serem baixados de novo")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 4,
+                        help="processos de verificação em paralelo")
+    parser.add_argument("--relatorio", default=REPORT_FILE, help="arquivo do relatório JSON")
+    args = parser.parse_args()
+    
+    progress = ProgressManager()
+    try:
+        auditor = LibraryAuditor(progress, args.processos)
+        auditor.run(full=args.completo)
+        auditor.log_report()
+        auditor.save_report(Path(args.relatorio))
+        logger.info(f"📝 Relatório salvo em {args.relatorio}")
+        
+        if auditor.issues:
+            if args.aplicar:
+                count = auditor.queue_redownload()
+                logger.info(f"🔁 {count} item(s) serão baixados de novo na próxima execução")
+            else:
+                logger.info("💡 Execute com --aplicar para baixar de novo os itens com problema")
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        progress.close()
+    
+    return 1 if auditor.issues else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
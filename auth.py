@@ -3,11 +3,17 @@ Módulo de Autenticação - VERSÃO CORRIGIDA
 Parte 2/5 da refatoração
 """
 import logging
+import time
+from pathlib import Path
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
 logger = logging.getLogger(__name__)
 
 
+class SessionExpiredError(Exception):
+    """Sessão salva não é mais válida (plataforma redirecionou para o login)"""
+
+
 class AuthManager:
     """Gerencia autenticação na plataforma Estratégia Concursos"""
     
@@ -20,6 +26,14 @@ class AuthManager:
     LOGIN_CONFIRM_TIMEOUT = 60000  # ms
     NAVIGATION_TIMEOUT = 30000     # ms
     
+    # ✅ NOVO: Sessão do perfil persistente (fast path sem carregar página)
+    # A rota do dashboard é a casca da SPA (200 com ou sem login): a validação usa a API
+    SESSION_PROBE_URL = 'https://api.estrategiaconcursos.com.br/api/aluno/curso'
+    SESSION_PROBE_TIMEOUT = 10000  # ms
+    
+    # Dump antigo da sessão (cookies em texto puro), removido se existir
+    LEGACY_STATE_FILE = Path("auth-state.json")
+    
     def __init__(self, email: str, password: str):
         """
         Inicializa o gerenciador de autenticação.
@@ -36,13 +50,22 @@ class AuthManager:
         
         self.email = email
         self.password = password
+        
+        # Sessão recusada pela plataforma: só volta ao fast path após novo login
+        self._session_invalid = False
+        
+        self._remove_legacy_state()
     
-    async def ensure_logged_in(self, page: Page) -> bool:
+    async def ensure_logged_in(self, page: Page, allow_fast_path: bool = True) -> bool:
         """
         Garante que o usuário está logado na plataforma.
         
+        Se houver sessão salva válida (verificada por requisição HTTP leve),
+        não carrega a página de login nem o catálogo.
+        
         Args:
             page: Página do Playwright
+            allow_fast_path: Se False, ignora a sessão salva e valida pela página
         
         Returns:
             True se login bem-sucedido
@@ -52,6 +75,10 @@ class AuthManager:
         """
         logger.info("🔐 Verificando estado de autenticação...")
         
+        if allow_fast_path and await self._probe_saved_session(page):
+            logger.info("✓ Sessão salva válida. Login e catálogo ignorados")
+            return True
+        
         try:
             await page.goto(
                 self.LOGIN_URL,
@@ -63,6 +90,7 @@ class AuthManager:
             if await self._is_logged_in(page):
                 logger.info("✓ Sessão ativa detectada")
                 await self._navigate_to_catalog(page)
+                self._session_invalid = False
                 return True
             
             # Realiza login
@@ -71,6 +99,7 @@ class AuthManager:
             
             # Navega para o catálogo
             await self._navigate_to_catalog(page)
+            self._session_invalid = False
             
             logger.info("✓ Login realizado com sucesso!")
             return True
@@ -92,6 +121,80 @@ class AuthManager:
                 "Não foi possível fazer login. Verifique suas credenciais e tente novamente."
             )
     
+    def invalidate_session(self) -> None:
+        """Ignora a sessão do perfil até o próximo login (ex: após redirecionamento para o login)"""
+        self._session_invalid = True
+    
+    def _remove_legacy_state(self) -> None:
+        """Apaga o dump de sessão em texto puro de versões anteriores"""
+        try:
+            if self.LEGACY_STATE_FILE.exists():
+                self.LEGACY_STATE_FILE.unlink()
+                logger.info("✓ Arquivo de sessão antigo removido")
+        except OSError as e:
+            logger.warning(f"⚠ Erro ao remover arquivo de sessão antigo: {e}")
+    
+    @staticmethod
+    async def _has_unexpired_cookies(page: Page) -> bool:
+        """
+        Verifica se o perfil tem cookies da plataforma ainda válidos.
+        
+        Args:
+            page: Página do Playwright
+        
+        Returns:
+            True se há ao menos um cookie não expirado
+        """
+        now = time.time()
+        for cookie in await page.context.cookies():
+            if 'estrategia' not in cookie.get('domain', ''):
+                continue
+            expires = cookie.get('expires', -1)
+            if expires == -1 or expires > now:
+                return True
+        
+        return False
+    
+    async def _probe_saved_session(self, page: Page) -> bool:
+        """
+        Valida a sessão do perfil com uma requisição à API, sem carregar página.
+        
+        Só aceita resposta 200 com corpo JSON: login expirado responde com 401/403,
+        redirecionamento ou HTML, e qualquer dúvida cai no login pela página.
+        
+        Args:
+            page: Página do Playwright (usa os cookies do seu contexto)
+        
+        Returns:
+            True se a sessão ainda é válida
+        """
+        if self._session_invalid or not await self._has_unexpired_cookies(page):
+            return False
+        
+        try:
+            response = await page.context.request.get(
+                self.SESSION_PROBE_URL,
+                headers={'Accept': 'application/json'},
+                max_redirects=0,
+                timeout=self.SESSION_PROBE_TIMEOUT
+            )
+            try:
+                status = response.status
+                content_type = response.headers.get('content-type', '')
+                body = await response.json() if status == 200 and 'json' in content_type else None
+            finally:
+                await response.dispose()
+            
+            if status != 200 or not isinstance(body, (dict, list)):
+                logger.info(f"ℹ️  Sessão salva expirada (HTTP {status})")
+                return False
+            
+            return True
+        
+        except Exception as e:
+            logger.debug(f"Erro ao validar sessão salva: {e}")
+            return False
+    
     async def _is_logged_in(self, page: Page) -> bool:
         """
         Verifica se já está logado procurando por elementos da dashboard.
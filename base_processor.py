@@ -4,11 +4,18 @@ Parte 2/5 da refatoração
 """
 import logging
 import re
+import shutil
+import time
 import asyncio
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Set
+import aiohttp
 from playwright.async_api import Page, Locator, TimeoutError as PlaywrightTimeoutError
 from utils import sanitize_filename, extract_materia_name
+from auth import SessionExpiredError
+from browser_supervisor import BrowserCrashedError, CourseCursor, is_browser_crash
+from disk_budget import DiskAdmission, Reservation
+from item_identity import describe_key
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +33,15 @@ class BaseCourseProcessor:
     POST_EXPAND_DELAY = 1.0             # segundos
     RATE_LIMIT_DELAY = 0.5              # segundos entre downloads
     MAX_CONCURRENT_DOWNLOADS = 3        # downloads simultâneos
+    HTTP_POOL_LIMIT_PER_HOST = 5        # conexões keep-alive por host
     
-    def __init__(self, base_dir: Path, progress_manager, log_queue=None):
+    def __init__(
+        self,
+        base_dir: Path,
+        progress_manager,
+        log_queue=None,
+        download_semaphore: Optional[asyncio.Semaphore] = None
+    ):
         """
         Inicializa o processador base.
         
@@ -35,6 +49,8 @@ class BaseCourseProcessor:
             base_dir: Diretório base para downloads
             progress_manager: Gerenciador de progresso
             log_queue: Fila para enviar logs e status
+            download_semaphore: Limitador global de downloads (compartilhado
+                                entre processadores que rodam em paralelo)
         """
         self.base_dir = Path(base_dir)
         self.progress_manager = progress_manager
@@ -44,7 +60,53 @@ class BaseCourseProcessor:
         self._cancel_event = asyncio.Event()
         
         # ✅ NOVA FUNCIONALIDADE: Semáforo para rate limiting
-        self._download_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DOWNLOADS)
+        self._download_semaphore = (
+            download_semaphore or asyncio.Semaphore(self.MAX_CONCURRENT_DOWNLOADS)
+        )
+        
+        # Sessão HTTP reaproveitada para verificações leves (HEAD/Range)
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self.course_id: Optional[str] = None
+        
+        # Manifesto do curso para sincronização incremental (opcional)
+        self.manifest = None
+        
+        # Se definido, apenas estas aulas são visitadas (detecção de novidades)
+        self.lesson_filter: Optional[Set[str]] = None
+        
+        # Página que substituiu a recebida em process_course() (reciclagem)
+        self.replaced_page: Optional[Page] = None
+        
+        # Queda do navegador (sinalizada pelo supervisor) e cursor de retomada
+        self.browser_lost: Optional[asyncio.Event] = None
+        self.cursor: Optional[CourseCursor] = None
+        
+        # Controle de espaço em disco/orçamento por curso (compartilhado, opcional)
+        self.disk_admission: Optional[DiskAdmission] = None
+        
+        # Aulas com erro ou item que falhou nesta execução (não entram como sincronizadas)
+        self.incomplete_lessons: Set[str] = set()
+    
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        """
+        Obtém sessão HTTP compartilhada, criando-a na primeira chamada.
+        
+        Returns:
+            Sessão aiohttp com pool de conexões keep-alive
+        """
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.HTTP_POOL_LIMIT_PER_HOST)
+            self._http_session = aiohttp.ClientSession(connector=connector)
+        return self._http_session
+    
+    async def close(self) -> None:
+        """Libera recursos de rede do processador"""
+        if self._http_session is not None and not self._http_session.closed:
+            try:
+                await self._http_session.close()
+            except Exception as e:
+                logger.debug(f"Erro ao fechar sessão HTTP: {e}")
+        self._http_session = None
     
     def request_cancel(self) -> None:
         """Solicita cancelamento do processamento atual (thread-safe)"""
@@ -67,9 +129,41 @@ class BaseCourseProcessor:
         
         Raises:
             asyncio.CancelledError: Se cancelamento foi solicitado
+            BrowserCrashedError: Se o navegador caiu
         """
         if self.cancel_requested:
             raise asyncio.CancelledError("Processamento cancelado pelo usuário")
+        if self.browser_lost is not None and self.browser_lost.is_set():
+            raise BrowserCrashedError("Navegador perdido durante o processamento")
+    
+    def is_browser_lost(self, error: Exception) -> bool:
+        """
+        Verifica se um erro se deve à queda do navegador.
+        
+        Args:
+            error: Exceção capturada
+        
+        Returns:
+            True se o supervisor sinalizou a queda ou o erro indica travamento
+        """
+        if self.browser_lost is not None and self.browser_lost.is_set():
+            return True
+        return is_browser_crash(error)
+    
+    def raise_if_browser_lost(self, error: Exception) -> None:
+        """
+        Propaga erros causados pela queda do navegador em vez de seguir para a próxima aula.
+        
+        Args:
+            error: Exceção capturada
+        
+        Raises:
+            BrowserCrashedError: Se o erro indica página travada ou navegador perdido
+        """
+        if isinstance(error, BrowserCrashedError):
+            raise error
+        if self.is_browser_lost(error):
+            raise BrowserCrashedError(str(error)) from error
     
     async def navigate_to_course(self, page: Page, course_url: str) -> None:
         """
@@ -81,8 +175,14 @@ class BaseCourseProcessor:
             course_url: URL do curso
         
         Raises:
+            SessionExpiredError: Se a plataforma redirecionar para o login
             Exception: Se navegação falhar
         """
+        # Curso já aberto (ex: após a leitura do catálogo): evita recarregar
+        if self._is_on_course(page, course_url):
+            logger.info("✓ Curso já aberto nesta página")
+            return
+        
         logger.info(f"🌐 Navegando para: {course_url}")
         
         try:
@@ -92,6 +192,10 @@ class BaseCourseProcessor:
                 timeout=self.DEFAULT_NAVIGATION_TIMEOUT
             )
             
+            # Sessão salva expirou: plataforma mandou para a tela de login
+            if "/auth/login" in page.url:
+                raise SessionExpiredError("Sessão expirada ao acessar o curso")
+            
             # Verifica se foi redirecionado para o dashboard genérico
             if "app/dashboard/cursos" in page.url and not re.search(r'/cursos/\d+/aulas', page.url):
                 logger.warning("⚠ Redirecionado para dashboard. Tentando novamente...")
@@ -121,6 +225,12 @@ class BaseCourseProcessor:
             logger.error(f"❌ Erro na navegação: {e}")
             raise
     
+    @staticmethod
+    def _is_on_course(page: Page, course_url: str) -> bool:
+        """Verifica se a página já está na URL do curso"""
+        current = page.url.split('#')[0].rstrip('/')
+        return current == course_url.split('#')[0].rstrip('/')
+    
     async def extract_course_info(self, page: Page) -> Tuple[str, Path]:
         """
         Extrai informações do curso (nome e diretório).
@@ -173,6 +283,9 @@ class BaseCourseProcessor:
         logger.info(f"✓ Curso: {course_name}")
         logger.info(f"✓ Pasta: {course_dir}")
         
+        if self.course_id:
+            self.progress_manager.record_course(self.course_id, page.url, course_name)
+        
         return course_name, course_dir
     
     async def get_lessons(self, page: Page) -> list[Locator]:
@@ -313,16 +426,219 @@ class BaseCourseProcessor:
         Returns:
             True se já foi baixado
         """
-        return self.progress_manager.is_completed(progress_key)
+        return self.progress_manager.is_completed(progress_key, self.course_id)
     
-    def mark_as_downloaded(self, progress_key: str) -> None:
+    def mark_as_downloaded(
+        self,
+        progress_key: str,
+        file_path: Optional[Path] = None,
+        sha256: Optional[str] = None
+    ) -> None:
         """
         Marca um item como baixado no registro de progresso.
         
         Args:
             progress_key: Chave única do item
+            file_path: Arquivo salvo (guarda caminho e tamanho para detectar renomeações)
+            sha256: Hash do conteúdo, se calculado
+        """
+        info = None
+        if file_path is not None:
+            info = {
+                "path": str(file_path),
+                "size": file_path.stat().st_size if file_path.exists() else None,
+                "sha256": sha256,
+                "completed_at": int(time.time())
+            }
+        self.progress_manager.mark_completed(progress_key, info, self.course_id)
+    
+    def mark_as_failed(self, progress_key: str, error: Exception) -> None:
+        """
+        Registra a falha de um item (tentativas e último erro ficam no banco).
+        
+        Args:
+            progress_key: Chave única do item
+            error: Erro do download
+        """
+        self.progress_manager.mark_failed(progress_key, str(error) or type(error).__name__, self.course_id)
+        
+        _, aula_id = describe_key(progress_key)
+        if aula_id:
+            self.incomplete_lessons.add(aula_id)
+    
+    def adopt_existing(
+        self,
+        item_key: str,
+        legacy_key: Optional[str],
+        file_path: Path
+    ) -> bool:
+        """
+        Verifica se o item já foi baixado pela identidade estável.
+        
+        Se o título mudou, o arquivo antigo é movido para o novo nome em vez de
+        ser baixado de novo. Registros antigos (título + posição) são migrados.
+        
+        Args:
+            item_key: Chave estável do item
+            legacy_key: Chave no formato antigo (None se igual à estável)
+            file_path: Caminho que o arquivo teria com o título atual
+        
+        Returns:
+            True se o item já está no disco/progresso e não precisa ser baixado
+        """
+        info = self.progress_manager.get_info(item_key)
+        
+        if info is not None:
+            self._relocate_item(item_key, info, file_path)
+            return True
+        
+        if self.progress_manager.is_completed(item_key, self.course_id):
+            return True  # Registro sem dados do arquivo
+        
+        if legacy_key and legacy_key != item_key and self.progress_manager.is_completed(legacy_key):
+            info = None
+            if file_path.exists():
+                info = {"path": str(file_path), "size": file_path.stat().st_size, "sha256": None}
+            self.progress_manager.migrate_key(legacy_key, item_key, info, self.course_id)
+            logger.debug(f"✓ Progresso migrado para identidade estável: {item_key}")
+            return True
+        
+        return False
+    
+    def _relocate_item(self, item_key: str, info: dict, file_path: Path) -> None:
+        """
+        Move o arquivo de um item renomeado na plataforma para o novo caminho.
+        
+        Args:
+            item_key: Chave estável do item
+            info: Dados gravados do item (caminho, tamanho, hash)
+            file_path: Novo caminho esperado
+        """
+        old_path = Path(info["path"]) if info.get("path") else None
+        
+        # O formato do arquivo não muda com o título (ex: stream salvo como .ts)
+        if old_path is not None and old_path.suffix.lower() != file_path.suffix.lower():
+            file_path = file_path.with_suffix(old_path.suffix)
+        
+        if old_path is None or old_path == file_path or file_path.exists() or not old_path.exists():
+            return
+        
+        # Só move se for o mesmo arquivo que foi baixado
+        if info.get("size") is not None and old_path.stat().st_size != info["size"]:
+            logger.warning(f"⚠ Tamanho diferente do registrado, arquivo não movido: {old_path.name}")
+            return
+        
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(old_path), str(file_path))
+        except (OSError, IOError) as e:
+            logger.error(f"❌ Erro ao mover arquivo renomeado: {e}")
+            return
+        
+        self.progress_manager.mark_completed(item_key, dict(info, path=str(file_path)))
+        logger.info(f"📦 Renomeado localmente: {old_path.name} → {file_path.name}")
+    
+    def claim_item(self, key: str) -> bool:
+        """
+        Reserva item para download no gerenciador de progresso compartilhado.
+        
+        Args:
+            key: Chave única do item ou caminho do arquivo
+        
+        Returns:
+            True se este worker pode baixar o item
+        """
+        return self.progress_manager.try_claim(key)
+    
+    def release_item(self, key: str) -> None:
+        """
+        Libera reserva feita com claim_item().
+        
+        Args:
+            key: Chave reservada
+        """
+        self.progress_manager.release(key)
+    
+    def attach_manifest(self, manifest) -> None:
+        """
+        Associa o manifesto do curso (sincronização incremental).
+        
+        Args:
+            manifest: CourseManifest do curso ou None para desativar
+        """
+        self.manifest = manifest
+    
+    def can_skip_lesson(self, aula_id: str, title: str) -> bool:
+        """
+        Verifica se a aula está fora do filtro de novidades ou já completa no manifesto.
+        
+        Args:
+            aula_id: ID da aula
+            title: Título atual da aula
+        
+        Returns:
+            True se a aula pode ser pulada sem expandir
+        """
+        # Filtro do catálogo prevalece: aula alterada é visitada mesmo se o manifesto diz completa
+        if self.lesson_filter is not None:
+            return aula_id not in self.lesson_filter
+        if self.manifest is None:
+            return False
+        return self.manifest.can_skip_lesson(aula_id, title, self.progress_manager)
+    
+    def track_item(self, aula_id: str, key: str) -> None:
+        """Registra no manifesto um item encontrado na aula"""
+        if self.manifest is not None:
+            self.manifest.track(aula_id, key)
+    
+    def untrack_item(self, aula_id: str, key: str) -> None:
+        """Remove do manifesto um item opcional indisponível"""
+        if self.manifest is not None:
+            self.manifest.untrack(aula_id, key)
+    
+    def mark_lesson_failed(self, aula_id: str) -> None:
+        """Impede que uma aula com erro seja considerada completa"""
+        self.incomplete_lessons.add(aula_id)
+        if self.manifest is not None:
+            self.manifest.mark_failed(aula_id)
+    
+    def record_lesson(self, aula_id: str, title: str) -> None:
+        """Grava no manifesto os itens vistos numa aula visitada"""
+        if self.manifest is not None:
+            self.manifest.record_lesson(aula_id, title)
+        if self.course_id:
+            self.progress_manager.record_lesson(self.course_id, aula_id, title)
+    
+    async def reserve_space(self, file_path: Path, expected_size: Optional[int]) -> Optional[Reservation]:
+        """
+        Reserva espaço em disco para um download (aguarda se o disco estiver cheio).
+        
+        Args:
+            file_path: Caminho de destino
+            expected_size: Tamanho esperado (None = estimativa pelo tipo)
+        
+        Returns:
+            Reserva ou None se o controle de espaço está desativado
+        
+        Raises:
+            DiskSpaceError: Se o download não couber no disco ou no orçamento do curso
+        """
+        if self.disk_admission is None:
+            return None
+        return await self.disk_admission.acquire(self.course_id, file_path, expected_size)
+    
+    async def release_space(self, reservation: Optional[Reservation], file_path: Path) -> None:
+        """
+        Devolve a reserva de um download, contabilizando o que ficou no disco.
+        
+        Args:
+            reservation: Reserva de reserve_space()
+            file_path: Caminho de destino
         """
-        self.progress_manager.mark_completed(progress_key)
+        if reservation is None:
+            return
+        written = file_path.stat().st_size if file_path.exists() else 0
+        await self.disk_admission.release(reservation, written)
     
     # ✅ NOVA FUNCIONALIDADE: Download com rate limiting
     async def download_with_rate_limit(self, download_func, *args, **kwargs):
@@ -0,0 +1,284 @@
+"""
+Supervisor do Navegador
+Detecta páginas travadas e navegador desconectado, reabre o Chromium com o
+perfil persistente e guarda o cursor de cada curso para retomar de onde parou
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+# Trechos das mensagens do Playwright quando a página/navegador morre
+CRASH_MARKERS = (
+    'target crashed',
+    'page crashed',
+    'target closed',
+    'target page, context or browser has been closed',
+    'browser has been closed',
+    'browser closed',
+    'connection closed',
+)
+
+
+class BrowserCrashedError(Exception):
+    """Página ou navegador caiu durante o processamento"""
+    pass
+
+
+def is_browser_crash(error: BaseException) -> bool:
+    """
+    Verifica se um erro indica página travada ou navegador desconectado.
+    
+    Args:
+        error: Exceção capturada
+    
+    Returns:
+        True se o erro vem da perda do navegador
+    """
+    if isinstance(error, BrowserCrashedError):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in CRASH_MARKERS)
+
+
+class CourseCursor:
+    """Aulas e vídeos já concluídos de um curso na tentativa atual"""
+    
+    def __init__(self, course_url: str):
+        """
+        Inicializa o cursor.
+        
+        Args:
+            course_url: URL do curso
+        """
+        self.course_url = course_url
+        self.lessons_done: Set[int] = set()
+        self.videos_done: Dict[int, int] = {}
+    
+    def skip_lesson(self, index: int) -> bool:
+        """True se a aula (índice base 1) já foi concluída"""
+        return index in self.lessons_done
+    
+    def skip_video(self, lesson_index: int, video_index: int) -> bool:
+        """True se o vídeo (índice base 1) da aula já foi concluído"""
+        return video_index <= self.videos_done.get(lesson_index, 0)
+    
+    def lesson_done(self, index: int) -> None:
+        """Marca a aula como concluída"""
+        self.lessons_done.add(index)
+        self.videos_done.pop(index, None)
+    
+    def video_done(self, lesson_index: int, video_index: int) -> None:
+        """Avança o cursor de vídeos da aula"""
+        if video_index > self.videos_done.get(lesson_index, 0):
+            self.videos_done[lesson_index] = video_index
+    
+    def describe(self) -> str:
+        """Posição legível para o log"""
+        if not self.lessons_done and not self.videos_done:
+            return "do início"
+        
+        text = f"{len(self.lessons_done)} aula(s) concluída(s)"
+        if self.videos_done:
+            partial = ', '.join(
+                f"aula {lesson} a partir do vídeo {video + 1}"
+                for lesson, video in sorted(self.videos_done.items())
+            )
+            text += f"; {partial}"
+        return text
+
+
+class BrowserSupervisor:
+    """Mantém o contexto do navegador vivo ao longo da execução"""
+    
+    MAX_RELAUNCHES = 3
+    
+    def __init__(
+        self,
+        launch: Callable[[], Awaitable[BrowserContext]],
+        authenticate: Callable[[Page], Awaitable[None]],
+        max_relaunches: int = MAX_RELAUNCHES
+    ):
+        """
+        Inicializa o supervisor.
+        
+        Args:
+            launch: Abre o contexto persistente do navegador
+            authenticate: Faz login numa página (reaproveitando a sessão salva)
+            max_relaunches: Máximo de reinícios do navegador por execução
+        """
+        self._launch = launch
+        self._authenticate = authenticate
+        self.max_relaunches = max(0, max_relaunches)
+        
+        self.context: Optional[BrowserContext] = None
+        self.generation = 0
+        self.relaunches = 0
+        
+        # Sinaliza aos processadores que o navegador foi perdido
+        self.lost = asyncio.Event()
+        
+        self._lock = asyncio.Lock()
+        self._closing = False
+        self._cursors: Dict[str, CourseCursor] = {}
+    
+    async def start(self) -> BrowserContext:
+        """
+        Abre o navegador e passa a observá-lo.
+        
+        Returns:
+            Contexto do navegador
+        """
+        self.context = await self._launch()
+        self._watch_context(self.context)
+        return self.context
+    
+    async def new_page(self) -> Page:
+        """
+        Abre uma página observada no contexto atual.
+        
+        Returns:
+            Nova página
+        """
+        page = await self.context.new_page()
+        self.watch_page(page)
+        return page
+    
+    async def ensure_page(self, page: Page) -> Page:
+        """
+        Troca uma página do navegador anterior por uma do contexto atual.
+        
+        Um worker pode chegar a um novo curso ainda com a página do navegador
+        que outro worker já reiniciou; usá-la provocaria um novo reinício.
+        
+        Args:
+            page: Página atual do worker
+        
+        Returns:
+            A própria página, ou uma nova se ela pertence a um contexto perdido
+        """
+        async with self._lock:
+            if not page.is_closed() and page.context is self.context:
+                return page
+            return await self.new_page()
+    
+    def watch_page(self, page: Page) -> None:
+        """
+        Registra detecção de travamento numa página.
+        
+        Args:
+            page: Página do Playwright
+        """
+        page.on('crash', lambda _: self._mark_lost("página do navegador travou"))
+    
+    def _watch_context(self, context: BrowserContext) -> None:
+        """Registra detecção de fechamento/desconexão do contexto"""
+        def on_close(_):
+            if context is self.context and not self._closing:
+                self._mark_lost("navegador fechado ou desconectado")
+        
+        context.on('close', on_close)
+        
+        # Páginas abertas por scripts da plataforma também são observadas
+        context.on('page', self.watch_page)
+        for page in context.pages:
+            self.watch_page(page)
+    
+    def _mark_lost(self, reason: str) -> None:
+        """Sinaliza a perda do navegador (uma vez por geração)"""
+        if not self.lost.is_set():
+            logger.error(f"💥 {reason.capitalize()}")
+            self.lost.set()
+    
+    def is_crash(self, error: BaseException) -> bool:
+        """
+        Verifica se um erro se deve à perda do navegador.
+        
+        Args:
+            error: Exceção capturada
+        
+        Returns:
+            True se o navegador caiu ou o erro indica travamento
+        """
+        return self.lost.is_set() or is_browser_crash(error)
+    
+    def cursor_for(self, course_url: str) -> CourseCursor:
+        """
+        Cursor de retomada de um curso (criado na primeira tentativa).
+        
+        Args:
+            course_url: URL do curso
+        
+        Returns:
+            Cursor do curso
+        """
+        if course_url not in self._cursors:
+            self._cursors[course_url] = CourseCursor(course_url)
+        return self._cursors[course_url]
+    
+    def finish_course(self, course_url: str) -> None:
+        """Descarta o cursor de um curso concluído"""
+        self._cursors.pop(course_url, None)
+    
+    async def recover(self, generation: int) -> BrowserContext:
+        """
+        Reabre o navegador com o perfil persistente e refaz o login.
+        
+        Vários workers podem detectar a mesma queda: só o primeiro reinicia,
+        os demais recebem o contexto já recuperado.
+        
+        Args:
+            generation: Geração do navegador vista por quem chamou
+        
+        Returns:
+            Contexto do navegador recuperado
+        
+        Raises:
+            BrowserCrashedError: Se o limite de reinícios foi atingido
+        """
+        async with self._lock:
+            if generation != self.generation:
+                return self.context
+            
+            if self.relaunches >= self.max_relaunches:
+                raise BrowserCrashedError(
+                    f"Limite de {self.max_relaunches} reinício(s) do navegador atingido"
+                )
+            
+            self.relaunches += 1
+            logger.warning(f"🔁 Reiniciando navegador ({self.relaunches}/{self.max_relaunches})...")
+            
+            await self._close_context()
+            self.context = await self._launch()
+            self._watch_context(self.context)
+            
+            # Sessão salva no perfil: login pelo caminho rápido
+            page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+            await self._authenticate(page)
+            
+            self.generation += 1
+            self.lost.clear()
+            logger.info("✓ Navegador recuperado")
+            
+            return self.context
+    
+    async def _close_context(self) -> None:
+        """Fecha o contexto atual ignorando erros (pode já estar morto)"""
+        if self.context is None:
+            return
+        
+        self._closing = True
+        try:
+            await self.context.close()
+        except Exception as e:
+            logger.debug(f"Erro ao fechar contexto perdido: {e}")
+        finally:
+            self._closing = False
+            self.context = None
+    
+    async def close(self) -> None:
+        """Fecha o navegador no fim da execução"""
+        async with self._lock:
+            await self._close_context()
@@ -0,0 +1,335 @@
+"""
+Catálogo de Cursos (Detecção de Novidades)
+Extrai a lista de aulas e vídeos de cada curso e compara com o último snapshot
+"""
+import asyncio
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+from playwright.async_api import Page
+from base_processor import BaseCourseProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class CourseDelta:
+    """Diferenças entre o snapshot salvo e o conteúdo atual de um curso"""
+    
+    def __init__(self, first_scan: bool = False):
+        """
+        Inicializa o resultado da comparação.
+        
+        Args:
+            first_scan: True se não havia snapshot anterior do curso
+        """
+        self.first_scan = first_scan
+        self.new_lessons: List[str] = []
+        self.changed_lessons: Dict[str, List[str]] = {}
+        self.removed_lessons: List[str] = []
+        self.new_items = 0
+        self.renamed_items = 0
+    
+    @property
+    def has_changes(self) -> bool:
+        """True se há aulas novas ou alteradas para baixar"""
+        return bool(self.new_lessons or self.changed_lessons)
+    
+    @property
+    def lesson_ids(self) -> Set[str]:
+        """IDs das aulas que precisam ser visitadas"""
+        return set(self.new_lessons) | set(self.changed_lessons)
+    
+    def summary(self) -> str:
+        """
+        Resumo de uma linha para o relatório.
+        
+        Returns:
+            Texto com contagem de aulas novas, alteradas e removidas
+        """
+        if self.first_scan:
+            return f"primeira varredura ({len(self.new_lessons)} aulas)"
+        
+        if not self.has_changes and not self.removed_lessons:
+            return "sem novidades"
+        
+        return (
+            f"{len(self.new_lessons)} aula(s) nova(s), "
+            f"{len(self.changed_lessons)} alterada(s), "
+            f"{len(self.removed_lessons)} removida(s) | "
+            f"{self.new_items} item(ns) novo(s), {self.renamed_items} renomeado(s)"
+        )
+    
+    def log_report(self, logger: logging.Logger, titles: Dict[str, str]) -> None:
+        """
+        Loga o relatório detalhado do curso.
+        
+        Args:
+            logger: Logger para output
+            titles: Título atual de cada aula (aula_id -> título)
+        """
+        logger.info(f"🔎 Novidades: {self.summary()}")
+        
+        if self.first_scan:
+            return
+        
+        for aula_id in self.new_lessons:
+            logger.info(f"   🆕 {titles.get(aula_id, aula_id)}")
+        for aula_id, changes in self.changed_lessons.items():
+            logger.info(f"   ✏️  {titles.get(aula_id, aula_id)}: {', '.join(changes)}")
+        for aula_id in self.removed_lessons:
+            logger.info(f"   🗑️  {aula_id}")
+
+
+def _item_identity(item: dict) -> str:
+    """Identidade de um vídeo: href (estável) ou, na falta dele, o título"""
+    return item.get("href") or item.get("title") or ""
+
+
+def diff_catalog(old: Optional[dict], new: dict) -> CourseDelta:
+    """
+    Compara dois snapshots de um curso.
+    
+    Args:
+        old: Snapshot salvo (None na primeira varredura)
+        new: Snapshot atual
+    
+    Returns:
+        Diferenças encontradas
+    """
+    old_lessons = (old or {}).get("lessons", {})
+    new_lessons = new.get("lessons", {})
+    delta = CourseDelta(first_scan=old is None)
+    
+    for aula_id, lesson in new_lessons.items():
+        previous = old_lessons.get(aula_id)
+        
+        if previous is None:
+            delta.new_lessons.append(aula_id)
+            delta.new_items += len(lesson.get("videos", [])) + len(lesson.get("pdfs", []))
+            continue
+        
+        changes = []
+        
+        # Itens que falharam na última execução: a aula é visitada de novo
+        if previous.get("incomplete"):
+            changes.append("itens pendentes")
+        
+        if lesson.get("title") != previous.get("title"):
+            changes.append("título alterado")
+        
+        old_videos = {_item_identity(v): v.get("title") for v in previous.get("videos", [])}
+        added = renamed = 0
+        for video in lesson.get("videos", []):
+            identity = _item_identity(video)
+            if identity not in old_videos:
+                added += 1
+            elif old_videos[identity] != video.get("title"):
+                renamed += 1
+        
+        if added:
+            changes.append(f"{added} vídeo(s) novo(s)")
+        if renamed:
+            changes.append(f"{renamed} vídeo(s) renomeado(s)")
+        
+        added_pdfs = len(set(lesson.get("pdfs", [])) - set(previous.get("pdfs", [])))
+        if added_pdfs:
+            changes.append(f"{added_pdfs} PDF(s) novo(s)")
+        
+        if changes:
+            delta.changed_lessons[aula_id] = changes
+            delta.new_items += added + added_pdfs
+            delta.renamed_items += renamed
+    
+    delta.removed_lessons = [aula_id for aula_id in old_lessons if aula_id not in new_lessons]
+    return delta
+
+
+class CatalogStore:
+    """Snapshots do catálogo, um arquivo JSON por curso"""
+    
+    CATALOG_DIR = Path("catalog")
+    
+    def __init__(self, catalog_dir: Optional[Path] = None):
+        """
+        Inicializa o armazenamento de snapshots.
+        
+        Args:
+            catalog_dir: Diretório dos snapshots
+        """
+        self.catalog_dir = Path(catalog_dir or self.CATALOG_DIR)
+    
+    def _path_for(self, course_id: str) -> Path:
+        """Arquivo do snapshot de um curso"""
+        safe_id = re.sub(r'[^\w.-]', '_', course_id)[:120]
+        return self.catalog_dir / f"{safe_id}.json"
+    
+    def load(self, course_id: str) -> Optional[dict]:
+        """
+        Carrega o último snapshot do curso.
+        
+        Args:
+            course_id: ID do curso
+        
+        Returns:
+            Snapshot ou None se não existir / estiver corrompido
+        """
+        path = self._path_for(course_id)
+        
+        try:
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        
+        except json.JSONDecodeError as e:
+            logger.warning(f"⚠ Snapshot corrompido, ignorando: {path.name} ({e})")
+        
+        except (OSError, IOError) as e:
+            logger.error(f"❌ Erro ao ler snapshot do catálogo: {e}")
+        
+        return None
+    
+    def load_all(self) -> Iterator[dict]:
+        """
+        Percorre todos os snapshots salvos.
+        
+        Returns:
+            Iterador de snapshots (os corrompidos são ignorados)
+        """
+        if not self.catalog_dir.is_dir():
+            return
+        
+        for path in sorted(self.catalog_dir.glob("*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+            except (json.JSONDecodeError, OSError, IOError) as e:
+                logger.warning(f"⚠ Snapshot ignorado: {path.name} ({e})")
+    
+    def save(self, course_id: str, snapshot: dict) -> None:
+        """
+        Grava o snapshot do curso (substituição atômica).
+        
+        Args:
+            course_id: ID do curso
+            snapshot: Snapshot atual
+        """
+        path = self._path_for(course_id)
+        
+        try:
+            self.catalog_dir.mkdir(parents=True, exist_ok=True)
+            temp_file = path.with_suffix('.tmp')
+            
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            
+            temp_file.replace(path)
+            logger.debug(f"✓ Snapshot do catálogo salvo: {path.name}")
+        
+        except (OSError, IOError) as e:
+            logger.error(f"❌ Erro ao salvar snapshot do catálogo: {e}")
+
+
+class CatalogScanner(BaseCourseProcessor):
+    """Lê, numa única visita, a identidade de todas as aulas e vídeos do curso"""
+    
+    CONTENT_POLL_INTERVAL = 0.5  # segundos
+    
+    async def scan(self, page: Page, course_url: str) -> dict:
+        """
+        Abre o curso, expande todas as aulas de uma vez e extrai o catálogo.
+        
+        Args:
+            page: Página do Playwright (permanece no curso ao final)
+            course_url: URL do curso
+        
+        Returns:
+            Snapshot {'course_url', 'lessons': {aula_id: {title, name, subtitle, videos, pdfs}}}
+        """
+        await self.navigate_to_course(page, course_url)
+        total = len(await self.get_lessons(page))
+        
+        # Expande todas as aulas recolhidas com um único script
+        await page.evaluate(
+            """() => {
+                document.querySelectorAll('.LessonList-item .Collapse-header').forEach(header => {
+                    const content = header.parentElement.nextElementSibling;
+                    if (content && content.style.display === "none") {
+                        header.click();
+                    }
+                });
+            }"""
+        )
+        await self._wait_for_contents(page, total)
+        
+        raw_lessons = await page.evaluate(
+            """() => Array.from(document.querySelectorAll('.LessonList-item')).map(aula => {
+                const text = (root, sel) => {
+                    const el = root.querySelector(sel);
+                    return el ? el.textContent.replace(/\\s+/g, ' ').trim() : null;
+                };
+                return {
+                    id: aula.id || null,
+                    title: text(aula, '.LessonCollapseHeader-title .SectionTitle'),
+                    subtitle: text(aula, '.LessonCollapseHeader-title .sc-gZMcBi'),
+                    videos: Array.from(aula.querySelectorAll('.ListVideos-items-video a.VideoItem')).map(v => ({
+                        title: text(v, '.VideoItem-info-title') || '',
+                        href: v.getAttribute('href')
+                    })),
+                    pdfs: Array.from(aula.querySelectorAll('a'))
+                        .filter(a => (a.textContent || '').includes('Baixar Livro Eletrônico'))
+                        .map(a => a.getAttribute('href'))
+                        .filter(Boolean)
+                };
+            })"""
+        )
+        
+        lessons = {}
+        for index, raw in enumerate(raw_lessons, 1):
+            # Mesmo fallback de extract_lesson_info()
+            aula_id = raw["id"] or f'aula{index:02d}'
+            name = raw["title"] or f"Aula {index:02d}"
+            subtitle = raw["subtitle"] or "Sem Subtítulo"
+            lessons[aula_id] = {
+                "title": f'{name} - {subtitle}',
+                "name": name,
+                "subtitle": subtitle,
+                "videos": raw["videos"],
+                "pdfs": raw["pdfs"]
+            }
+        
+        logger.info(
+            f"✓ Catálogo lido: {len(lessons)} aulas, "
+            f"{sum(len(l['videos']) for l in lessons.values())} vídeos"
+        )
+        
+        return {"course_url": course_url, "lessons": lessons}
+    
+    async def _wait_for_contents(self, page: Page, total: int) -> None:
+        """
+        Aguarda o conteúdo das aulas expandidas carregar (ou parar de mudar).
+        
+        Args:
+            page: Página do Playwright
+            total: Número de aulas do curso
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.LESSON_EXPAND_TIMEOUT / 1000
+        last_count = -1
+        
+        while loop.time() < deadline:
+            count = await page.evaluate(
+                """() => Array.from(document.querySelectorAll('.LessonList-item')).filter(
+                    aula => aula.querySelector('[class*="ListVideos"], [class*="VideoItem"], a[href*="download"]')
+                ).length"""
+            )
+            
+            # Todas carregadas, ou nenhuma mudança desde a última verificação
+            if count >= total or (count == last_count and count > 0):
+                break
+            
+            last_count = count
+            await asyncio.sleep(self.CONTENT_POLL_INTERVAL)
+        
+        await asyncio.sleep(self.POST_EXPAND_DELAY)
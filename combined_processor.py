@@ -0,0 +1,145 @@
+"""
+Processador Combinado (PDFs + Materiais dos Vídeos)
+Percorre o curso uma única vez quando 'baixarExtrasComPdf' está ativo
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+from playwright.async_api import Page, Locator
+from video_processor import VideoProcessor
+from pdf_processor import PDFProcessor
+from page_monitor import PageStats
+
+logger = logging.getLogger(__name__)
+
+
+class CombinedProcessor(VideoProcessor):
+    """
+    Baixa PDFs e materiais complementares dos vídeos na mesma passada.
+    
+    Cada aula é expandida uma só vez: primeiro os links de PDF são coletados,
+    depois os vídeos são selecionados apenas para descobrir os extras.
+    """
+    
+    def __init__(
+        self,
+        base_dir: Path,
+        progress_manager,
+        pdf_type: int = 2,
+        log_queue=None,
+        download_semaphore=None,
+        pipeline_window: int = 2,
+        heap_limit_mb: float = 0,
+        recycle_every: int = 0,
+        page_stats: Optional[PageStats] = None
+    ):
+        """
+        Inicializa o processador combinado.
+        
+        Args:
+            base_dir: Diretório base para downloads (PDFs e extras)
+            progress_manager: Gerenciador de progresso
+            pdf_type: Tipo de PDF a baixar (1-4)
+            log_queue: Fila para enviar status
+            download_semaphore: Limitador global de downloads (opcional)
+            pipeline_window: Extras resolvidos à frente da transferência
+            heap_limit_mb: Heap JS (MB) que dispara a reciclagem da página
+            recycle_every: Número de vídeos após o qual a página é reciclada
+            page_stats: Estatísticas de memória e latência da execução
+        """
+        super().__init__(
+            base_dir,
+            progress_manager,
+            preferred_resolution='360p',  # Irrelevante pois não vai baixar vídeo
+            download_extras=True,
+            skip_video=True,
+            log_queue=log_queue,
+            download_semaphore=download_semaphore,
+            pipeline_window=pipeline_window,
+            heap_limit_mb=heap_limit_mb,
+            recycle_every=recycle_every,
+            page_stats=page_stats
+        )
+        
+        # Reaproveita a lógica de PDFs (mesmo destino e limitador de downloads)
+        self.pdf_processor = PDFProcessor(
+            base_dir,
+            progress_manager,
+            pdf_type=pdf_type,
+            log_queue=log_queue,
+            download_semaphore=self._download_semaphore
+        )
+        self.pdf_processor.incomplete_lessons = self.incomplete_lessons
+        
+        logger.info("📦 Modo combinado: PDFs e extras dos vídeos em uma única navegação")
+    
+    def request_cancel(self) -> None:
+        """Solicita cancelamento deste processador e do de PDFs"""
+        super().request_cancel()
+        self.pdf_processor.request_cancel()
+    
+    def attach_manifest(self, manifest) -> None:
+        """Compartilha o manifesto do curso com o processador de PDFs"""
+        super().attach_manifest(manifest)
+        self.pdf_processor.attach_manifest(manifest)
+    
+    async def close(self) -> None:
+        """Libera recursos de rede dos dois processadores"""
+        await self.pdf_processor.close()
+        await super().close()
+    
+    async def _process_lesson(
+        self,
+        page: Page,
+        aula_element: Locator,
+        course_dir: Path,
+        course_url: str,
+        index: int,
+        expand: bool = True
+    ) -> None:
+        """
+        Processa PDFs e extras de uma aula com uma única expansão.
+        
+        Args:
+            page: Página do Playwright
+            aula_element: Elemento da aula
+            course_dir: Diretório do curso
+            course_url: URL do curso (para recuperação de erros)
+            index: Índice da aula
+            expand: Se False, a aula já foi expandida por quem chamou
+        """
+        aula_id = None
+        
+        try:
+            aula_id, lesson_name, lesson_subtitle = await self.extract_lesson_info(aula_element, index)
+            
+            # ✅ SYNC INCREMENTAL: PDFs e extras já completos, nada a fazer
+            if self.can_skip_lesson(aula_id, f'{lesson_name} - {lesson_subtitle}'):
+                logger.info(f"⏭️  Aula {index} sem novidades: {lesson_name}")
+                return
+            
+            logger.info(f"📚 Processando aula {index}: {lesson_name}")
+            
+            if expand:
+                await self.expand_lesson(page, aula_id)
+            
+            self.pdf_processor.course_id = self.course_id
+            self.pdf_processor.disk_admission = self.disk_admission
+            await self.pdf_processor.download_lesson_pdfs(
+                aula_element, course_dir, lesson_name, lesson_subtitle, aula_id
+            )
+        
+        except asyncio.CancelledError:
+            raise
+        
+        except Exception as e:
+            self.raise_if_browser_lost(e)
+            logger.error(f"❌ Erro ao baixar PDFs da aula {index}: {e}")
+            if aula_id:
+                self.mark_lesson_failed(aula_id)
+        
+        # Aula já expandida: segue direto para os extras dos vídeos
+        await super()._process_lesson(
+            page, aula_element, course_dir, course_url, index, expand=False
+        )
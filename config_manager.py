@@ -3,14 +3,17 @@ Gerenciador de Configurações com Segurança Aprimorada - VERSÃO EXPANDIDA
 Inclui opção para baixar materiais complementares
 Parte 1/5 da refatoração
 """
+import atexit
 import json
 import os
+import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set, Tuple
 from cryptography.fernet import Fernet, InvalidToken
 import keyring
 from keyring.errors import KeyringError
 import logging
+from progress_store import ProgressStore, ProgressWriter, STATE_COMPLETED, AUDIT_OK
 
 logger = logging.getLogger(__name__)
 
@@ -107,7 +110,38 @@ class ConfigManager:
             "videoConfig": {
                 "pastaDownloads": str(Path.home() / "Downloads" / "Estrategia_Videos"),
                 "resolucaoEscolhida": "720p",
-                "baixarExtras": True  # ✅ NOVO: Baixar mapas mentais e resumos
+                "baixarExtras": True,  # ✅ NOVO: Baixar mapas mentais e resumos
+                "abasPorCurso": 1,     # Abas dividindo as aulas de um mesmo curso
+                "janelaPipeline": 2,   # Vídeos resolvidos à frente do que está baixando
+                "prazoHoras": 12,      # Prazo da resolução 'auto' para terminar a fila
+                "faststart": False,    # Move o 'moov' para o início dos MP4 baixados
+                "processosFaststart": 2  # Processos que reescrevem os MP4 em paralelo
+            },
+            "browserConfig": {
+                "bloquearRecursos": True,  # Bloqueia imagens, fontes, mídia e rastreadores
+                "tiposPermitidos": [
+                    "document", "script", "xhr", "fetch",
+                    "stylesheet", "websocket", "manifest", "other"
+                ],
+                "hostsBloqueados": [],     # Vazio = lista padrão de analytics
+                "hostsPermitidos": [],     # Vazio = qualquer domínio
+                "cursosParalelos": 1,      # Páginas processando cursos ao mesmo tempo
+                "limiteHeapMB": 512,       # Recicla a página acima deste heap JS (0 = desativado)
+                "reciclarACadaVideos": 100, # Recicla a página a cada N vídeos (0 = desativado)
+                "reiniciosNavegador": 3    # Reaberturas do navegador após travamento/queda
+            },
+            "syncConfig": {
+                "incremental": True,           # Pula aulas completas na última execução
+                "pastaManifestos": "manifests", # Manifestos por curso
+                "apenasNovidades": False,      # Baixa só aulas novas/alteradas no catálogo
+                "pastaCatalogo": "catalog",    # Snapshots do catálogo de cada curso
+                "intervaloGravacao": 1.0,      # Segundos entre gravações do progresso
+                "loteGravacao": 200            # Marcações que antecipam a gravação
+            },
+            "diskConfig": {
+                "reservaMB": 2048,             # Espaço que sempre fica livre no disco (0 = desativado)
+                "orcamentoPorCursoMB": 0,      # Máximo de MB por curso (0 = sem limite)
+                "reduzirResolucao": True       # Vídeo em resolução menor se não couber
             }
         }
     
@@ -313,97 +347,345 @@ class ConfigManager:
 
 
 class ProgressManager:
-    """Gerencia progresso de downloads"""
+    """
+    Gerencia progresso de downloads.
     
-    PROGRESS_FILE = Path("progress.json")
+    O progresso fica num banco SQLite (progress.db) com cursos, aulas e itens;
+    o antigo progress.json (e seu journal) é importado na primeira execução.
+    As escritas são acumuladas em memória e gravadas em lotes por uma thread
+    (ProgressWriter), fora do loop do asyncio.
+    """
     
-    def __init__(self):
-        """Inicializa o gerenciador de progresso"""
-        self.progress = self._load_progress()
+    DB_FILE = Path("progress.db")
+    PROGRESS_FILE = Path("progress.json")
+    JOURNAL_FILE = Path("progress.journal")
     
-    def _load_progress(self) -> Dict[str, bool]:
+    def __init__(self, flush_interval: float = 1.0, batch_size: int = 200):
         """
-        Carrega progresso do arquivo.
+        Inicializa o gerenciador de progresso.
         
-        Returns:
-            Dicionário de progresso
+        Args:
+            flush_interval: Segundos máximos entre gravações em lote
+            batch_size: Operações pendentes que antecipam a gravação
         """
-        try:
-            if self.PROGRESS_FILE.exists():
-                with open(self.PROGRESS_FILE, 'r', encoding='utf-8') as f:
-                    progress = json.load(f)
-                    logger.info(f"✓ Progresso carregado ({len(progress)} itens)")
-                    return progress
+        self.store = ProgressStore(self.DB_FILE)
         
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ Arquivo de progresso corrompido: {e}")
-            logger.info("⚠ Iniciando com progresso vazio")
+        # Importação única do formato antigo
+        if self.store.is_empty() and (self.PROGRESS_FILE.exists() or self.JOURNAL_FILE.exists()):
+            self.store.import_legacy(self.PROGRESS_FILE, self.JOURNAL_FILE)
         
-        except (OSError, IOError) as e:
-            logger.error(f"❌ Erro ao ler progresso: {e}")
+        # Nada é carregado na abertura: cada curso é lido na primeira consulta
+        logger.info(f"✓ Progresso aberto ({self.DB_FILE})")
+        self._courses: Dict[str, Set[str]] = {}
         
-        except Exception as e:
-            logger.error(f"❌ Erro inesperado ao carregar progresso: {e}", exc_info=True)
+        # Marcações ainda não gravadas (chave -> (sequência, valor); None = removida)
+        self._recent: Dict[str, Tuple[int, Any]] = {}
+        self.writer = ProgressWriter(self.DB_FILE, flush_interval, batch_size)
+        self._closed = False
+        atexit.register(self.close)
         
-        return {}
+        # Itens em download no momento (compartilhado entre abas/páginas)
+        self._in_flight: set = set()
     
-    def save_progress(self) -> None:
-        """Salva progresso no arquivo"""
-        try:
-            temp_file = self.PROGRESS_FILE.with_suffix('.tmp')
-            
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(self.progress, f, indent=2)
-            
-            temp_file.replace(self.PROGRESS_FILE)
-            
-            logger.debug(f"✓ Progresso salvo ({len(self.progress)} itens)")
+    def _submit(self, operation: tuple, key: Optional[str] = None, value: Any = None) -> None:
+        """
+        Enfileira uma escrita e, se for de um item, a mantém visível até ser gravada.
         
-        except (OSError, IOError) as e:
-            logger.error(f"❌ Erro ao salvar progresso: {e}")
+        Args:
+            operation: Operação de ProgressStore.apply()
+            key: Chave do item afetado (None = não altera a consulta de itens)
+            value: Novo valor do item (dados, True ou None se removido)
+        """
+        seq = self.writer.submit(operation)
+        if key is not None:
+            self._recent[key] = (seq, value)
+        
+        # Descarta marcações que já estão no banco
+        if len(self._recent) > self.writer.batch_size * 4:
+            flushed = self.writer.flushed_seq
+            self._recent = {k: v for k, v in self._recent.items() if v[0] > flushed}
+    
+    def flush(self, wait: bool = True) -> None:
+        """
+        Grava imediatamente as marcações pendentes (cancelamento, fim da execução).
         
-        except Exception as e:
-            logger.error(f"❌ Erro inesperado ao salvar progresso: {e}", exc_info=True)
+        Args:
+            wait: Se True, aguarda a gravação terminar
+        """
+        if not self._closed and not self.writer.flush(wait=wait):
+            logger.warning("⚠ Gravação de progresso não terminou a tempo")
+    
+    def close(self) -> None:
+        """Grava o pendente e fecha o banco (chamar ao encerrar a execução)"""
+        if self._closed:
+            return
+        self._closed = True
+        self.writer.close()
+        self.store.close()
+    
+    def log_stats(self, logger: logging.Logger) -> None:
+        """
+        Loga métricas de gravação do progresso.
+        
+        Args:
+            logger: Logger para output
+        """
+        self.writer.log_stats(logger)
+    
+    def _course_keys(self, course_id: str) -> Set[str]:
+        """
+        Chaves concluídas de um curso, lidas do banco na primeira consulta.
+        
+        Args:
+            course_id: ID do curso
+        
+        Returns:
+            Conjunto de chaves (internadas: a mesma string é compartilhada
+            entre cache, manifesto e processadores)
+        """
+        keys = self._courses.get(course_id)
+        if keys is None:
+            keys = {sys.intern(key) for key in self.store.completed_keys(course_id)}
+            self._courses[course_id] = keys
+            logger.debug(f"✓ Progresso do curso carregado ({len(keys)} itens)")
+        return keys
     
-    def is_completed(self, key: str) -> bool:
+    def release_course(self, course_id: str) -> None:
+        """
+        Descarta o cache de um curso já processado.
+        
+        Args:
+            course_id: ID do curso
+        """
+        self._courses.pop(course_id, None)
+    
+    def is_completed(self, key: str, course_id: Optional[str] = None) -> bool:
         """
         Verifica se item já foi baixado.
         
         Args:
             key: Chave única do item
+            course_id: Curso do item; se informado, consulta o cache do curso
+                       antes do banco
         
         Returns:
             True se já foi baixado
         """
-        return self.progress.get(key, False)
+        if key in self._recent:
+            return bool(self._recent[key][1])
+        if course_id and key in self._course_keys(course_id):
+            return True
+        # Registros antigos não têm curso: a chave primária resolve
+        return self.store.is_completed(key)
     
-    def mark_completed(self, key: str) -> None:
+    def get_info(self, key: str) -> Optional[dict]:
+        """
+        Obtém os dados gravados de um item baixado (caminho, tamanho, hash).
+        
+        Args:
+            key: Chave única do item
+        
+        Returns:
+            Dicionário do item ou None (não baixado ou registro antigo sem caminho)
+        """
+        if key in self._recent:
+            value = self._recent[key][1]
+            return value if isinstance(value, dict) and value.get("path") else None
+        
+        row = self.store.get_item(key)
+        if row is None or row["state"] != STATE_COMPLETED or not row["path"]:
+            return None
+        return {
+            "path": row["path"],
+            "size": row["size"],
+            "sha256": row["sha256"],
+            "completed_at": row["completed_at"]
+        }
+    
+    def mark_completed(
+        self,
+        key: str,
+        info: Optional[dict] = None,
+        course_id: Optional[str] = None
+    ) -> None:
         """
         Marca item como baixado.
         
         Args:
             key: Chave única do item
+            info: Dados do arquivo (caminho, tamanho, hash)
+            course_id: ID do curso do item
+        """
+        key = sys.intern(key)
+        self._submit(("mark_completed", key, info, course_id), key, info or True)
+        if course_id in self._courses:
+            self._courses[course_id].add(key)
+    
+    def mark_failed(self, key: str, error: str, course_id: Optional[str] = None) -> None:
+        """
+        Registra uma tentativa de download que falhou.
+        
+        Args:
+            key: Chave única do item
+            error: Mensagem do erro
+            course_id: ID do curso do item
+        """
+        self._submit(("mark_failed", key, error, course_id))
+    
+    def invalidate(self, key: str, reason: str) -> None:
+        """
+        Desfaz a conclusão de um item (arquivo ausente ou danificado).
+        
+        Args:
+            key: Chave única do item
+            reason: Motivo
+        """
+        self._submit(("invalidate", key, reason), key, None)
+        for keys in self._courses.values():
+            keys.discard(key)
+    
+    def record_audit(
+        self,
+        key: str,
+        path: str,
+        size: Optional[int],
+        mtime: Optional[float],
+        sha256: Optional[str],
+        result: str,
+        detail: Optional[str] = None
+    ) -> None:
+        """
+        Registra o resultado da auditoria de integridade de um item.
+        
+        Args:
+            key: Chave única do item
+            path: Caminho auditado
+            size: Tamanho do arquivo
+            mtime: Data de modificação do arquivo
+            sha256: Hash calculado (None se não foi lido)
+            result: Resultado (ver progress_store.AUDIT_*)
+            detail: Descrição do problema
+        """
+        self._submit(("record_audit", key, path, size, mtime, sha256, result, detail))
+        if sha256 and result == AUDIT_OK:
+            self._submit(("record_digest", key, sha256))
+    
+    def record_file(self, key: str, size: int, sha256: str) -> None:
+        """
+        Atualiza tamanho e hash de um item cujo arquivo foi reescrito (ex: faststart).
+        
+        Args:
+            key: Chave única do item
+            size: Novo tamanho do arquivo
+            sha256: Novo hash do conteúdo
+        """
+        info = self.get_info(key)
+        if info is not None:
+            self._submit(("record_file", key, size, sha256), key, {**info, "size": size, "sha256": sha256})
+        else:
+            self._submit(("record_file", key, size, sha256))
+    
+    def migrate_key(
+        self,
+        old_key: str,
+        new_key: str,
+        info: Optional[dict] = None,
+        course_id: Optional[str] = None
+    ) -> None:
+        """
+        Substitui uma chave antiga (baseada em título/posição) pela identidade estável.
+        
+        Args:
+            old_key: Chave antiga
+            new_key: Nova chave estável
+            info: Dados do arquivo (caminho, tamanho, hash)
+            course_id: ID do curso do item
+        """
+        self._submit(("rename_key", old_key, new_key), old_key, None)
+        for keys in self._courses.values():
+            keys.discard(old_key)
+        self.mark_completed(new_key, info, course_id)
+    
+    def record_course(self, course_id: str, url: Optional[str], title: Optional[str]) -> None:
+        """
+        Registra nome e URL de um curso.
+        
+        Args:
+            course_id: ID do curso
+            url: URL do curso
+            title: Nome do curso
+        """
+        self._submit(("record_course", course_id, url, title))
+    
+    def record_lesson(self, course_id: str, aula_id: str, title: str) -> None:
+        """
+        Registra o título atual de uma aula.
+        
+        Args:
+            course_id: ID do curso
+            aula_id: ID da aula
+            title: Título da aula
         """
-        self.progress[key] = True
-        self.save_progress()
+        self._submit(("record_lesson", course_id, aula_id, title))
+    
+    def try_claim(self, key: str) -> bool:
+        """
+        Reserva um item para download, evitando que duas abas baixem o mesmo arquivo.
+        
+        Args:
+            key: Chave única do item (ou caminho do arquivo)
+        
+        Returns:
+            True se a reserva foi obtida, False se outro worker já está baixando
+        """
+        if key in self._in_flight:
+            return False
+        self._in_flight.add(key)
+        return True
+    
+    def release(self, key: str) -> None:
+        """
+        Libera reserva feita com try_claim().
+        
+        Args:
+            key: Chave reservada
+        """
+        self._in_flight.discard(key)
     
     def clear(self) -> None:
         """Limpa todo o progresso"""
-        self.progress = {}
-        self.save_progress()
+        self._submit(("clear",))
+        self.flush()
+        self._recent = {}
+        self._courses = {}
         logger.info("✓ Progresso limpo")
     
-    def get_stats(self) -> dict:
+    def get_stats(self, course_id: Optional[str] = None) -> dict:
         """
         Obtém estatísticas de progresso.
         
+        Args:
+            course_id: Restringe a um curso (None = todos)
+        
         Returns:
-            Dicionário com estatísticas
+            Dicionário com total_items, completed, failed e bytes
         """
-        return {
-            "total_items": len(self.progress),
-            "completed": sum(1 for v in self.progress.values() if v)
-        }
+        self.flush()
+        return self.store.stats(course_id)
+    
+    def get_failed(self, since: float = 0, kind: Optional[str] = None) -> list:
+        """
+        Lista itens com falha ainda não resolvida.
+        
+        Args:
+            since: Timestamp Unix mínimo da última tentativa
+            kind: Tipo do item ('video', 'extra', 'pdf', 'legacy')
+        
+        Returns:
+            Lista de dicionários dos itens
+        """
+        self.flush()
+        return self.store.failed_items(since, kind)
 
 
 class CourseUrlManager:
@@ -0,0 +1,176 @@
+"""
+Manifesto de Curso (Sincronização Incremental)
+Guarda, por curso, as aulas e os itens vistos na última execução
+"""
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class CourseManifest:
+    """Aulas e itens de um curso num modo de download (pdf, video, combinado)"""
+    
+    def __init__(self, path: Path, course_id: str, mode: str, lessons: Optional[dict] = None):
+        """
+        Inicializa o manifesto.
+        
+        Args:
+            path: Arquivo JSON do manifesto
+            course_id: ID do curso
+            mode: Modo de download ao qual o manifesto se refere
+            lessons: Aulas carregadas do disco (aula_id -> {title, keys})
+        """
+        self.path = path
+        self.course_id = course_id
+        self.mode = mode
+        self.lessons: Dict[str, dict] = lessons or {}
+        
+        # Itens vistos nesta execução e aulas que tiveram erro
+        self._seen: Dict[str, Set[str]] = {}
+        self._failed: Set[str] = set()
+        self._dirty = False
+    
+    def can_skip_lesson(self, aula_id: str, title: str, progress_manager) -> bool:
+        """
+        Verifica se a aula pode ser pulada sem expandir nem clicar em nada.
+        
+        Args:
+            aula_id: ID da aula
+            title: Título atual da aula
+            progress_manager: Gerenciador de progresso
+        
+        Returns:
+            True se a aula não mudou e todos os seus itens já foram baixados
+        """
+        entry = self.lessons.get(aula_id)
+        
+        # Aula nova, renomeada ou sem itens conhecidos: precisa ser visitada
+        if not entry or entry.get("title") != title or not entry.get("keys"):
+            return False
+        
+        return all(progress_manager.is_completed(key, self.course_id) for key in entry["keys"])
+    
+    def track(self, aula_id: str, key: str) -> None:
+        """
+        Registra um item encontrado na aula durante esta execução.
+        
+        Args:
+            aula_id: ID da aula
+            key: Chave de progresso do item
+        """
+        self._seen.setdefault(aula_id, set()).add(key)
+    
+    def untrack(self, aula_id: str, key: str) -> None:
+        """
+        Remove um item opcional que se mostrou indisponível.
+        
+        Args:
+            aula_id: ID da aula
+            key: Chave de progresso do item
+        """
+        self._seen.get(aula_id, set()).discard(key)
+    
+    def mark_failed(self, aula_id: str) -> None:
+        """
+        Marca aula com erro de navegação (seus itens podem estar incompletos).
+        
+        Args:
+            aula_id: ID da aula
+        """
+        self._failed.add(aula_id)
+    
+    def record_lesson(self, aula_id: str, title: str) -> None:
+        """
+        Salva no manifesto os itens vistos numa aula visitada sem erros.
+        
+        Args:
+            aula_id: ID da aula
+            title: Título da aula
+        """
+        if aula_id in self._failed:
+            self.lessons.pop(aula_id, None)
+        else:
+            self.lessons[aula_id] = {
+                "title": title,
+                "keys": sorted(self._seen.get(aula_id, set()))
+            }
+        self._dirty = True
+    
+    def save(self) -> None:
+        """Grava o manifesto em disco (substituição atômica)"""
+        if not self._dirty:
+            return
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.path.with_suffix('.tmp')
+            
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "course_id": self.course_id,
+                    "mode": self.mode,
+                    "lessons": self.lessons
+                }, f, ensure_ascii=False)
+            
+            temp_file.replace(self.path)
+            self._dirty = False
+            logger.debug(f"✓ Manifesto salvo ({len(self.lessons)} aulas)")
+        
+        except (OSError, IOError) as e:
+            logger.error(f"❌ Erro ao salvar manifesto do curso: {e}")
+
+
+class ManifestManager:
+    """Abre e cria manifestos por curso num diretório"""
+    
+    MANIFEST_DIR = Path("manifests")
+    
+    def __init__(self, manifest_dir: Optional[Path] = None):
+        """
+        Inicializa o gerenciador de manifestos.
+        
+        Args:
+            manifest_dir: Diretório onde os manifestos são guardados
+        """
+        self.manifest_dir = Path(manifest_dir or self.MANIFEST_DIR)
+    
+    def _path_for(self, course_id: str, mode: str) -> Path:
+        """Arquivo do manifesto de um curso/modo"""
+        safe_id = re.sub(r'[^\w.-]', '_', course_id)[:120]
+        return self.manifest_dir / f"{safe_id}.{mode}.json"
+    
+    def open(self, course_id: str, mode: str) -> CourseManifest:
+        """
+        Carrega o manifesto de um curso (vazio se não existir ou estiver corrompido).
+        
+        Args:
+            course_id: ID do curso
+            mode: Modo de download
+        
+        Returns:
+            Manifesto do curso
+        """
+        path = self._path_for(course_id, mode)
+        lessons = {}
+        
+        try:
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    lessons = json.load(f).get("lessons", {})
+                
+                # Mesmas strings usadas pelo cache de progresso do curso
+                for entry in lessons.values():
+                    entry["keys"] = [sys.intern(key) for key in entry.get("keys", [])]
+        
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"⚠ Manifesto corrompido, ignorando: {path.name} ({e})")
+        
+        except (OSError, IOError) as e:
+            logger.error(f"❌ Erro ao ler manifesto: {e}")
+        
+        return CourseManifest(path, course_id, mode, lessons)
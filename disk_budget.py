@@ -0,0 +1,276 @@
+"""
+Controle de Espaço em Disco
+Admite cada download só se couber no disco (mantendo uma reserva livre) e no
+orçamento de bytes do curso; senão o segura até outros downloads terminarem
+"""
+import asyncio
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Set
+from utils import format_bytes
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Tamanho presumido quando o servidor não informa (melhor sobrar que faltar)
+DEFAULT_ESTIMATES = {
+    '.mp4': 400 * MB,
+    '.pdf': 20 * MB
+}
+FALLBACK_ESTIMATE = 50 * MB
+
+
+class DiskSpaceError(Exception):
+    """Download recusado por falta de espaço ou orçamento do curso esgotado"""
+    pass
+
+
+class Reservation:
+    """Bytes reservados para um download em andamento"""
+    
+    __slots__ = ('course_id', 'size', 'file_path')
+    
+    def __init__(self, course_id: Optional[str], size: int, file_path: Optional[Path] = None):
+        self.course_id = course_id
+        self.size = size
+        self.file_path = file_path
+    
+    def written(self) -> int:
+        """
+        Bytes do download já gravados no disco (.tmp ou arquivo final).
+        
+        Returns:
+            Bytes gravados (0 se nada foi gravado ainda)
+        """
+        if self.file_path is None:
+            return 0
+        for path in (self.file_path.with_suffix('.tmp'), self.file_path):
+            try:
+                return path.stat().st_size
+            except OSError:
+                continue
+        return 0
+    
+    def unwritten(self) -> int:
+        """Parte da reserva que ainda não aparece como espaço ocupado no disco"""
+        return max(0, self.size - self.written())
+
+
+class DiskAdmission:
+    """Controle de admissão dos downloads por espaço livre e orçamento por curso"""
+    
+    def __init__(self, progress_manager, reserve_mb: float = 2048, course_budget_mb: float = 0):
+        """
+        Inicializa o controle.
+        
+        Args:
+            progress_manager: Gerenciador de progresso (bytes já baixados por curso)
+            reserve_mb: Espaço que deve continuar livre no disco (MB)
+            course_budget_mb: Máximo de bytes por curso (MB, 0 = sem limite)
+        """
+        self.progress_manager = progress_manager
+        self.reserve = int(max(0.0, reserve_mb) * MB)
+        self.course_budget = int(max(0.0, course_budget_mb) * MB)
+        
+        # Bytes reservados por downloads admitidos e ainda não concluídos
+        self.in_flight = 0
+        self._course_in_flight: Dict[Optional[str], int] = {}
+        self._reservations: Set[Reservation] = set()
+        
+        # Bytes concluídos por curso (carregados do progresso na primeira consulta)
+        self._course_used: Dict[str, int] = {}
+        
+        # Criada no loop de eventos na primeira espera
+        self._released: Optional[asyncio.Condition] = None
+        
+        self.held = 0
+        self.refused = 0
+    
+    @staticmethod
+    def estimate(file_path: Path, expected_size: Optional[int]) -> int:
+        """
+        Tamanho a reservar para um download.
+        
+        Args:
+            file_path: Caminho de destino
+            expected_size: Tamanho informado pelo servidor (None se desconhecido)
+        
+        Returns:
+            Bytes a reservar
+        """
+        if expected_size:
+            return expected_size
+        return DEFAULT_ESTIMATES.get(Path(file_path).suffix.lower(), FALLBACK_ESTIMATE)
+    
+    @staticmethod
+    def free_space(file_path: Path) -> int:
+        """
+        Espaço livre no disco de destino (sobe até uma pasta que já exista).
+        
+        Args:
+            file_path: Caminho de destino
+        
+        Returns:
+            Bytes livres
+        """
+        folder = Path(file_path).resolve().parent
+        while not folder.exists() and folder != folder.parent:
+            folder = folder.parent
+        return shutil.disk_usage(folder).free
+    
+    def course_used(self, course_id: Optional[str]) -> int:
+        """
+        Bytes já concluídos de um curso.
+        
+        Args:
+            course_id: ID do curso
+        
+        Returns:
+            Bytes concluídos
+        """
+        if not course_id:
+            return 0
+        if course_id not in self._course_used:
+            self._course_used[course_id] = self.progress_manager.store.stats(course_id)["bytes"]
+        return self._course_used[course_id]
+    
+    def budget_left(self, course_id: Optional[str]) -> Optional[int]:
+        """
+        Bytes que o curso ainda pode usar.
+        
+        Args:
+            course_id: ID do curso
+        
+        Returns:
+            Bytes restantes ou None se não há orçamento
+        """
+        if not self.course_budget or not course_id:
+            return None
+        used = self.course_used(course_id) + self._course_in_flight.get(course_id, 0)
+        return self.course_budget - used
+    
+    def _budget_problem(self, course_id: Optional[str], size: int) -> Optional[str]:
+        """Motivo se o download não cabe no orçamento do curso"""
+        left = self.budget_left(course_id)
+        if left is not None and size > left:
+            return (
+                f"orçamento do curso esgotado ({format_bytes(max(0, left))} restantes, "
+                f"precisa de {format_bytes(size)})"
+            )
+        return None
+    
+    def _disk_problem(self, file_path: Path, size: int) -> Optional[str]:
+        """Motivo se o download não cabe no disco mantendo a reserva"""
+        # O que já foi gravado dos downloads em andamento já saiu do espaço livre
+        pending = sum(r.unwritten() for r in self._reservations)
+        available = self.free_space(file_path) - pending - self.reserve
+        if size > available:
+            return (
+                f"espaço insuficiente ({format_bytes(max(0, available))} disponíveis "
+                f"acima da reserva, precisa de {format_bytes(size)})"
+            )
+        return None
+    
+    def fits(self, course_id: Optional[str], file_path: Path, expected_size: Optional[int]) -> bool:
+        """
+        True se o download caberia agora (usado para escolher uma resolução menor).
+        
+        Args:
+            course_id: ID do curso
+            file_path: Caminho de destino
+            expected_size: Tamanho do arquivo (None = estimativa)
+        
+        Returns:
+            True se cabe no disco e no orçamento do curso
+        """
+        size = self.estimate(file_path, expected_size)
+        return not (self._budget_problem(course_id, size) or self._disk_problem(file_path, size))
+    
+    async def acquire(
+        self,
+        course_id: Optional[str],
+        file_path: Path,
+        expected_size: Optional[int]
+    ) -> Reservation:
+        """
+        Reserva espaço para um download, aguardando outros terminarem se preciso.
+        
+        O orçamento do curso não se libera esperando: se não couber, recusa na hora.
+        Falta de espaço aguarda enquanto houver downloads em andamento (os .tmp
+        deles podem falhar e liberar espaço); sem nenhum, recusa.
+        
+        Args:
+            course_id: ID do curso
+            file_path: Caminho de destino
+            expected_size: Tamanho informado pelo servidor (None = estimativa)
+        
+        Returns:
+            Reserva (devolver com release())
+        
+        Raises:
+            DiskSpaceError: Se o download não couber
+        """
+        size = self.estimate(file_path, expected_size)
+        
+        if self._released is None:
+            self._released = asyncio.Condition()
+        
+        async with self._released:
+            reason = self._budget_problem(course_id, size)
+            
+            if reason is None:
+                reason = self._disk_problem(file_path, size)
+                
+                if reason and self.in_flight:
+                    self.held += 1
+                    logger.info(f"⏸️  Download aguardando espaço: {Path(file_path).name} ({reason})")
+                    
+                    while reason and self.in_flight:
+                        await self._released.wait()
+                        reason = self._disk_problem(file_path, size)
+            
+            if reason:
+                self.refused += 1
+                logger.warning(f"💾 Download recusado: {Path(file_path).name} ({reason})")
+                raise DiskSpaceError(reason)
+            
+            self.in_flight += size
+            self._course_in_flight[course_id] = self._course_in_flight.get(course_id, 0) + size
+            reservation = Reservation(course_id, size, Path(file_path))
+            self._reservations.add(reservation)
+        
+        return reservation
+    
+    async def release(self, reservation: Optional[Reservation], written: int = 0) -> None:
+        """
+        Devolve a reserva de um download concluído ou que falhou.
+        
+        Args:
+            reservation: Reserva de acquire() (None = nada a devolver)
+            written: Bytes que ficaram no disco (0 se o download falhou)
+        """
+        if reservation is None:
+            return
+        
+        async with self._released:
+            self.in_flight -= reservation.size
+            self._reservations.discard(reservation)
+            course_id = reservation.course_id
+            self._course_in_flight[course_id] = self._course_in_flight.get(course_id, 0) - reservation.size
+            
+            if written and course_id:
+                self._course_used[course_id] = self.course_used(course_id) + written
+            
+            self._released.notify_all()
+    
+    def log_report(self, logger: logging.Logger) -> None:
+        """
+        Loga quantos downloads foram segurados ou recusados.
+        
+        Args:
+            logger: Logger de destino
+        """
+        if self.held or self.refused:
+            logger.info(f"💾 Espaço em disco: {self.held} download(s) aguardaram, {self.refused} recusado(s)")
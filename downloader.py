@@ -7,13 +7,23 @@ import logging
 import sys
 import asyncio
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, Dict, Set, Tuple
 from playwright.async_api import async_playwright, Error as PlaywrightError
 from config_manager import ConfigManager, ProgressManager, CourseUrlManager
-from auth import AuthManager
+from auth import AuthManager, SessionExpiredError
 from video_processor import VideoProcessor
 from pdf_processor import PDFProcessor
-from utils import setup_logger, PrintRedirector, DownloadMetrics
+from combined_processor import CombinedProcessor
+from base_processor import BaseCourseProcessor
+from request_filter import RequestFilter
+from course_manifest import ManifestManager
+from catalog import CatalogScanner, CatalogStore, CourseDelta, diff_catalog
+from page_monitor import PageStats
+from browser_supervisor import BrowserSupervisor, BrowserCrashedError
+from disk_budget import DiskAdmission
+from resolution_policy import ResolutionPolicy, AUTO_RESOLUTION
+from faststart import FaststartPool
+from utils import setup_logger, PrintRedirector, DownloadMetrics, extract_course_id
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +32,7 @@ class DownloadManager:
     """Gerenciador principal que orquestra todo o processo de download"""
     
     BROWSER_TIMEOUT = 30000  # ms
+    MAX_PARALLEL_COURSES = 4  # páginas simultâneas (limita memória do Chromium)
     
     def __init__(self, config_manager: ConfigManager, log_queue=None):
         """
@@ -32,12 +43,44 @@ class DownloadManager:
             log_queue: Fila para enviar logs para interface (opcional)
         """
         self.config = config_manager
-        self.progress = ProgressManager()
+        self.progress = ProgressManager(
+            flush_interval=self.config.get("syncConfig", "intervaloGravacao", default=1.0),
+            batch_size=self.config.get("syncConfig", "loteGravacao", default=200)
+        )
         self.url_manager = CourseUrlManager()
         self.log_queue = log_queue
         
         self._cancel_event = asyncio.Event()
         self.metrics = DownloadMetrics()
+        self.request_filter = RequestFilter.from_config(config_manager)
+        self.manifests = ManifestManager(
+            config_manager.get("syncConfig", "pastaManifestos", default=None)
+        )
+        self.catalog = CatalogStore(
+            config_manager.get("syncConfig", "pastaCatalogo", default=None)
+        )
+        self.catalog_report: Dict[str, str] = {}
+        self.auth: Optional[AuthManager] = None
+        
+        # Limite global de downloads e lock de login (criados no loop em start_downloads)
+        self.download_semaphore: Optional[asyncio.Semaphore] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+        self._auth_generation = 0
+        self._active_processors: Set[BaseCourseProcessor] = set()
+        
+        # Reciclagem de páginas: memória/latência agregadas e páginas substituídas
+        self.page_stats = PageStats()
+        self._page_replacements: Dict["Page", "Page"] = {}
+        
+        # Reabre o navegador se ele travar ou desconectar no meio da execução
+        self.supervisor: Optional[BrowserSupervisor] = None
+        
+        # Admissão dos downloads por espaço livre e orçamento por curso (criada em start_downloads)
+        self.disk_admission: Optional[DiskAdmission] = None
+        
+        # Resolução 'auto': vazão e fila compartilhadas por todos os cursos da execução
+        self.resolution_policy: Optional[ResolutionPolicy] = None
+        self.faststart: Optional[FaststartPool] = None
         
         # Configura logger
         global logger
@@ -51,6 +94,10 @@ class DownloadManager:
     def request_cancel(self) -> None:
         """Solicita cancelamento dos downloads em andamento (thread-safe)"""
         self._cancel_event.set()
+        for processor in list(self._active_processors):
+            processor.request_cancel()
+        # Grava já o que foi concluído até aqui
+        self.progress.flush(wait=False)
         logger.warning("⚠ Cancelamento solicitado pelo usuário")
     
     @property
@@ -92,59 +139,58 @@ class DownloadManager:
         logger.info(f"📚 Total de cursos na fila: {total_courses}")
         logger.info("")
         
+        # Primitivas compartilhadas pelas páginas do pool
+        self.download_semaphore = asyncio.Semaphore(BaseCourseProcessor.MAX_CONCURRENT_DOWNLOADS)
+        self._auth_lock = asyncio.Lock()
+        self.disk_admission = self._create_disk_admission()
+        self.resolution_policy = self._create_resolution_policy(total_courses)
+        self.faststart = self._create_faststart_pool()
+        
         # Inicia navegador
         playwright = None
-        context = None
         
         try:
             playwright = await async_playwright().start()
-            context = await self._launch_browser(playwright)
-            page = await context.new_page()
+            self.supervisor = BrowserSupervisor(
+                lambda: self._launch_browser(playwright),
+                self._perform_authentication,
+                max_relaunches=self._get_max_relaunches()
+            )
+            await self.supervisor.start()
+            page = await self.supervisor.new_page()
             
             # Faz login
             await self._perform_authentication(page)
             
-            # Processa cada curso
-            success_count = 0
-            failed_count = 0
+            # ✅ NOVO: Pool de páginas para processar cursos em paralelo
+            pool_size = self._get_pool_size(total_courses)
+            pages = [page]
+            for _ in range(pool_size - 1):
+                pages.append(await self.supervisor.new_page())
+            
+            if pool_size > 1:
+                logger.info(f"🗂️  Processando {pool_size} cursos em paralelo")
             
+            # Fila compartilhada de cursos e resultados por índice
+            course_queue: asyncio.Queue = asyncio.Queue()
             for i, course_url in enumerate(course_urls, 1):
-                if self.cancel_requested:
-                    logger.warning("❌ Downloads cancelados pelo usuário")
-                    break
-                
-                logger.info("")
-                logger.info("=" * 70)
-                logger.info(f"📖 Processando curso {i}/{total_courses}")
-                logger.info("=" * 70)
-                logger.info(f"🔗 URL: {course_url}")
-                logger.info("")
-                
-                # Processa o curso
-                try:
-                    success = await self._process_course(page, course_url)
-                    
-                    if success:
-                        success_count += 1
-                        logger.info(f"✅ Curso {i}/{total_courses} processado com sucesso!")
-                    else:
-                        failed_count += 1
-                        logger.error(f"❌ Curso {i}/{total_courses} falhou")
-                
-                except asyncio.CancelledError:
-                    logger.warning("⚠ Processamento cancelado")
-                    break
-                
-                except Exception as e:
-                    logger.error(f"❌ Erro ao processar curso {i}: {e}", exc_info=True)
-                    failed_count += 1
-                
-                # Atualiza callback de progresso
-                if progress_callback:
-                    try:
-                        progress_callback(i / total_courses)
-                    except Exception as e:
-                        logger.warning(f"⚠ Erro no callback de progresso: {e}")
+                course_queue.put_nowait((i, course_url))
+            
+            results: Dict[int, bool] = {}
+            
+            await asyncio.gather(*(
+                self._course_worker(worker_id, worker_page, course_queue, results,
+                                    total_courses, progress_callback)
+                for worker_id, worker_page in enumerate(pages, 1)
+            ))
+            
+            if self.cancel_requested:
+                logger.warning("❌ Downloads cancelados pelo usuário")
+            elif self.faststart is not None:
+                await self.faststart.drain()
+            
+            success_count = sum(1 for ok in results.values() if ok)
+            failed_count = sum(1 for ok in results.values() if not ok)
             
             # Relatório final
             logger.info("")
@@ -156,8 +202,24 @@ class DownloadManager:
             logger.info(f"📚 Total de cursos: {total_courses}")
             logger.info("=" * 70)
             
+            # Novidades por curso (modo apenasNovidades)
+            if self.catalog_report:
+                logger.info("🔎 Novidades por curso:")
+                for course_url, summary in self.catalog_report.items():
+                    logger.info(f"   {course_url}: {summary}")
+                logger.info("=" * 70)
+            
             # Estatísticas de download
             self.metrics.log_stats(logger)
+            self.request_filter.log_stats(logger)
+            self.page_stats.log_report(logger)
+            self.progress.log_stats(logger)
+            if self.disk_admission is not None:
+                self.disk_admission.log_report(logger)
+            if self.resolution_policy is not None:
+                self.resolution_policy.log_report(logger)
+            if self.faststart is not None:
+                self.faststart.log_report(logger)
             
             logger.info("=" * 70)
             logger.info("✅ PROCESSO FINALIZADO")
@@ -179,10 +241,10 @@ class DownloadManager:
         
         finally:
             # Cleanup
-            if context:
+            if self.supervisor and self.supervisor.context:
                 logger.info("🔒 Fechando navegador...")
                 try:
-                    await context.close()
+                    await self.supervisor.close()
                 except Exception as e:
                     logger.warning(f"⚠ Erro ao fechar contexto: {e}")
             
@@ -192,8 +254,123 @@ class DownloadManager:
                 except Exception as e:
                     logger.warning(f"⚠ Erro ao parar playwright: {e}")
             
+            # Reescritas em andamento terminam antes de o progresso ser fechado
+            if self.faststart is not None:
+                await asyncio.to_thread(self.faststart.close)
+            
+            # Encerra a thread de gravação e grava no SQLite o progresso pendente
+            self.progress.close()
+            
             logger.info("✓ Recursos liberados")
     
+    def _get_pool_size(self, total_courses: int) -> int:
+        """
+        Define quantas páginas processam cursos simultaneamente.
+        
+        Args:
+            total_courses: Total de cursos na fila
+        
+        Returns:
+            Tamanho do pool (entre 1 e MAX_PARALLEL_COURSES)
+        """
+        try:
+            requested = int(self.config.get("browserConfig", "cursosParalelos", default=1))
+        except (TypeError, ValueError):
+            logger.warning("⚠ Valor inválido para cursosParalelos, usando 1")
+            requested = 1
+        
+        if requested > self.MAX_PARALLEL_COURSES:
+            logger.warning(
+                f"⚠ cursosParalelos limitado a {self.MAX_PARALLEL_COURSES} para conter uso de memória"
+            )
+        
+        return max(1, min(requested, self.MAX_PARALLEL_COURSES, total_courses))
+    
+    def _get_max_relaunches(self) -> int:
+        """
+        Lê quantas vezes o navegador pode ser reaberto na execução.
+        
+        Returns:
+            Máximo de reinícios (0 desativa a recuperação)
+        """
+        try:
+            return max(0, int(self.config.get("browserConfig", "reiniciosNavegador", default=3)))
+        except (TypeError, ValueError):
+            logger.warning("⚠ Valor inválido para reiniciosNavegador, usando 3")
+            return 3
+    
+    async def _course_worker(
+        self,
+        worker_id: int,
+        page: "Page",
+        course_queue: asyncio.Queue,
+        results: Dict[int, bool],
+        total_courses: int,
+        progress_callback: Optional[Callable[[float], None]]
+    ) -> None:
+        """
+        Consome cursos da fila compartilhada usando uma página própria.
+        
+        Args:
+            worker_id: Número da página no pool
+            page: Página do Playwright dedicada a este worker
+            course_queue: Fila de (índice, url) pendentes
+            results: Resultados por índice do curso (preenchido aqui)
+            total_courses: Total de cursos (para o progresso)
+            progress_callback: Callback de progresso geral (opcional)
+        """
+        while not self.cancel_requested:
+            try:
+                i, course_url = course_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            logger.info("")
+            logger.info("=" * 70)
+            logger.info(f"📖 Processando curso {i}/{total_courses} [página {worker_id}]")
+            logger.info("=" * 70)
+            logger.info(f"🔗 URL: {course_url}")
+            logger.info("")
+            
+            # Processa o curso (a página pode ser reciclada ou recriada após queda)
+            try:
+                success, page = await self._process_course_supervised(page, i, course_url)
+                results[i] = success
+                
+                if success:
+                    logger.info(f"✅ Curso {i}/{total_courses} processado com sucesso!")
+                else:
+                    logger.error(f"❌ Curso {i}/{total_courses} falhou")
+            
+            except asyncio.CancelledError:
+                logger.warning("⚠ Processamento cancelado")
+                return
+            
+            except BrowserCrashedError as e:
+                logger.error(f"❌ Navegador irrecuperável no curso {i}: {e}")
+                results[i] = False
+                
+                # Sem navegador, os cursos ainda na fila também falharam
+                while True:
+                    try:
+                        pending, pending_url = course_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    logger.error(f"❌ Curso {pending}/{total_courses} não processado (navegador indisponível): {pending_url}")
+                    results[pending] = False
+                return
+            
+            except Exception as e:
+                logger.error(f"❌ Erro ao processar curso {i}: {e}", exc_info=True)
+                results[i] = False
+            
+            # Atualiza callback de progresso
+            if progress_callback:
+                try:
+                    progress_callback(len(results) / total_courses)
+                except Exception as e:
+                    logger.warning(f"⚠ Erro no callback de progresso: {e}")
+    
     async def _health_check(self) -> bool:
         """
         Verifica se sistema está pronto para download.
@@ -294,15 +471,19 @@ class DownloadManager:
             context = await playwright.chromium.launch_persistent_context(
                 user_data_dir=str(cache_dir),
                 headless=headless,
+                accept_downloads=True,  # Materiais que só baixam via clique
                 args=[
                     '--no-sandbox',
                     '--disable-setuid-sandbox',
                     '--disable-blink-features=AutomationControlled',
                     '--disable-dev-shm-usage',
                 ],
-                timeout=self.BROWSER_TIMEOUT
+                timeout=self.BROWSER_TIMEOUT
             )
             
+            # Bloqueia imagens, fontes, mídia e rastreadores
+            await self.request_filter.install(context)
+            
             logger.info("✓ Navegador iniciado com sucesso")
             return context
         
@@ -323,12 +504,13 @@ class DownloadManager:
             logger.error(f"❌ Erro inesperado ao iniciar navegador: {e}", exc_info=True)
             raise
     
-    async def _perform_authentication(self, page: "Page") -> None:
+    async def _perform_authentication(self, page: "Page", allow_fast_path: bool = True) -> None:
         """
         Realiza autenticação na plataforma.
         
         Args:
             page: Página do Playwright
+            allow_fast_path: Se True, reaproveita sessão salva quando válida
         
         Raises:
             Exception: Se autenticação falhar
@@ -342,8 +524,9 @@ class DownloadManager:
         logger.info("🔐 Iniciando processo de autenticação...")
         
         try:
-            auth = AuthManager(email, password)
-            await auth.ensure_logged_in(page)
+            if self.auth is None:
+                self.auth = AuthManager(email, password)
+            await self.auth.ensure_logged_in(page, allow_fast_path=allow_fast_path)
             logger.info("✓ Autenticação concluída com sucesso")
         
         except ValueError as e:
@@ -355,6 +538,79 @@ class DownloadManager:
             logger.info("   Verifique suas credenciais em: Configurações")
             raise
     
+    async def _process_course_supervised(
+        self,
+        page: "Page",
+        course_index: int,
+        course_url: str
+    ) -> Tuple[bool, "Page"]:
+        """
+        Processa curso reabrindo o navegador e retomando do cursor se ele cair.
+        
+        Args:
+            page: Página do Playwright dedicada ao worker
+            course_index: Índice do curso na fila (para o log)
+            course_url: URL do curso
+        
+        Returns:
+            Tupla (sucesso, página a usar no próximo curso)
+        
+        Raises:
+            BrowserCrashedError: Se o limite de reinícios foi atingido
+        """
+        while True:
+            # A página pode ser de um navegador que outro worker já reiniciou
+            page = await self.supervisor.ensure_page(page)
+            generation = self.supervisor.generation
+            
+            try:
+                success = await self._process_course_with_reauth(page, course_url)
+                self.supervisor.finish_course(course_url)
+                self.progress.release_course(extract_course_id(course_url))
+                
+                # A página pode ter sido reciclada durante o curso
+                return success, self._current_page(page, consume=True)
+            
+            except BrowserCrashedError as e:
+                # Páginas do navegador perdido não servem mais
+                self._current_page(page, consume=True)
+                
+                if self.cancel_requested:
+                    raise asyncio.CancelledError("Processamento cancelado pelo usuário")
+                
+                logger.warning(f"💥 Navegador perdido no curso {course_index}: {e}")
+                await self.supervisor.recover(generation)
+                page = await self.supervisor.new_page()
+                
+                cursor = self.supervisor.cursor_for(course_url)
+                logger.info(f"🔁 Retomando curso {course_index} ({cursor.describe()})")
+    
+    async def _process_course_with_reauth(self, page: "Page", course_url: str) -> bool:
+        """
+        Processa curso refazendo o login uma vez se a sessão salva tiver expirado.
+        
+        Args:
+            page: Página do Playwright
+            course_url: URL do curso
+        
+        Returns:
+            True se processado com sucesso
+        """
+        try:
+            return await self._process_course(page, course_url)
+        
+        except SessionExpiredError:
+            # Várias páginas podem detectar a expiração ao mesmo tempo: um login por vez
+            generation = self._auth_generation
+            async with self._auth_lock:
+                if generation == self._auth_generation:
+                    logger.warning("⚠ Sessão expirada. Refazendo login...")
+                    if self.auth:
+                        self.auth.invalidate_session()
+                    await self._perform_authentication(self._current_page(page), allow_fast_path=False)
+                    self._auth_generation += 1
+            return await self._process_course(self._current_page(page), course_url)
+    
     async def _process_course(self, page: "Page", course_url: str) -> bool:
         """
         Processa um curso específico usando o processador apropriado.
@@ -369,38 +625,64 @@ class DownloadManager:
         download_type = self.config.config.get("downloadType", "pdf")
         
         try:
-            # Cria processador apropriado
+            # ✅ DETECÇÃO DE NOVIDADES: compara o catálogo do curso com o último snapshot
+            snapshot = None
+            lesson_filter = None
+            if self.config.get("syncConfig", "apenasNovidades", default=False):
+                snapshot, delta = await self._scan_catalog(page, course_url)
+                
+                if not delta.has_changes:
+                    logger.info("⏭️  Curso sem novidades desde a última sincronização")
+                    self.catalog.save(extract_course_id(course_url), snapshot)
+                    return True
+                
+                if not delta.first_scan:
+                    lesson_filter = delta.lesson_ids
+            
+            # Cria processador apropriado (o modo identifica o manifesto do curso)
             if download_type == "pdf":
-                processor = self._create_pdf_processor()
+                pdf_type = self.config.get("pdfConfig", "pdfType", default=2)
+                
+                # Extras dos vídeos junto com os PDFs: uma única navegação pelo curso
+                if self.config.get("pdfConfig", "baixarExtrasComPdf", default=False):
+                    processor = self._create_combined_processor()
+                    mode = f"pdf{pdf_type}-extras"
+                else:
+                    processor = self._create_pdf_processor()
+                    mode = f"pdf{pdf_type}"
             else:
                 processor = self._create_video_processor()
+                mode = "video-extras" if processor.download_extras else "video"
             
-            # Propaga cancelamento para o processador
-            if self.cancel_requested:
-                processor.request_cancel()
+            processor.lesson_filter = lesson_filter
+            
+            # ✅ RECUPERAÇÃO: queda do navegador interrompe o curso e a retomada parte do cursor
+            if self.supervisor is not None:
+                processor.browser_lost = self.supervisor.lost
+                processor.cursor = self.supervisor.cursor_for(course_url)
+            
+            processor.disk_admission = self.disk_admission
+            
+            # ✅ SYNC INCREMENTAL: aulas completas na última execução são puladas
+            manifest = None
+            if self.config.get("syncConfig", "incremental", default=True):
+                manifest = self.manifests.open(extract_course_id(course_url), mode)
+                processor.attach_manifest(manifest)
             
             # Processa o curso
-            success = await processor.process_course(page, course_url)
+            try:
+                success = await self._run_processor(processor, page, course_url)
+            finally:
+                if manifest is not None:
+                    manifest.save()
             
-            # ✅ NOVA LÓGICA: Se for tipo PDF e tiver opção de baixar extras de vídeo habilitada
-            if success and download_type == "pdf":
-                baixar_extras = self.config.get("pdfConfig", "baixarExtrasComPdf", default=False)
-                
-                if baixar_extras:
-                    logger.info("")
-                    logger.info("🎬 Iniciando download de materiais complementares dos vídeos...")
-                    logger.info("(Mapas Mentais, Resumos e Slides)")
-                    logger.info("-" * 50)
-                    
-                    # Cria processador de vídeo em modo "skip_video"
-                    video_processor = self._create_video_processor_for_extras()
-                    
-                    # Propaga cancelamento
-                    if self.cancel_requested:
-                        video_processor.request_cancel()
-                    
-                    # Executa
-                    await video_processor.process_course(page, course_url)
+            # Snapshot só avança se o curso foi processado (senão as novidades voltam na próxima);
+            # aulas com falha ficam marcadas para serem visitadas de novo
+            if success and snapshot is not None:
+                for aula_id in processor.incomplete_lessons:
+                    if aula_id in snapshot["lessons"]:
+                        snapshot["lessons"][aula_id]["incomplete"] = True
+                self.catalog.save(extract_course_id(course_url), snapshot)
             
             return success
         
@@ -408,10 +690,87 @@ class DownloadManager:
             logger.warning("⚠ Processamento cancelado")
             return False
         
+        except (SessionExpiredError, BrowserCrashedError):
+            raise
+        
         except Exception as e:
+            if self.supervisor is not None and self.supervisor.is_crash(e):
+                raise BrowserCrashedError(str(e)) from e
             logger.error(f"❌ Erro ao processar curso: {e}", exc_info=True)
             return False
     
+    async def _scan_catalog(self, page: "Page", course_url: str) -> Tuple[dict, CourseDelta]:
+        """
+        Lê o catálogo atual do curso e compara com o snapshot salvo.
+        
+        Args:
+            page: Página do Playwright (fica no curso para o processador)
+            course_url: URL do curso
+        
+        Returns:
+            Tupla (snapshot_atual, diferenças)
+        """
+        download_type = self.config.config.get("downloadType", "pdf")
+        scanner = CatalogScanner(
+            Path(self.config.get(f"{download_type}Config", "pastaDownloads", default=".")),
+            self.progress,
+            self.log_queue
+        )
+        
+        snapshot = await scanner.scan(page, course_url)
+        delta = diff_catalog(self.catalog.load(extract_course_id(course_url)), snapshot)
+        
+        titles = {aula_id: lesson["title"] for aula_id, lesson in snapshot["lessons"].items()}
+        delta.log_report(logger, titles)
+        self.catalog_report[course_url] = delta.summary()
+        
+        return snapshot, delta
+    
+    async def _run_processor(
+        self,
+        processor: BaseCourseProcessor,
+        page: "Page",
+        course_url: str
+    ) -> bool:
+        """
+        Executa processador registrando-o para receber cancelamentos.
+        
+        Args:
+            processor: Processador do curso
+            page: Página do Playwright
+            course_url: URL do curso
+        
+        Returns:
+            Resultado de processor.process_course()
+        """
+        self._active_processors.add(processor)
+        
+        # Propaga cancelamento para o processador
+        if self.cancel_requested:
+            processor.request_cancel()
+        
+        try:
+            return await processor.process_course(page, course_url)
+        finally:
+            self._active_processors.discard(processor)
+            if processor.replaced_page is not None:
+                self._page_replacements[page] = processor.replaced_page
+    
+    def _current_page(self, page: "Page", consume: bool = False) -> "Page":
+        """
+        Segue a cadeia de substituições de uma página reciclada.
+        
+        Args:
+            page: Página original do worker
+            consume: Remove as substituições seguidas (o worker passa a usar a nova)
+        
+        Returns:
+            Página atual
+        """
+        while page in self._page_replacements:
+            page = self._page_replacements.pop(page) if consume else self._page_replacements[page]
+        return page
+    
     def _create_pdf_processor(self) -> PDFProcessor:
         """
         Cria processador de PDF com configurações do usuário.
@@ -428,7 +787,8 @@ class DownloadManager:
             base_dir=base_dir,
             progress_manager=self.progress,
             pdf_type=pdf_type,
-            log_queue=self.log_queue  # ✅ Passa fila de logs
+            log_queue=self.log_queue,  # ✅ Passa fila de logs
+            download_semaphore=self.download_semaphore
         )
     
     def _create_video_processor(self) -> VideoProcessor:
@@ -443,6 +803,9 @@ class DownloadManager:
         
         # ✅ NOVA CONFIGURAÇÃO: Suporte a baixar extras
         download_extras = self.config.get("videoConfig", "baixarExtras", default=True)
+        lesson_tabs = self.config.get("videoConfig", "abasPorCurso", default=1)
+        pipeline_window = self.config.get("videoConfig", "janelaPipeline", default=2)
+        heap_limit_mb, recycle_every = self._get_recycle_limits()
         
         logger.info(f"🎥 Criando processador de vídeo")
         logger.info(f"   Resolução: {resolution}")
@@ -454,28 +817,134 @@ class DownloadManager:
             preferred_resolution=resolution,
             download_extras=download_extras,  # ✅ Passa configuração para o processador
             skip_video=False,
-            log_queue=self.log_queue  # ✅ Passa fila de logs
+            log_queue=self.log_queue,  # ✅ Passa fila de logs
+            download_semaphore=self.download_semaphore,
+            lesson_tabs=lesson_tabs,
+            pipeline_window=pipeline_window,
+            heap_limit_mb=heap_limit_mb,
+            recycle_every=recycle_every,
+            page_stats=self.page_stats,
+            reduce_resolution=self.config.get("diskConfig", "reduzirResolucao", default=True),
+            resolution_policy=self.resolution_policy,
+            faststart=self.faststart
         )
 
-    def _create_video_processor_for_extras(self) -> VideoProcessor:
+    def _create_combined_processor(self) -> CombinedProcessor:
         """
-        Cria processador de vídeo configurado APENAS para baixar extras.
+        Cria processador que baixa PDFs e extras dos vídeos na mesma passada.
         Usa a pasta de PDFs como destino para manter tudo junto.
+        
+        Returns:
+            Instância configurada de CombinedProcessor
         """
-        # Usa a pasta de PDFs como base, já que é um complemento ao download de PDFs
         base_dir = Path(self.config.get("pdfConfig", "pastaDownloads"))
+        pdf_type = self.config.get("pdfConfig", "pdfType", default=2)
+        pipeline_window = self.config.get("videoConfig", "janelaPipeline", default=2)
+        heap_limit_mb, recycle_every = self._get_recycle_limits()
         
-        logger.info(f"🎥 Criando processador auxiliar para Materiais Extras")
+        logger.info(f"📦 Criando processador de PDF + Materiais Extras (tipo: {pdf_type})")
         logger.info(f"   Destino: {base_dir}")
         
-        return VideoProcessor(
+        return CombinedProcessor(
             base_dir=base_dir,
             progress_manager=self.progress,
-            preferred_resolution='360p', # Irrelevante pois não vai baixar vídeo
-            download_extras=True,
-            skip_video=True, # ✅ MODO IMPORTANTE: Pula download de vídeo
-            log_queue=self.log_queue  # ✅ Passa fila de logs
+            pdf_type=pdf_type,
+            log_queue=self.log_queue,
+            download_semaphore=self.download_semaphore,
+            pipeline_window=pipeline_window,
+            heap_limit_mb=heap_limit_mb,
+            recycle_every=recycle_every,
+            page_stats=self.page_stats
         )
+    
+    def _get_recycle_limits(self) -> Tuple[float, int]:
+        """
+        Lê os limites de reciclagem de página da configuração.
+        
+        Returns:
+            Tupla (heap_limit_mb, recycle_every); 0 desativa o critério
+        """
+        try:
+            heap_limit_mb = float(self.config.get("browserConfig", "limiteHeapMB", default=512))
+            recycle_every = int(self.config.get("browserConfig", "reciclarACadaVideos", default=100))
+        except (TypeError, ValueError):
+            logger.warning("⚠ Limites de reciclagem inválidos, usando padrões")
+            heap_limit_mb, recycle_every = 512.0, 100
+        
+        return max(0.0, heap_limit_mb), max(0, recycle_every)
+    
+    def _create_resolution_policy(self, total_courses: int) -> Optional[ResolutionPolicy]:
+        """
+        Cria a política de resolução automática se 'resolucaoEscolhida' for 'auto'.
+        
+        Args:
+            total_courses: Cursos na fila desta execução
+        
+        Returns:
+            ResolutionPolicy ou None (resolução fixa ou download de PDFs)
+        """
+        if self.config.config.get("downloadType", "pdf") == "pdf":
+            return None
+        if self.config.get("videoConfig", "resolucaoEscolhida", default="720p") != AUTO_RESOLUTION:
+            return None
+        
+        try:
+            deadline_hours = float(self.config.get("videoConfig", "prazoHoras", default=12))
+        except (TypeError, ValueError):
+            logger.warning("⚠ Prazo da resolução automática inválido, usando 12h")
+            deadline_hours = 12.0
+        
+        logger.info(f"🎚️  Resolução automática: fila estimada deve terminar em {deadline_hours:g}h")
+        
+        return ResolutionPolicy(
+            VideoProcessor.AVAILABLE_RESOLUTIONS,
+            deadline_hours=deadline_hours,
+            pending_courses=total_courses
+        )
+    
+    def _create_faststart_pool(self) -> Optional[FaststartPool]:
+        """
+        Cria o pool de faststart se 'faststart' estiver ativo no download de vídeos.
+        
+        Returns:
+            FaststartPool ou None (desativado ou download de PDFs)
+        """
+        if self.config.config.get("downloadType", "pdf") == "pdf":
+            return None
+        if not self.config.get("videoConfig", "faststart", default=False):
+            return None
+        
+        try:
+            processes = int(self.config.get("videoConfig", "processosFaststart", default=2))
+        except (TypeError, ValueError):
+            logger.warning("⚠ Valor inválido para processosFaststart, usando 2")
+            processes = 2
+        
+        logger.info(f"⏩ Faststart ativo: 'moov' movido para o início dos vídeos ({processes} processo(s))")
+        
+        return FaststartPool(self.progress, processes=processes)
+    
+    def _create_disk_admission(self) -> Optional[DiskAdmission]:
+        """
+        Cria o controle de espaço em disco a partir da configuração.
+        
+        Returns:
+            DiskAdmission ou None se desativado (reserva e orçamento zerados)
+        """
+        try:
+            reserve_mb = float(self.config.get("diskConfig", "reservaMB", default=2048))
+            budget_mb = float(self.config.get("diskConfig", "orcamentoPorCursoMB", default=0))
+        except (TypeError, ValueError):
+            logger.warning("⚠ Limites de espaço em disco inválidos, usando padrões")
+            reserve_mb, budget_mb = 2048.0, 0.0
+        
+        if reserve_mb <= 0 and budget_mb <= 0:
+            return None
+        
+        if budget_mb > 0:
+            logger.info(f"💾 Orçamento por curso: {budget_mb:.0f} MB (reserva livre: {reserve_mb:.0f} MB)")
+        
+        return DiskAdmission(self.progress, reserve_mb=reserve_mb, course_budget_mb=budget_mb)
 
 
 # Função auxiliar para uso standalone (linha de comando)
@@ -0,0 +1,517 @@
+"""
+Faststart de MP4
+Move a caixa 'moov' para antes de 'mdat' e corrige os offsets dos chunks (stco/co64),
+para o vídeo começar a tocar sem ler o fim do arquivo (ex: NAS via SMB).
+Cópia em blocos (memória limitada ao tamanho do 'moov'), sem binários externos,
+em processos separados para não atrasar os downloads
+
+Uso:
+    python faststart.py              # Otimiza os MP4 concluídos no progresso
+    python faststart.py --pasta DIR  # Otimiza os MP4 de uma pasta
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import struct
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from utils import format_bytes, setup_logger
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 4 * 1024 * 1024   # Blocos da cópia de 'mdat'
+MAX_MOOV_SIZE = 256 * 1024 * 1024   # 'moov' é lido inteiro na memória
+PENDING_PER_WORKER = 4              # Tarefas enfileiradas por processo (CLI)
+UINT32_MAX = 0xFFFFFFFF
+
+# Caixas de 'moov' que contêm a tabela de offsets dos chunks (moov/trak/mdia/minf/stbl/stco)
+CONTAINER_BOXES = frozenset({b'moov', b'trak', b'mdia', b'minf', b'stbl'})
+
+
+class FaststartError(Exception):
+    """MP4 que não pode ser reorganizado (estrutura inesperada ou falta de espaço)"""
+    pass
+
+
+def _top_level_boxes(f, size: int) -> List[Tuple[bytes, int, int]]:
+    """
+    Lista as caixas de nível superior do arquivo.
+    
+    Args:
+        f: Arquivo aberto em modo binário
+        size: Tamanho do arquivo
+    
+    Returns:
+        Lista de (tipo, offset, tamanho)
+    
+    Raises:
+        FaststartError: Se os tamanhos das caixas forem incoerentes
+    """
+    boxes = []
+    offset = 0
+    
+    while offset < size:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            raise FaststartError("MP4 truncado (cabeçalho de caixa incompleto)")
+        
+        box_size, box_type = struct.unpack('>I4s', header)
+        if box_size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                raise FaststartError("MP4 truncado (caixa de 64 bits incompleta)")
+            box_size = struct.unpack('>Q', large)[0]
+        elif box_size == 0:
+            box_size = size - offset  # Caixa vai até o fim do arquivo
+        
+        if box_size < 8 or offset + box_size > size:
+            raise FaststartError(f"MP4 inválido (caixa '{box_type.decode('latin-1')}')")
+        
+        boxes.append((box_type, offset, box_size))
+        offset += box_size
+    
+    return boxes
+
+
+def _box_header(box_type: bytes, payload_size: int) -> bytes:
+    """Cabeçalho de caixa (32 bits ou 64 bits se não couber)"""
+    if payload_size + 8 <= UINT32_MAX:
+        return struct.pack('>I4s', payload_size + 8, box_type)
+    return struct.pack('>I4sQ', 1, box_type, payload_size + 16)
+
+
+def _moved_offset(offset: int, layout: Tuple[int, int, int], new_size: int) -> int:
+    """
+    Posição de um byte do arquivo original depois da reorganização.
+    
+    Args:
+        offset: Posição no arquivo original
+        layout: (posição de inserção, offset do 'moov' original, tamanho do 'moov' original)
+        new_size: Tamanho do novo 'moov'
+    
+    Returns:
+        Posição no arquivo reorganizado
+    """
+    insert_at, moov_offset, moov_size = layout
+    if offset < insert_at:
+        return offset
+    if offset < moov_offset:
+        return offset + new_size  # Entre o primeiro 'mdat' e o 'moov': avança o novo 'moov'
+    # Depois do 'moov' original: o novo entra na frente, o antigo sai
+    return offset + new_size - moov_size
+
+
+def _patch_boxes(data: bytes, layout: Tuple[int, int, int], new_size: int, to_co64: bool) -> bytes:
+    """
+    Reconstrói uma sequência de caixas de 'moov' com os offsets dos chunks corrigidos.
+    
+    Args:
+        data: Conteúdo das caixas
+        layout: (posição de inserção, offset do 'moov' original, tamanho do 'moov' original)
+        new_size: Tamanho do novo 'moov'
+        to_co64: Converte 'stco' (32 bits) em 'co64' (64 bits)
+    
+    Returns:
+        Caixas reconstruídas
+    
+    Raises:
+        OverflowError: Se um offset não couber em 'stco' e to_co64 for False
+        FaststartError: Se a estrutura for inválida
+    """
+    parts = []
+    offset = 0
+    
+    while offset < len(data):
+        if len(data) - offset < 8:
+            raise FaststartError("'moov' inválido (cabeçalho de caixa incompleto)")
+        
+        box_size, box_type = struct.unpack_from('>I4s', data, offset)
+        header_size = 8
+        if box_size == 1:
+            if len(data) - offset < 16:
+                raise FaststartError("'moov' inválido (caixa de 64 bits incompleta)")
+            box_size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header_size = 16
+        elif box_size == 0:
+            box_size = len(data) - offset
+        
+        if box_size < header_size or offset + box_size > len(data):
+            raise FaststartError(f"'moov' inválido (caixa '{box_type.decode('latin-1')}')")
+        
+        payload = data[offset + header_size:offset + box_size]
+        
+        if box_type == b'cmov':
+            raise FaststartError("'moov' comprimido não é suportado")
+        
+        if box_type in CONTAINER_BOXES:
+            payload = _patch_boxes(payload, layout, new_size, to_co64)
+        elif box_type in (b'stco', b'co64'):
+            box_type, payload = _patch_chunk_offsets(box_type, payload, layout, new_size, to_co64)
+        
+        parts.append(_box_header(box_type, len(payload)))
+        parts.append(payload)
+        offset += box_size
+    
+    return b''.join(parts)
+
+
+def _patch_chunk_offsets(
+    box_type: bytes,
+    payload: bytes,
+    layout: Tuple[int, int, int],
+    new_size: int,
+    to_co64: bool
+) -> Tuple[bytes, bytes]:
+    """Corrige a tabela de offsets de uma caixa 'stco' ou 'co64'"""
+    if len(payload) < 8:
+        raise FaststartError(f"'{box_type.decode()}' truncado")
+    
+    version_flags, count = struct.unpack_from('>4sI', payload)
+    wide = box_type == b'co64'
+    entry_format = 'Q' if wide else 'I'
+    
+    if len(payload) < 8 + count * struct.calcsize(entry_format):
+        raise FaststartError(f"'{box_type.decode()}' truncado")
+    
+    entries = struct.unpack_from(f'>{count}{entry_format}', payload, 8)
+    entries = [_moved_offset(entry, layout, new_size) for entry in entries]
+    
+    if not wide and not to_co64:
+        if entries and max(entries) > UINT32_MAX:
+            raise OverflowError("offset de chunk não cabe em 'stco'")
+        return box_type, struct.pack(f'>4sI{count}I', version_flags, count, *entries)
+    
+    return b'co64', struct.pack(f'>4sI{count}Q', version_flags, count, *entries)
+
+
+def _rebuild_moov(children: bytes, layout: Tuple[int, int, int], to_co64: bool) -> bytes:
+    """Monta o novo 'moov' (o tamanho não depende dos offsets, então é medido antes)"""
+    probe = _patch_boxes(children, layout, 0, to_co64)
+    new_size = len(_box_header(b'moov', len(probe))) + len(probe)
+    patched = _patch_boxes(children, layout, new_size, to_co64)
+    return _box_header(b'moov', len(patched)) + patched
+
+
+def _copy_range(src, dst, start: int, length: int, digest) -> None:
+    """Copia um trecho do arquivo em blocos, atualizando o hash"""
+    src.seek(start)
+    while length > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, length))
+        if not chunk:
+            raise FaststartError("MP4 terminou antes do esperado durante a cópia")
+        dst.write(chunk)
+        digest.update(chunk)
+        length -= len(chunk)
+
+
+def needs_faststart(path: str) -> bool:
+    """
+    Verifica se o 'moov' está depois do primeiro 'mdat'.
+    
+    Args:
+        path: Caminho do MP4
+    
+    Returns:
+        True se o arquivo se beneficia do faststart
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            boxes = _top_level_boxes(f, size)
+    except (OSError, FaststartError):
+        return False
+    
+    types = [box_type for box_type, _, _ in boxes]
+    if b'moov' not in types or b'mdat' not in types or b'moof' in types:
+        return False
+    return types.index(b'moov') > types.index(b'mdat')
+
+
+def faststart_file(path: str) -> Tuple[bool, int, Optional[str]]:
+    """
+    Move o 'moov' para antes do primeiro 'mdat' (executado nos processos do pool).
+    
+    O arquivo é reescrito num .tmp ao lado e só substitui o original no fim;
+    'mdat' é copiado em blocos, então a memória usada é a do 'moov'.
+    
+    Args:
+        path: Caminho do MP4
+    
+    Returns:
+        Tupla (reorganizado, tamanho final, sha256 do arquivo final ou None se não mudou)
+    
+    Raises:
+        FaststartError: Se o MP4 não puder ser reorganizado
+    """
+    size = os.path.getsize(path)
+    
+    with open(path, 'rb') as src:
+        boxes = _top_level_boxes(src, size)
+        types = [box_type for box_type, _, _ in boxes]
+        
+        if b'moof' in types:
+            return False, size, None  # MP4 fragmentado: 'moov' já vem no início
+        if b'moov' not in types or b'mdat' not in types:
+            raise FaststartError("MP4 sem 'moov' ou 'mdat'")
+        
+        moov_index = types.index(b'moov')
+        mdat_index = types.index(b'mdat')
+        if moov_index < mdat_index:
+            return False, size, None
+        
+        _, moov_offset, moov_size = boxes[moov_index]
+        _, insert_at, _ = boxes[mdat_index]
+        
+        if moov_size > MAX_MOOV_SIZE:
+            raise FaststartError(f"'moov' grande demais ({format_bytes(moov_size)})")
+        
+        src.seek(moov_offset)
+        moov = src.read(moov_size)
+        header_size = 16 if struct.unpack_from('>I', moov)[0] == 1 else 8
+        children = moov[header_size:]
+        
+        # Os dados entre o primeiro 'mdat' e o 'moov' avançam o tamanho do novo 'moov'
+        # (os que vêm depois dele só a diferença); se algum offset estourar 32 bits,
+        # 'stco' vira 'co64' (e o 'moov' cresce)
+        layout = (insert_at, moov_offset, moov_size)
+        try:
+            new_moov = _rebuild_moov(children, layout, False)
+        except OverflowError:
+            new_moov = _rebuild_moov(children, layout, True)
+        
+        final_size = size - moov_size + len(new_moov)
+        folder = os.path.dirname(os.path.abspath(path))
+        if shutil.disk_usage(folder).free < final_size:
+            raise FaststartError("espaço insuficiente para reescrever o arquivo")
+        
+        temp_path = str(Path(path).with_suffix('.tmp'))
+        digest = hashlib.sha256()
+        
+        try:
+            with open(temp_path, 'wb') as dst:
+                _copy_range(src, dst, 0, insert_at, digest)
+                dst.write(new_moov)
+                digest.update(new_moov)
+                _copy_range(src, dst, insert_at, moov_offset - insert_at, digest)
+                _copy_range(src, dst, moov_offset + moov_size, size - moov_offset - moov_size, digest)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    os.replace(temp_path, path)
+    return True, final_size, digest.hexdigest()
+
+
+class FaststartPool:
+    """Aplica o faststart aos vídeos baixados em processos separados, sem bloquear os downloads"""
+    
+    def __init__(self, progress_manager, processes: int = 2):
+        """
+        Inicializa o pool.
+        
+        Args:
+            progress_manager: Gerenciador de progresso (recebe o novo tamanho e hash)
+            processes: Número de processos de reescrita
+        """
+        self.progress_manager = progress_manager
+        self.processes = max(1, processes)
+        
+        # Criado na primeira tarefa (execuções só de PDFs não abrem processos)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Future, Tuple[Path, str]] = {}
+        self._tasks = set()
+        
+        self.optimized = 0
+        self.already_ok = 0
+        self.failed = 0
+        self.bytes_rewritten = 0
+    
+    def schedule(self, file_path: Path, progress_key: str) -> None:
+        """
+        Agenda o faststart de um vídeo concluído (retorna na hora).
+        
+        Args:
+            file_path: Caminho do MP4
+            progress_key: Chave do item no progresso
+        """
+        if file_path.suffix.lower() != '.mp4':
+            return
+        
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        
+        future = self.executor.submit(faststart_file, str(file_path))
+        self._pending[future] = (file_path, progress_key)
+        
+        task = asyncio.get_running_loop().create_task(self._wait(future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _wait(self, future: Future) -> None:
+        """Aguarda uma reescrita e registra o resultado"""
+        try:
+            await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # Tratado em _collect()
+        self._collect(future)
+    
+    def _collect(self, future: Future) -> None:
+        """Registra o resultado de uma reescrita terminada (uma única vez)"""
+        item = self._pending.pop(future, None)
+        if item is None or future.cancelled():
+            return
+        
+        file_path, progress_key = item
+        error = future.exception()
+        
+        if isinstance(error, FaststartError):
+            self.failed += 1
+            logger.warning(f"⚠ Faststart ignorado em {file_path.name}: {error}")
+        elif error is not None:
+            self.failed += 1
+            logger.error(f"❌ Falha no faststart de {file_path.name}: {error}")
+        else:
+            changed, size, sha256 = future.result()
+            if changed:
+                self.optimized += 1
+                self.bytes_rewritten += size
+                self.progress_manager.record_file(progress_key, size, sha256)
+                logger.info(f"⏩ Faststart: {file_path.name}")
+            else:
+                self.already_ok += 1
+    
+    async def drain(self) -> None:
+        """Aguarda as reescritas agendadas terminarem"""
+        if self._tasks:
+            logger.info(f"⏳ Aguardando faststart de {len(self._tasks)} vídeo(s)...")
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+    
+    def close(self) -> None:
+        """
+        Encerra o pool (chamar antes de fechar o progresso).
+        
+        Reescritas ainda na fila são descartadas; as que já começaram terminam e
+        têm o novo hash registrado, para a auditoria não as acusar de divergentes.
+        """
+        if self.executor is None:
+            return
+        
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for future in list(self._pending):
+            if future.done():
+                self._collect(future)
+        self.executor = None
+    
+    def log_report(self, logger: logging.Logger) -> None:
+        """
+        Loga quantos vídeos foram reorganizados.
+        
+        Args:
+            logger: Logger de destino
+        """
+        if self.optimized or self.failed:
+            logger.info(
+                f"⏩ Faststart: {self.optimized} vídeo(s) reorganizado(s) "
+                f"({format_bytes(self.bytes_rewritten)}), {self.already_ok} já otimizado(s), "
+                f"{self.failed} ignorado(s)"
+            )
+
+
+def main() -> int:
+    """
+    Função principal para execução via linha de comando.
+    
+    Returns:
+        Código de saída (0 = sucesso, 1 = algum arquivo falhou)
+    """
+    global logger
+    logger = setup_logger(__name__)
+    
+    # Importado aqui para os processos do pool não abrirem o banco de progresso
+    from config_manager import ProgressManager
+    from reconcile import scan_tree
+    
+    parser = argparse.ArgumentParser(description="Move o 'moov' dos MP4 para o início do arquivo")
+    parser.add_argument("--pasta", action="append", help="pasta a percorrer (padrão: vídeos do progresso)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 4,
+                        help="processos de reescrita em paralelo")
+    args = parser.parse_args()
+    
+    progress = ProgressManager()
+    try:
+        keys_by_path = {
+            os.path.normcase(os.path.abspath(row["path"])): row["key"]
+            for row in progress.store.completed_files()
+            if row["path"] and row["path"].lower().endswith('.mp4')
+        }
+        
+        if args.pasta:
+            paths = [
+                path for folder in args.pasta
+                for path in scan_tree(Path(folder))
+                if path.lower().endswith('.mp4')
+            ]
+        else:
+            paths = [path for path in keys_by_path if os.path.exists(path)]
+        
+        started = time.monotonic()
+        pending = [path for path in paths if needs_faststart(path)]
+        logger.info(f"🔍 {len(paths)} MP4 encontrado(s), {len(pending)} com 'moov' no fim")
+        
+        optimized = failed = 0
+        queue = iter(pending)
+        running = {}
+        
+        with ProcessPoolExecutor(max_workers=max(1, args.processos)) as pool:
+            while True:
+                while len(running) < max(1, args.processos) * PENDING_PER_WORKER:
+                    path = next(queue, None)
+                    if path is None:
+                        break
+                    running[pool.submit(faststart_file, path)] = path
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        changed, size, sha256 = future.result()
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"⚠ {path}: {e}")
+                        continue
+                    
+                    if changed:
+                        optimized += 1
+                        key = keys_by_path.get(os.path.normcase(os.path.abspath(path)))
+                        if key:
+                            progress.record_file(key, size, sha256)
+                        logger.info(f"⏩ {path}")
+        
+        progress.flush()
+        logger.info(
+            f"✅ {optimized} vídeo(s) reorganizado(s), {failed} com falha "
+            f"em {time.monotonic() - started:.1f}s"
+        )
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        progress.close()
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Identidade Estável de Itens
+Chaves de progresso baseadas em IDs da plataforma e caminhos de URL,
+que não mudam quando um título é editado ou um vídeo muda de posição
+"""
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+
+def _url_path(url: Optional[str], keep_query: bool = False) -> Optional[str]:
+    """Caminho da URL sem domínio e fragmento (None se não houver)"""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/')
+    if keep_query and parsed.query:
+        path = f'{path}?{parsed.query}'
+    return path or None
+
+
+def video_key(aula_id: str, href: Optional[str]) -> Optional[str]:
+    """
+    Identidade de um vídeo a partir do link do VideoItem.
+    
+    Args:
+        aula_id: ID da aula (elemento da plataforma)
+        href: Atributo href do VideoItem
+    
+    Returns:
+        Chave estável ou None se o vídeo não tem link utilizável
+    """
+    # O vídeo pode ser identificado pela query (ex: ?video=123)
+    path = _url_path(href, keep_query=True)
+    if not path:
+        return None
+    return f'video:{aula_id}:{path}'
+
+
+def extra_key(video_id: str, kind: str) -> str:
+    """
+    Identidade de um material complementar (mapa, resumo, slides) do vídeo.
+    
+    Args:
+        video_id: Chave estável do vídeo
+        kind: Tipo do material
+    
+    Returns:
+        Chave estável do material
+    """
+    return f'{video_id}:{kind}'
+
+
+def pdf_key(aula_id: str, pdf_url: str) -> Optional[str]:
+    """
+    Identidade de uma variante de PDF a partir da URL de download.
+    
+    Args:
+        aula_id: ID da aula (elemento da plataforma)
+        pdf_url: URL da variante
+    
+    Returns:
+        Chave estável ou None se a URL não tem caminho
+    """
+    path = _url_path(pdf_url)
+    if not path:
+        return None
+    return f'pdf:{aula_id}:{path}'
+
+
+def describe_key(key: str) -> Tuple[str, Optional[str]]:
+    """
+    Classifica uma chave de progresso.
+    
+    Args:
+        key: Chave de progresso (estável ou no formato antigo)
+    
+    Returns:
+        Tupla (tipo, aula_id): tipo é 'video', 'extra', 'pdf' ou 'legacy'
+        (chaves antigas, baseadas em título/posição, sem aula identificável)
+    """
+    kind, _, rest = key.partition(':')
+    if kind not in ('video', 'pdf') or ':' not in rest:
+        return 'legacy', None
+    
+    aula_id, _, path = rest.partition(':')
+    
+    # Materiais do vídeo: chave do vídeo + ':tipo' (o caminho nunca tem ':')
+    if kind == 'video' and ':' in path:
+        return 'extra', aula_id
+    
+    return kind, aula_id
@@ -0,0 +1,184 @@
+"""
+Monitor de Páginas do Navegador
+Acompanha memória (métricas CDP) e latência das etapas de cada página,
+indicando quando a página deve ser reciclada em execuções longas
+"""
+import logging
+import time
+from typing import Dict, List, Optional
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+
+class PageStats:
+    """Tendências de memória e latência agregadas de todas as páginas da execução"""
+    
+    MAX_SAMPLES = 2000  # Limita memória do próprio monitor
+    TREND_WINDOW = 20   # Amostras comparadas no início e no fim
+    
+    def __init__(self):
+        """Inicializa as estatísticas"""
+        self.heap_samples: List[float] = []
+        self.node_samples: List[int] = []
+        self.steps: Dict[str, List[float]] = {}
+        self.recycles: Dict[str, int] = {}
+    
+    def record_sample(self, heap_mb: float, nodes: int) -> None:
+        """Registra uma leitura de memória"""
+        if len(self.heap_samples) >= self.MAX_SAMPLES:
+            # Mantém o início (referência da tendência) e descarta o meio
+            del self.heap_samples[self.TREND_WINDOW]
+            del self.node_samples[self.TREND_WINDOW]
+        self.heap_samples.append(heap_mb)
+        self.node_samples.append(nodes)
+    
+    def record_step(self, name: str, seconds: float) -> None:
+        """Registra a duração de uma etapa (ex: selecionar vídeo, resolver URL)"""
+        durations = self.steps.setdefault(name, [])
+        if len(durations) >= self.MAX_SAMPLES:
+            del durations[self.TREND_WINDOW]
+        durations.append(seconds)
+    
+    def record_recycle(self, reason: str) -> None:
+        """Registra uma reciclagem de página"""
+        self.recycles[reason] = self.recycles.get(reason, 0) + 1
+    
+    def _trend(self, values: List[float]) -> str:
+        """Média das primeiras e das últimas amostras ('início → fim')"""
+        window = min(self.TREND_WINDOW, max(1, len(values) // 2))
+        start = sum(values[:window]) / window
+        end = sum(values[-window:]) / window
+        return f"{start:.1f} → {end:.1f}"
+    
+    def log_report(self, logger: logging.Logger) -> None:
+        """
+        Loga memória, latência por etapa e reciclagens da execução.
+        
+        Args:
+            logger: Logger para output
+        """
+        if not self.heap_samples and not self.steps:
+            return
+        
+        if self.heap_samples:
+            logger.info(
+                f"🧠 Heap JS (MB): {self._trend(self.heap_samples)} "
+                f"(pico {max(self.heap_samples):.1f})"
+            )
+            logger.info(
+                f"🧠 Nós DOM: {self._trend(self.node_samples)} "
+                f"(pico {max(self.node_samples)})"
+            )
+        
+        for name, durations in sorted(self.steps.items()):
+            ordered = sorted(durations)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            logger.info(
+                f"⏱️  {name}: {len(durations)}x, tendência {self._trend(durations)}s, p95 {p95:.1f}s"
+            )
+        
+        if self.recycles:
+            details = ', '.join(f"{k}: {v}" for k, v in sorted(self.recycles.items()))
+            logger.info(f"♻️  Páginas recicladas: {sum(self.recycles.values())} ({details})")
+
+
+class PageMonitor:
+    """Lê métricas de uma página via CDP e decide quando reciclá-la"""
+    
+    def __init__(
+        self,
+        page: Page,
+        heap_limit_mb: float = 0,
+        recycle_every: int = 0,
+        stats: Optional[PageStats] = None
+    ):
+        """
+        Inicializa o monitor.
+        
+        Args:
+            page: Página monitorada
+            heap_limit_mb: Heap JS (MB) a partir do qual a página é reciclada (0 = sem limite)
+            recycle_every: Recicla a cada N vídeos selecionados (0 = desativado)
+            stats: Estatísticas agregadas da execução (opcional)
+        """
+        self.page = page
+        self.heap_limit_mb = heap_limit_mb
+        self.recycle_every = recycle_every
+        self.stats = stats or PageStats()
+        self.videos_since_start = 0
+        self._cdp = None
+    
+    async def start(self) -> None:
+        """Abre sessão CDP e habilita o domínio Performance (só Chromium)"""
+        try:
+            self._cdp = await self.page.context.new_cdp_session(self.page)
+            await self._cdp.send('Performance.enable')
+        except Exception as e:
+            logger.debug(f"Métricas CDP indisponíveis: {e}")
+            self._cdp = None
+    
+    async def close(self) -> None:
+        """Encerra a sessão CDP"""
+        if self._cdp is not None:
+            try:
+                await self._cdp.detach()
+            except Exception:
+                pass
+            self._cdp = None
+    
+    async def sample(self) -> Optional[dict]:
+        """
+        Lê heap JS e número de nós DOM da página.
+        
+        Returns:
+            Dicionário com 'heap_mb' e 'nodes' ou None se indisponível
+        """
+        if self._cdp is None:
+            return None
+        
+        try:
+            response = await self._cdp.send('Performance.getMetrics')
+        except Exception as e:
+            logger.debug(f"Erro ao ler métricas CDP: {e}")
+            return None
+        
+        metrics = {m['name']: m['value'] for m in response.get('metrics', [])}
+        sample = {
+            'heap_mb': metrics.get('JSHeapUsedSize', 0) / (1024 * 1024),
+            'nodes': int(metrics.get('Nodes', 0))
+        }
+        self.stats.record_sample(sample['heap_mb'], sample['nodes'])
+        return sample
+    
+    def count_video(self) -> None:
+        """Conta um vídeo selecionado nesta página"""
+        self.videos_since_start += 1
+    
+    def record_step(self, name: str, started_at: float) -> None:
+        """
+        Registra a duração de uma etapa iniciada em started_at (time.monotonic()).
+        
+        Args:
+            name: Nome da etapa
+            started_at: Instante de início
+        """
+        self.stats.record_step(name, time.monotonic() - started_at)
+    
+    async def recycle_reason(self) -> Optional[str]:
+        """
+        Verifica se a página deve ser reciclada.
+        
+        Returns:
+            Motivo ('heap' ou 'videos') ou None
+        """
+        sample = await self.sample()
+        
+        if self.heap_limit_mb and sample and sample['heap_mb'] >= self.heap_limit_mb:
+            logger.info(f"🧠 Heap JS em {sample['heap_mb']:.0f} MB (limite {self.heap_limit_mb} MB)")
+            return 'heap'
+        
+        if self.recycle_every and self.videos_since_start >= self.recycle_every:
+            return 'videos'
+        
+        return None
@@ -2,11 +2,18 @@
 Processador de PDFs - VERSÃO CORRIGIDA
 Parte 3/5 da refatoração
 """
+import asyncio
 import logging
+import re
+import aiohttp
 from pathlib import Path
+from typing import Dict, Optional
 from playwright.async_api import Page, Locator
 from base_processor import BaseCourseProcessor
-from utils import sanitize_filename, download_file, verify_download
+from auth import SessionExpiredError
+from browser_supervisor import BrowserCrashedError
+from item_identity import pdf_key
+from utils import sanitize_filename, download_file, verify_download, extract_course_id, probe_url
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +27,17 @@ class PDFProcessor(BaseCourseProcessor):
         3: {'name': 'marcação dos aprovados', 'urlPart': 'pdfGrifado/download'}
     }
     
-    def __init__(self, base_dir: Path, progress_manager, pdf_type: int = 2, log_queue=None):
+    # Trecho da URL que identifica a variante (as demais partes são iguais)
+    PDF_VARIANT_PATTERN = re.compile(r'/(?:pdfSimplificado|pdfGrifado|pdf)/download')
+    
+    def __init__(
+        self,
+        base_dir: Path,
+        progress_manager,
+        pdf_type: int = 2,
+        log_queue=None,
+        download_semaphore=None
+    ):
         """
         Inicializa o processador de PDFs.
         
@@ -29,8 +46,9 @@ class PDFProcessor(BaseCourseProcessor):
             progress_manager: Gerenciador de progresso
             pdf_type: Tipo de PDF a baixar (1-4)
             log_queue: Fila para enviar status
+            download_semaphore: Limitador global de downloads (opcional)
         """
-        super().__init__(base_dir, progress_manager, log_queue)
+        super().__init__(base_dir, progress_manager, log_queue, download_semaphore)
         
         # ✅ VALIDAÇÃO: Garante que pdf_type é válido
         if pdf_type not in [1, 2, 3, 4]:
@@ -60,6 +78,8 @@ class PDFProcessor(BaseCourseProcessor):
             # ✅ CORREÇÃO: Verifica cancelamento antes de começar
             await self.check_cancellation()
             
+            self.course_id = extract_course_id(course_url)
+            
             # Usa métodos herdados do BaseCourseProcessor
             await self.navigate_to_course(page, course_url)
             course_name, course_dir = await self.extract_course_info(page)
@@ -77,12 +97,20 @@ class PDFProcessor(BaseCourseProcessor):
                 # ✅ CORREÇÃO: Verifica cancelamento a cada aula
                 await self.check_cancellation()
                 
+                # Retomada após queda do navegador: aulas já concluídas
+                if self.cursor is not None and self.cursor.skip_lesson(i):
+                    continue
+                
                 try:
                     await self._process_lesson(page, aula_element, course_dir, i)
                     success_count += 1
                 except Exception as e:
+                    self.raise_if_browser_lost(e)
                     logger.error(f"❌ Erro ao processar aula {i}: {e}")
                     failed_count += 1
+                
+                if self.cursor is not None:
+                    self.cursor.lesson_done(i)
             
             logger.info(f"✅ Curso '{course_name}' processado!")
             logger.info(f"   ✓ Aulas processadas: {success_count}")
@@ -96,7 +124,11 @@ class PDFProcessor(BaseCourseProcessor):
             logger.warning("⚠ Processamento do curso cancelado")
             return False
         
+        except (SessionExpiredError, BrowserCrashedError):
+            raise  # DownloadManager refaz o login / reabre o navegador e tenta novamente
+        
         except Exception as e:
+            self.raise_if_browser_lost(e)
             logger.error(f"❌ Erro ao processar curso: {e}", exc_info=True)
             return False
     
@@ -116,159 +148,284 @@ class PDFProcessor(BaseCourseProcessor):
             course_dir: Diretório do curso
             index: Índice da aula
         """
+        aula_id = None
+        
         try:
             # Extrai informações da aula (método herdado)
             aula_id, lesson_name, lesson_subtitle = await self.extract_lesson_info(aula_element, index)
+            lesson_title = f'{lesson_name} - {lesson_subtitle}'
+            
+            # ✅ SYNC INCREMENTAL: aula sem novidades não é expandida
+            if self.can_skip_lesson(aula_id, lesson_title):
+                logger.info(f"⏭️  Aula {index} sem novidades: {lesson_name}")
+                return
             
             logger.info(f"📚 Processando aula {index}: {lesson_name}")
             
             # Expande a aula (método herdado)
             await self.expand_lesson(page, aula_id)
             
-            # Busca botões de download de PDF
-            download_buttons = await aula_element.locator('a:has-text("Baixar Livro Eletrônico")').all()
-            
-            if not download_buttons:
-                logger.info(f"ℹ️  Nenhum PDF disponível em '{lesson_name}'")
-                return
-            
-            logger.info(f"✓ Encontrados {len(download_buttons)} link(s) de PDF")
+            await self.download_lesson_pdfs(
+                aula_element, course_dir, lesson_name, lesson_subtitle, aula_id
+            )
             
-            # Processa cada botão de download encontrado
-            for button in download_buttons:
-                await self.check_cancellation()
-                
-                await self._process_pdf_button(
-                    button, course_dir, lesson_name,
-                    lesson_subtitle, aula_id
-                )
+            self.record_lesson(aula_id, lesson_title)
         
         except asyncio.CancelledError:
             raise  # Propaga cancelamento
         
         except Exception as e:
+            self.raise_if_browser_lost(e)
             logger.error(f"❌ Erro ao processar aula {index}: {e}")
+            if aula_id:
+                self.mark_lesson_failed(aula_id)
             # Não propaga para permitir continuar com outras aulas
     
-    async def _process_pdf_button(
+    async def download_lesson_pdfs(
         self,
-        button: Locator,
+        aula_element: Locator,
         course_dir: Path,
         lesson_name: str,
         lesson_subtitle: str,
         aula_id: str
     ) -> None:
         """
-        Processa um botão de download de PDF específico.
+        Baixa os PDFs de uma aula que já está expandida.
+        
+        As variantes pedidas são derivadas de qualquer link encontrado (as URLs
+        só diferem no trecho do tipo), então não dependem do botão estar na página.
         
         Args:
-            button: Elemento do botão
+            aula_element: Elemento da aula
             course_dir: Diretório do curso
             lesson_name: Nome da aula
             lesson_subtitle: Subtítulo da aula
             aula_id: ID da aula
         """
+        # Lê os hrefs de todos os botões de uma vez
+        hrefs = await aula_element.locator('a:has-text("Baixar Livro Eletrônico")').evaluate_all(
+            'els => els.map(el => el.getAttribute("href"))'
+        )
+        
+        if not hrefs:
+            logger.info(f"ℹ️  Nenhum PDF disponível em '{lesson_name}'")
+            return
+        
+        logger.info(f"✓ Encontrados {len(hrefs)} link(s) de PDF")
+        
+        base_file_name = f'{lesson_name} - {lesson_subtitle}'
+        seen_keys = set()
+        claimed_paths = set()
+        jobs = {}
+        
+        # URLs com botão próprio na página (as demais variantes são deduzidas)
+        discovered = [url for url in map(self._normalize_pdf_url, hrefs) if url]
+        
+        # Variantes com botão primeiro: elas ficam com o arquivo quando duas levam ao mesmo nome
+        candidates = [
+            (pdf_type, variant_url, variant_url not in discovered)
+            for pdf_url in discovered
+            for pdf_type, variant_url in self.get_variant_urls(pdf_url).items()
+        ]
+        candidates.sort(key=lambda candidate: candidate[2])
+        
+        for pdf_type, variant_url, derived in candidates:
+            pdf_info = self.PDF_TYPES[pdf_type]
+            file_name = f'{sanitize_filename(base_file_name, 180)} ({pdf_info["name"]}).pdf'
+            file_path = course_dir / file_name
+            
+            # Identidade estável (aula + caminho da URL); chave antiga inclui o título
+            legacy_key = f'{aula_id}-{file_name}'
+            progress_key = pdf_key(aula_id, variant_url) or legacy_key
+            
+            # Vários botões levam à mesma variante ou ao mesmo arquivo: baixa só uma vez
+            # (dois downloads no mesmo caminho sobrescreveriam o mesmo .tmp)
+            if progress_key in seen_keys or file_path in claimed_paths:
+                continue
+            seen_keys.add(progress_key)
+            claimed_paths.add(file_path)
+            self.track_item(aula_id, progress_key)
+            
+            # Já baixado (se o título mudou, o arquivo é apenas movido)
+            if self.adopt_existing(progress_key, legacy_key, file_path):
+                logger.info(f"⏭️  Já baixado: {file_name}")
+                continue
+            
+            # Variante deduzida (sem botão próprio) pode não existir nesta aula
+            jobs[progress_key] = (variant_url, file_path, file_name, derived)
+        
+        if not jobs:
+            return
+        
+        await self.check_cancellation()
+        
+        # Variantes deduzidas que o servidor não tem são descartadas sem erro
+        derived_keys = [key for key, job in jobs.items() if job[3]]
+        if derived_keys:
+            available = await asyncio.gather(*(self._variant_available(jobs[key][0]) for key in derived_keys))
+            for key, ok in zip(derived_keys, available):
+                if not ok:
+                    logger.debug(f"Variante indisponível nesta aula: {jobs[key][2]}")
+                    self.untrack_item(aula_id, key)
+                    del jobs[key]
+        
+        if not jobs:
+            return
+        
+        # Todas as variantes entram na fila juntas (semáforo limita a concorrência)
+        results = await asyncio.gather(*(
+            self._download_pdf(url, file_path, file_name, progress_key)
+            for progress_key, (url, file_path, file_name, _) in jobs.items()
+        ))
+        
+        for (progress_key, job), ok in zip(jobs.items(), results):
+            if not ok and job[3]:
+                self.untrack_item(aula_id, progress_key)
+    
+    async def _variant_available(self, url: str) -> bool:
+        """
+        Verifica se uma variante deduzida existe (HEAD/Range, sem baixar o PDF).
+        
+        Args:
+            url: URL da variante
+        
+        Returns:
+            False só se o servidor negar a variante; erro de rede deixa o download decidir
+        """
         try:
-            pdf_url = await button.get_attribute('href')
+            available, _ = await probe_url(await self.get_http_session(), url)
+            return available
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Não foi possível verificar variante ({e}), tentando baixar")
+            return True
+    
+    def get_variant_urls(self, pdf_url: str) -> Dict[int, str]:
+        """
+        Deriva as URLs dos tipos de PDF pedidos a partir de um link qualquer.
+        
+        Args:
+            pdf_url: URL de download de qualquer variante
+        
+        Returns:
+            Dicionário tipo -> URL (vazio se o link não tiver formato conhecido)
+        """
+        if not self.PDF_VARIANT_PATTERN.search(pdf_url):
+            logger.warning(f"⚠ Link de PDF com formato desconhecido: {pdf_url}")
+            return {}
+        
+        return {
+            pdf_type: self.PDF_VARIANT_PATTERN.sub(
+                f'/{self.PDF_TYPES[pdf_type]["urlPart"]}', pdf_url, count=1
+            )
+            for pdf_type in self.pdf_types_to_download
+            if pdf_type in self.PDF_TYPES
+        }
+    
+    def _normalize_pdf_url(self, pdf_url: Optional[str]) -> Optional[str]:
+        """
+        Completa e valida a URL de um botão de PDF.
+        
+        Args:
+            pdf_url: Valor do href
+        
+        Returns:
+            URL absoluta ou None se inválida
+        """
+        if not pdf_url:
+            logger.warning("⚠ Botão sem URL de download")
+            return None
+        
+        # Normaliza URL (adiciona domínio se necessário)
+        if pdf_url.startswith('/api'):
+            pdf_url = "https://www.estrategiaconcursos.com.br" + pdf_url
+        
+        # ✅ VALIDAÇÃO: Verifica se URL é válida
+        if not pdf_url.startswith('http'):
+            logger.warning(f"⚠ URL inválida: {pdf_url}")
+            return None
+        
+        return pdf_url
+    
+    async def _download_pdf(
+        self,
+        pdf_url: str,
+        file_path: Path,
+        file_name: str,
+        progress_key: str
+    ) -> bool:
+        """
+        Baixa e valida uma variante de PDF.
+        
+        Args:
+            pdf_url: URL da variante
+            file_path: Caminho de destino
+            file_name: Nome do arquivo (para logs)
+            progress_key: Chave de progresso do arquivo
+        
+        Returns:
+            True se o arquivo foi baixado e validado
+        """
+        reservation = None
+        
+        try:
+            # Só começa se couber no disco e no orçamento do curso (senão não sobra .tmp)
+            reservation = await self.reserve_space(file_path, None)
             
-            if not pdf_url:
-                logger.warning("⚠ Botão sem URL de download")
-                return
+            logger.info(f"⬇️  Baixando: {file_name}")
             
-            # Normaliza URL (adiciona domínio se necessário)
-            if pdf_url.startswith('/api'):
-                pdf_url = "https://www.estrategiaconcursos.com.br" + pdf_url
+            # ✅ Callback de progresso
+            def progress_callback(current, total, speed):
+                if self.log_queue:
+                    try:
+                        self.log_queue.put_nowait({
+                            "type": "progress",
+                            "file": file_name,
+                            "current": current,
+                            "total": total,
+                            "speed": speed
+                        })
+                    except:
+                        pass
             
-            # ✅ VALIDAÇÃO: Verifica se URL é válida
-            if not pdf_url.startswith('http'):
-                logger.warning(f"⚠ URL inválida: {pdf_url}")
-                return
+            # ✅ MELHORIA: Download com rate limiting
+            sha256 = await self.download_with_rate_limit(
+                download_file,
+                pdf_url,
+                file_path,
+                logger,
+                progress_callback=progress_callback
+            )
             
-            # Verifica cada tipo de PDF solicitado
-            for pdf_type in self.pdf_types_to_download:
-                await self.check_cancellation()
-                
-                pdf_info = self.PDF_TYPES.get(pdf_type)
-                
-                if not pdf_info:
-                    continue
-                
-                # Verifica se a URL corresponde ao tipo de PDF
-                if pdf_info["urlPart"] not in pdf_url:
-                    continue
-                
-                # Define nome do arquivo
-                base_file_name = f'{lesson_name} - {lesson_subtitle}'
-                file_name = f'{sanitize_filename(base_file_name, 180)} ({pdf_info["name"]}).pdf'
-                file_path = course_dir / file_name
-                
-                # Chave única para controle de progresso (estável entre execuções)
-                progress_key = f'{aula_id}-{file_name}'
-                
-                # Verifica se já foi baixado (método herdado)
-                if self.is_already_downloaded(progress_key):
-                    logger.info(f"⏭️  Já baixado: {file_name}")
-                    continue
-                
-                try:
-                    logger.info(f"⬇️  Baixando: {file_name}")
-                    
-                    # ✅ Callback de progresso
-                    def progress_callback(current, total, speed):
-                        if self.log_queue:
-                            try:
-                                self.log_queue.put_nowait({
-                                    "type": "progress",
-                                    "file": file_name,
-                                    "current": current,
-                                    "total": total,
-                                    "speed": speed
-                                })
-                            except:
-                                pass
-
-                    # ✅ MELHORIA: Download com rate limiting
-                    await self.download_with_rate_limit(
-                        download_file,
-                        pdf_url,
-                        file_path,
-                        logger,
-                        progress_callback=progress_callback
-                    )
-                    
-                    # ✅ NOVA FUNCIONALIDADE: Validação de magic bytes
-                    await verify_download(
-                        file_path,
-                        logger,
-                        min_size=10240,  # Min 10KB
-                        expected_extension='.pdf'
-                    )
-                    
-                    # Marca como baixado (método herdado)
-                    self.mark_as_downloaded(progress_key)
-                    
-                    logger.info(f"✅ Concluído: {file_name}")
-                
-                except asyncio.CancelledError:
-                    # ✅ CORREÇÃO: Remove arquivo parcial em cancelamento
-                    logger.warning("⚠ Download cancelado")
-                    if file_path.exists():
-                        file_path.unlink()
-                        logger.debug(f"✓ Arquivo parcial removido: {file_name}")
-                    raise
-                
-                except Exception as e:
-                    logger.error(f"❌ Falha ao baixar '{file_name}': {e}")
-                    # Remove arquivo corrompido se existir
-                    if file_path.exists():
-                        file_path.unlink()
-                        logger.debug("✓ Arquivo corrompido removido")
-                
-                # Só processa o primeiro tipo de PDF que corresponder
-                break
+            # ✅ NOVA FUNCIONALIDADE: Validação de magic bytes
+            await verify_download(
+                file_path,
+                logger,
+                min_size=10240,  # Min 10KB
+                expected_extension='.pdf'
+            )
+            
+            # Marca como baixado (método herdado)
+            self.mark_as_downloaded(progress_key, file_path, sha256)
+            
+            logger.info(f"✅ Concluído: {file_name}")
+            return True
         
         except asyncio.CancelledError:
-            raise  # Propaga cancelamento
+            # ✅ CORREÇÃO: Remove arquivo parcial em cancelamento
+            logger.warning("⚠ Download cancelado")
+            if file_path.exists():
+                file_path.unlink()
+                logger.debug(f"✓ Arquivo parcial removido: {file_name}")
+            raise
         
         except Exception as e:
-            logger.error(f"❌ Erro ao processar botão de PDF: {e}")
+            logger.error(f"❌ Falha ao baixar '{file_name}': {e}")
+            self.mark_as_failed(progress_key, e)
+            # Remove arquivo corrompido se existir
+            if file_path.exists():
+                file_path.unlink()
+                logger.debug("✓ Arquivo corrompido removido")
+            return False
+        
+        finally:
+            await self.release_space(reservation, file_path)
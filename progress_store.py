@@ -0,0 +1,747 @@
+"""
+Armazenamento de Progresso em SQLite
+Cursos, aulas e itens baixados (estado, tamanho, hash, tentativas) com índices,
+mais o importador único do antigo progress.json + journal
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from item_identity import describe_key
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    updated_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS lessons (
+    course_id TEXT NOT NULL,
+    aula_id TEXT NOT NULL,
+    title TEXT,
+    updated_at REAL,
+    PRIMARY KEY (course_id, aula_id)
+);
+
+CREATE TABLE IF NOT EXISTS items (
+    key TEXT PRIMARY KEY,
+    course_id TEXT,
+    aula_id TEXT,
+    kind TEXT NOT NULL,
+    state TEXT NOT NULL,
+    path TEXT,
+    size INTEGER,
+    sha256 TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    completed_at INTEGER,
+    updated_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_items_course ON items (course_id, state);
+CREATE INDEX IF NOT EXISTS idx_items_state ON items (state, updated_at);
+CREATE INDEX IF NOT EXISTS idx_items_kind ON items (kind, state);
+
+CREATE TABLE IF NOT EXISTS audits (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    sha256 TEXT,
+    result TEXT NOT NULL,
+    detail TEXT,
+    audited_at REAL
+);
+"""
+
+# Estados de um item
+STATE_COMPLETED = 'completed'
+STATE_FAILED = 'failed'
+
+# Resultados da auditoria de integridade
+AUDIT_OK = 'ok'
+AUDIT_MISSING = 'missing'
+AUDIT_CORRUPT = 'corrupt'
+AUDIT_MISMATCH = 'mismatch'
+
+# Métodos de escrita aceitos em ProgressStore.apply()
+WRITE_OPERATIONS = frozenset({
+    'mark_completed', 'mark_failed', 'invalidate', 'rename_key',
+    'record_course', 'record_lesson', 'record_audit', 'record_digest', 'record_file',
+    'clear'
+})
+
+
+class ProgressStore:
+    """Banco SQLite com o progresso de cursos, aulas e itens"""
+    
+    def __init__(self, db_path: Path):
+        """
+        Abre (ou cria) o banco de progresso.
+        
+        Args:
+            db_path: Arquivo do banco SQLite
+        """
+        self.db_path = Path(db_path)
+        # Criado na thread da interface e usado na thread de download (uma por vez)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        
+        # WAL: cada conclusão é um append no log; FULL sincroniza a cada commit
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    
+    def close(self) -> None:
+        """Fecha a conexão (o WAL é consolidado no banco)"""
+        try:
+            self.conn.close()
+        except sqlite3.Error as e:
+            logger.debug(f"Erro ao fechar banco de progresso: {e}")
+    
+    def is_empty(self) -> bool:
+        """True se ainda não há nenhum item registrado"""
+        return self.conn.execute("SELECT 1 FROM items LIMIT 1").fetchone() is None
+    
+    def is_completed(self, key: str) -> bool:
+        """
+        Verifica se o item foi baixado (consulta pela chave primária).
+        
+        Args:
+            key: Chave do item
+        
+        Returns:
+            True se o item está concluído
+        """
+        row = self.conn.execute(
+            "SELECT 1 FROM items WHERE key = ? AND state = ?", (key, STATE_COMPLETED)
+        ).fetchone()
+        return row is not None
+    
+    def completed_keys(self, course_id: str) -> List[str]:
+        """
+        Chaves concluídas de um curso (usa o índice por curso).
+        
+        Args:
+            course_id: ID do curso
+        
+        Returns:
+            Lista de chaves
+        """
+        rows = self.conn.execute(
+            "SELECT key FROM items WHERE course_id = ? AND state = ?", (course_id, STATE_COMPLETED)
+        )
+        return [row[0] for row in rows]
+    
+    def completed_files(self) -> List[sqlite3.Row]:
+        """
+        Itens concluídos que registraram o caminho do arquivo.
+        
+        Returns:
+            Linhas com key, course_id, path, size e sha256
+        """
+        return self.conn.execute(
+            "SELECT key, course_id, path, size, sha256 FROM items WHERE state = ? AND path IS NOT NULL",
+            (STATE_COMPLETED,)
+        ).fetchall()
+    
+    def audit_records(self) -> Dict[str, sqlite3.Row]:
+        """
+        Última auditoria de cada item.
+        
+        Returns:
+            Dicionário chave -> linha (path, size, mtime, sha256, result, detail)
+        """
+        rows = self.conn.execute("SELECT * FROM audits")
+        return {row["key"]: row for row in rows}
+    
+    def get_item(self, key: str) -> Optional[sqlite3.Row]:
+        """
+        Obtém o registro completo de um item.
+        
+        Args:
+            key: Chave do item
+        
+        Returns:
+            Linha do item ou None
+        """
+        return self.conn.execute("SELECT * FROM items WHERE key = ?", (key,)).fetchone()
+    
+    def apply(self, operations: List[tuple]) -> None:
+        """
+        Aplica um lote de operações numa única transação.
+        
+        As operações de escrita (mark_completed, mark_failed, rename_key,
+        record_course, record_lesson, record_audit, ...) não fazem commit sozinhas.
+        
+        Args:
+            operations: Tuplas (nome_do_método, *argumentos)
+        """
+        with self.conn:
+            for name, *args in operations:
+                if name not in WRITE_OPERATIONS:
+                    raise ValueError(f"Operação de progresso desconhecida: {name}")
+                getattr(self, name)(*args)
+    
+    def mark_completed(
+        self,
+        key: str,
+        info: Optional[dict] = None,
+        course_id: Optional[str] = None
+    ) -> None:
+        """
+        Registra um item como concluído.
+        
+        Args:
+            key: Chave do item
+            info: Dados do arquivo (path, size, sha256, completed_at)
+            course_id: ID do curso (mantém o anterior se omitido)
+        """
+        info = info or {}
+        kind, aula_id = describe_key(key)
+        
+        self.conn.execute(
+            """
+            INSERT INTO items (key, course_id, aula_id, kind, state, path, size, sha256,
+                               attempts, last_error, completed_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, NULL, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                course_id = COALESCE(excluded.course_id, items.course_id),
+                state = excluded.state,
+                path = excluded.path,
+                size = excluded.size,
+                sha256 = excluded.sha256,
+                attempts = items.attempts + 1,
+                last_error = NULL,
+                completed_at = excluded.completed_at,
+                updated_at = excluded.updated_at
+            """,
+            (key, course_id, aula_id, kind, STATE_COMPLETED, info.get("path"),
+             info.get("size"), info.get("sha256"),
+             info.get("completed_at", int(time.time())), time.time())
+        )
+    
+    def mark_failed(self, key: str, error: str, course_id: Optional[str] = None) -> None:
+        """
+        Registra uma tentativa de download que falhou.
+        
+        Um item já concluído continua concluído (só a tentativa é contada).
+        
+        Args:
+            key: Chave do item
+            error: Mensagem do erro
+            course_id: ID do curso
+        """
+        kind, aula_id = describe_key(key)
+        
+        self.conn.execute(
+            """
+            INSERT INTO items (key, course_id, aula_id, kind, state, attempts, last_error, updated_at)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                course_id = COALESCE(excluded.course_id, items.course_id),
+                attempts = items.attempts + 1,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at
+            """,
+            (key, course_id, aula_id, kind, STATE_FAILED, error[:500], time.time())
+        )
+    
+    def invalidate(self, key: str, reason: str) -> None:
+        """
+        Desfaz a conclusão de um item cujo arquivo sumiu ou está danificado.
+        
+        Args:
+            key: Chave do item
+            reason: Motivo (guardado como último erro)
+        """
+        self.conn.execute(
+            "UPDATE items SET state = ?, last_error = ?, updated_at = ? WHERE key = ?",
+            (STATE_FAILED, reason[:500], time.time(), key)
+        )
+    
+    def rename_key(self, old_key: str, new_key: str) -> None:
+        """
+        Troca a chave de um item mantendo o histórico (tentativas, curso).
+        
+        Args:
+            old_key: Chave antiga
+            new_key: Nova chave
+        """
+        kind, aula_id = describe_key(new_key)
+        
+        self.conn.execute("DELETE FROM items WHERE key = ?", (new_key,))
+        self.conn.execute(
+            "UPDATE items SET key = ?, kind = ?, aula_id = ? WHERE key = ?",
+            (new_key, kind, aula_id, old_key)
+        )
+    
+    def record_course(self, course_id: str, url: Optional[str], title: Optional[str]) -> None:
+        """
+        Registra (ou atualiza) um curso.
+        
+        Args:
+            course_id: ID do curso
+            url: URL do curso
+            title: Nome do curso
+        """
+        self.conn.execute(
+            """
+            INSERT INTO courses (id, url, title, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                url = COALESCE(excluded.url, courses.url),
+                title = COALESCE(excluded.title, courses.title),
+                updated_at = excluded.updated_at
+            """,
+            (course_id, url, title, time.time())
+        )
+    
+    def record_lesson(self, course_id: str, aula_id: str, title: str) -> None:
+        """
+        Registra (ou atualiza) uma aula.
+        
+        Args:
+            course_id: ID do curso
+            aula_id: ID da aula
+            title: Título da aula
+        """
+        self.conn.execute(
+            """
+            INSERT INTO lessons (course_id, aula_id, title, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(course_id, aula_id) DO UPDATE SET
+                title = excluded.title,
+                updated_at = excluded.updated_at
+            """,
+            (course_id, aula_id, title, time.time())
+        )
+    
+    def record_audit(
+        self,
+        key: str,
+        path: str,
+        size: Optional[int],
+        mtime: Optional[float],
+        sha256: Optional[str],
+        result: str,
+        detail: Optional[str] = None
+    ) -> None:
+        """
+        Registra o resultado da auditoria de um item.
+        
+        Args:
+            key: Chave do item
+            path: Caminho auditado
+            size: Tamanho do arquivo no momento da auditoria
+            mtime: Data de modificação no momento da auditoria
+            sha256: Hash calculado (None se não foi lido)
+            result: AUDIT_OK, AUDIT_MISSING, AUDIT_CORRUPT ou AUDIT_MISMATCH
+            detail: Descrição do problema
+        """
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO audits (key, path, size, mtime, sha256, result, detail, audited_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (key, path, size, mtime, sha256, result, detail, time.time())
+        )
+    
+    def record_digest(self, key: str, sha256: str) -> None:
+        """
+        Guarda o hash de um item baixado antes de o hash ser calculado.
+        
+        Args:
+            key: Chave do item
+            sha256: Hash do conteúdo
+        """
+        self.conn.execute(
+            "UPDATE items SET sha256 = ? WHERE key = ? AND sha256 IS NULL", (sha256, key)
+        )
+    
+    def record_file(self, key: str, size: int, sha256: str) -> None:
+        """
+        Atualiza tamanho e hash de um item concluído cujo arquivo foi reescrito.
+        
+        Args:
+            key: Chave do item
+            size: Novo tamanho do arquivo
+            sha256: Novo hash do conteúdo
+        """
+        self.conn.execute(
+            "UPDATE items SET size = ?, sha256 = ?, updated_at = ? WHERE key = ? AND state = ?",
+            (size, sha256, time.time(), key, STATE_COMPLETED)
+        )
+    
+    def clear(self) -> None:
+        """Apaga todo o progresso"""
+        self.conn.execute("DELETE FROM audits")
+        self.conn.execute("DELETE FROM items")
+        self.conn.execute("DELETE FROM lessons")
+        self.conn.execute("DELETE FROM courses")
+    
+    def stats(self, course_id: Optional[str] = None) -> dict:
+        """
+        Contagens e bytes concluídos (geral ou de um curso).
+        
+        Args:
+            course_id: ID do curso (None = todos)
+        
+        Returns:
+            Dicionário com total_items, completed, failed e bytes
+        """
+        where, params = ("WHERE course_id = ?", (course_id,)) if course_id else ("", ())
+        row = self.conn.execute(
+            f"""
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(state = '{STATE_COMPLETED}'), 0) AS completed,
+                   COALESCE(SUM(state = '{STATE_FAILED}'), 0) AS failed,
+                   COALESCE(SUM(CASE WHEN state = '{STATE_COMPLETED}' THEN size END), 0) AS bytes
+            FROM items {where}
+            """,
+            params
+        ).fetchone()
+        
+        return {
+            "total_items": row["total"],
+            "completed": row["completed"],
+            "failed": row["failed"],
+            "bytes": row["bytes"]
+        }
+    
+    def failed_items(self, since: float = 0, kind: Optional[str] = None) -> List[dict]:
+        """
+        Itens que falharam (e ainda não foram concluídos) desde um instante.
+        
+        Args:
+            since: Timestamp Unix mínimo da última tentativa
+            kind: Filtra por tipo ('video', 'extra', 'pdf', 'legacy')
+        
+        Returns:
+            Lista de itens (key, course_id, aula_id, kind, attempts, last_error, updated_at)
+        """
+        query = (
+            "SELECT key, course_id, aula_id, kind, attempts, last_error, updated_at "
+            "FROM items WHERE state = ? AND updated_at >= ?"
+        )
+        params = [STATE_FAILED, since]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY updated_at DESC", params)]
+    
+    def import_legacy(self, progress_file: Path, journal_file: Optional[Path] = None) -> int:
+        """
+        Importa o progress.json (e o journal pendente) uma única vez.
+        
+        Os arquivos originais são renomeados para '.imported' após a importação.
+        
+        Args:
+            progress_file: Snapshot JSON antigo (chave -> True | dados do arquivo)
+            journal_file: Journal de operações ainda não compactado (opcional)
+        
+        Returns:
+            Número de itens importados
+        """
+        progress: Dict[str, object] = {}
+        
+        try:
+            if progress_file.exists():
+                with open(progress_file, 'r', encoding='utf-8') as f:
+                    progress = json.load(f)
+            
+            if journal_file is not None and journal_file.exists():
+                with open(journal_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            if entry["op"] == "set":
+                                progress[entry["key"]] = entry["value"]
+                            elif entry["op"] == "del":
+                                progress.pop(entry["key"], None)
+                        except (json.JSONDecodeError, KeyError, TypeError):
+                            continue  # Linha incompleta de uma queda
+        
+        except (json.JSONDecodeError, OSError, IOError) as e:
+            logger.error(f"❌ Erro ao importar progresso antigo: {e}")
+            return 0
+        
+        rows = []
+        now = time.time()
+        for key, value in progress.items():
+            if not value:
+                continue
+            info = value if isinstance(value, dict) else {}
+            kind, aula_id = describe_key(key)
+            rows.append((
+                key, aula_id, kind, STATE_COMPLETED, info.get("path"), info.get("size"),
+                info.get("sha256"), info.get("completed_at"), now
+            ))
+        
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO items (key, aula_id, kind, state, path, size, sha256,
+                                              attempts, completed_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                """,
+                rows
+            )
+        
+        # Mantém os originais como backup, fora do caminho da próxima importação
+        for path in (progress_file, journal_file):
+            if path is not None and path.exists():
+                try:
+                    path.replace(path.with_name(path.name + '.imported'))
+                except OSError as e:
+                    logger.warning(f"⚠ Não foi possível renomear {path.name}: {e}")
+        
+        logger.info(f"✓ Progresso antigo importado para o banco ({len(rows)} itens)")
+        return len(rows)
+
+
+class ProgressWriter:
+    """
+    Grava em segundo plano, em lotes, as operações de progresso.
+    
+    As operações ficam numa fila em memória e uma thread própria (com conexão
+    SQLite separada) as aplica a cada `interval` segundos ou quando a fila
+    atinge `batch_size`, sem bloquear o loop do asyncio.
+    """
+    
+    def __init__(self, db_path: Path, interval: float = 1.0, batch_size: int = 200):
+        """
+        Inicia a thread de gravação.
+        
+        Args:
+            db_path: Arquivo do banco SQLite
+            interval: Segundos máximos entre gravações
+            batch_size: Operações pendentes que antecipam a gravação
+        """
+        self.db_path = Path(db_path)
+        self.interval = max(0.05, float(interval))
+        self.batch_size = max(1, int(batch_size))
+        
+        self._pending: List[tuple] = []
+        self._submitted = 0   # Sequência da última operação enfileirada
+        self.flushed_seq = 0  # Sequência da última operação gravada
+        
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stopping = False
+        
+        # Métricas de gravação
+        self.flushes = 0
+        self.operations = 0
+        self.max_batch = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.errors = 0
+        
+        # Operações com dados inválidos são descartadas (as demais do lote são gravadas)
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self._reported_dropped = 0
+        
+        self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, operation: tuple) -> int:
+        """
+        Enfileira uma operação (ver ProgressStore.apply()).
+        
+        Args:
+            operation: Tupla (nome_do_método, *argumentos)
+        
+        Returns:
+            Número de sequência da operação
+        """
+        with self._cond:
+            self._pending.append(operation)
+            self._submitted += 1
+            seq = self._submitted
+            full = len(self._pending) >= self.batch_size
+        
+        if full:
+            self._wake.set()
+        return seq
+    
+    def flush(self, wait: bool = True, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Antecipa a gravação das operações pendentes.
+        
+        Args:
+            wait: Se True, aguarda a gravação terminar
+            timeout: Espera máxima em segundos
+        
+        Returns:
+            True se tudo que estava pendente foi gravado (ou wait=False)
+        """
+        with self._cond:
+            target = self._submitted
+        
+        self._wake.set()
+        if not wait:
+            return True
+        
+        with self._cond:
+            done = self._cond.wait_for(
+                lambda: self.flushed_seq >= target or not self._thread.is_alive(),
+                timeout
+            ) and self.flushed_seq >= target
+        
+        self._report_failures()
+        return done
+    
+    def close(self) -> None:
+        """Grava o que falta e encerra a thread (se ela parou antes, grava nesta thread)"""
+        if self._thread.is_alive():
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+        
+        if self._pending:
+            try:
+                store = ProgressStore(self.db_path)
+                try:
+                    self._write_pending(store)
+                finally:
+                    store.close()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+        
+        self._report_failures()
+        if self._pending:
+            logger.error(
+                f"❌ {len(self._pending)} operação(ões) de progresso não gravadas: {self.last_error}"
+            )
+    
+    def _report_failures(self) -> None:
+        """Loga operações descartadas desde o último aviso e a parada da thread"""
+        new_drops = self.dropped - self._reported_dropped
+        if new_drops:
+            self._reported_dropped = self.dropped
+            logger.error(f"❌ {new_drops} operação(ões) de progresso descartada(s): {self.last_error}")
+        
+        if not self._thread.is_alive() and not self._stopping:
+            logger.error(f"❌ Thread de gravação do progresso parou: {self.last_error}")
+    
+    def _run(self) -> None:
+        """Laço da thread: espera intervalo/lote/flush e grava"""
+        try:
+            store = ProgressStore(self.db_path)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Não foi possível abrir o banco de progresso: {e}")
+            with self._cond:
+                self._cond.notify_all()
+            return
+        
+        try:
+            while True:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                self._write_pending(store)
+                
+                if self._stopping:
+                    self._write_pending(store)
+                    return
+        finally:
+            store.close()
+            with self._cond:
+                self._cond.notify_all()
+    
+    def _write_pending(self, store: ProgressStore) -> None:
+        """Aplica numa transação as operações acumuladas"""
+        with self._cond:
+            batch, self._pending = self._pending, []
+            last_seq = self._submitted
+        
+        if not batch:
+            return
+        
+        started = time.perf_counter()
+        try:
+            store.apply(batch)
+        except sqlite3.OperationalError as e:
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Erro ao gravar progresso ({len(batch)} operações): {e}")
+            # Banco ocupado/indisponível: devolve o lote para a próxima tentativa, mantendo a ordem
+            with self._cond:
+                self._pending[:0] = batch
+            return
+        except Exception as e:
+            # Dados inválidos em alguma operação: o lote foi desfeito, grava uma a uma
+            self.errors += 1
+            logger.warning(f"⚠ Lote de progresso rejeitado ({len(batch)} operações): {e}")
+            if not self._apply_each(store, batch):
+                return
+        
+        latency = time.perf_counter() - started
+        self.flushes += 1
+        self.operations += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        
+        with self._cond:
+            self.flushed_seq = last_seq
+            self._cond.notify_all()
+    
+    def _apply_each(self, store: ProgressStore, batch: List[tuple]) -> bool:
+        """
+        Aplica as operações uma a uma, descartando só as inválidas.
+        
+        Args:
+            store: Banco da thread de gravação
+            batch: Operações do lote rejeitado
+        
+        Returns:
+            False se o banco ficou indisponível (o restante volta para a fila)
+        """
+        for index, operation in enumerate(batch):
+            try:
+                store.apply([operation])
+            except sqlite3.OperationalError as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                with self._cond:
+                    self._pending[:0] = batch[index:]
+                return False
+            except Exception as e:
+                self.dropped += 1
+                self.last_error = f"{operation[0] if operation else '?'}: {type(e).__name__}: {e}"
+        
+        return True
+    
+    def log_stats(self, logger: logging.Logger) -> None:
+        """
+        Loga latência e tamanho dos lotes gravados.
+        
+        Args:
+            logger: Logger para output
+        """
+        if not self.flushes:
+            return
+        
+        logger.info(
+            f"💾 Progresso: {self.operations} operações em {self.flushes} gravações "
+            f"(lote médio {self.operations / self.flushes:.1f}, máx {self.max_batch}) | "
+            f"latência média {self.total_latency / self.flushes * 1000:.1f} ms, "
+            f"máx {self.max_latency * 1000:.1f} ms"
+        )
+        if self.errors:
+            logger.warning(f"⚠ Gravações de progresso com erro: {self.errors}")
+        if self.dropped:
+            logger.warning(f"⚠ Operações de progresso descartadas: {self.dropped} ({self.last_error})")
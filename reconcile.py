@@ -0,0 +1,581 @@
+"""
+Reconciliação do Progresso com o Disco
+Percorre as pastas de download, confere os arquivos com verificações estruturais
+rápidas e reconstrói/repara o progresso a partir do que já está baixado
+
+Uso:
+    python reconcile.py             # Só relatório
+    python reconcile.py --aplicar   # Grava os reparos no progresso
+    python reconcile.py --limpar    # Remove arquivos vazios e .tmp abandonados
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from config_manager import ConfigManager, ProgressManager
+from catalog import CatalogStore
+from item_identity import video_key, extra_key, pdf_key
+from pdf_processor import PDFProcessor
+from video_processor import VideoProcessor
+from utils import sanitize_filename, extract_course_id, format_bytes, setup_logger
+
+logger = logging.getLogger(__name__)
+
+MEDIA_EXTENSIONS = ('.pdf', '.mp4', '.ts')
+STALE_TMP_SECONDS = 3600  # .tmp sem alteração há mais de 1h = download abandonado
+REPORT_LIMIT = 20         # Arquivos listados por categoria no relatório
+
+# Pasta do programa: o downloader roda nela (iniciar.bat), então caminhos relativos
+# gravados no progresso e nas configurações partem daqui, não da pasta atual
+CONFIG_ROOT = Path(__file__).resolve().parent
+
+
+class FileEntry:
+    """Arquivo encontrado na varredura"""
+    
+    __slots__ = ('path', 'size', 'mtime')
+    
+    def __init__(self, path: str, size: int, mtime: float):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+
+class ExpectedItem:
+    """Item que o downloader salvaria com um nome de arquivo conhecido"""
+    
+    __slots__ = ('key', 'course_id', 'parent')
+    
+    def __init__(self, key: str, course_id: str, parent: Optional[str]):
+        """
+        Args:
+            key: Chave de progresso do item
+            course_id: ID do curso
+            parent: Nome da pasta onde o arquivo fica (None = pasta do curso)
+        """
+        self.key = key
+        self.course_id = course_id
+        self.parent = parent
+
+
+def scan_tree(root: Path) -> Dict[str, FileEntry]:
+    """
+    Lista todos os arquivos de uma pasta (os.scandir iterativo, sem recursão).
+    
+    Args:
+        root: Pasta raiz
+    
+    Returns:
+        Dicionário caminho_absoluto -> FileEntry
+    """
+    files: Dict[str, FileEntry] = {}
+    pending = [str(root)]
+    
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat()
+                            files[os.path.abspath(entry.path)] = FileEntry(
+                                entry.path, stat.st_size, stat.st_mtime
+                            )
+                    except OSError as e:
+                        logger.debug(f"Erro ao ler {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"⚠ Pasta inacessível: {current} ({e})")
+    
+    return files
+
+
+def _check_pdf(f, size: int) -> Optional[str]:
+    """Cabeçalho %PDF e marcador %%EOF no final"""
+    if f.read(4) != b'%PDF':
+        return "cabeçalho PDF ausente"
+    
+    f.seek(max(0, size - 2048))
+    if b'%%EOF' not in f.read():
+        return "PDF truncado (sem %%EOF)"
+    
+    return None
+
+
+def _check_mp4(f, size: int) -> Optional[str]:
+    """Percorre as caixas de nível superior: tamanhos coerentes e 'moov' presente"""
+    offset = 0
+    found_moov = False
+    
+    while offset < size:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return "MP4 truncado (cabeçalho de caixa incompleto)"
+        
+        box_size = int.from_bytes(header[:4], 'big')
+        box_type = header[4:8]
+        
+        if box_size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return "MP4 truncado (caixa de 64 bits incompleta)"
+            box_size = int.from_bytes(large, 'big')
+        elif box_size == 0:
+            box_size = size - offset  # Caixa vai até o fim do arquivo
+        
+        if box_size < 8:
+            return f"MP4 inválido (caixa '{box_type.decode('latin-1')}' com tamanho {box_size})"
+        
+        if box_type == b'moov':
+            found_moov = True
+        
+        offset += box_size
+    
+    if offset != size:
+        return "MP4 truncado (última caixa passa do fim do arquivo)"
+    if not found_moov:
+        return "MP4 sem caixa 'moov'"
+    
+    return None
+
+
+def _check_ts(f, size: int) -> Optional[str]:
+    """MPEG-TS: pacotes de 188 bytes, sincronismo 0x47 no primeiro e no último"""
+    if size % 188:
+        return "MPEG-TS truncado (tamanho não é múltiplo de 188)"
+    
+    if f.read(1) != b'\x47':
+        return "MPEG-TS sem byte de sincronismo"
+    
+    f.seek(size - 188)
+    if f.read(1) != b'\x47':
+        return "MPEG-TS truncado (último pacote inválido)"
+    
+    return None
+
+
+def check_structure(path: str) -> Optional[str]:
+    """
+    Verificação estrutural barata (só lê cabeçalhos e o final do arquivo).
+    
+    Args:
+        path: Caminho do arquivo
+    
+    Returns:
+        Descrição do problema ou None se o arquivo parece íntegro
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return "arquivo vazio"
+        
+        with open(path, 'rb') as f:
+            if path.lower().endswith('.pdf'):
+                return _check_pdf(f, size)
+            if path.lower().endswith('.mp4'):
+                return _check_mp4(f, size)
+            if path.lower().endswith('.ts'):
+                return _check_ts(f, size)
+    
+    except OSError as e:
+        return f"erro de leitura: {e}"
+    
+    return None
+
+
+def _lesson_names(lesson: dict) -> Tuple[str, str]:
+    """Nome e subtítulo da aula como o processador os sanitiza"""
+    name = lesson.get("name")
+    subtitle = lesson.get("subtitle")
+    
+    # Snapshots antigos só guardam 'nome - subtítulo'
+    if name is None:
+        name, _, subtitle = lesson.get("title", "").partition(" - ")
+    
+    return sanitize_filename(name or "Sem Título"), sanitize_filename(subtitle or "Sem Subtítulo")
+
+
+def build_expected(snapshots) -> Dict[str, List[ExpectedItem]]:
+    """
+    Deduz, dos snapshots do catálogo, os nomes de arquivo que o downloader usaria.
+    
+    Args:
+        snapshots: Snapshots de CatalogStore
+    
+    Returns:
+        Dicionário nome_do_arquivo -> itens possíveis
+    """
+    expected: Dict[str, List[ExpectedItem]] = {}
+    
+    def add(file_name: str, key: str, course_id: str, parent: Optional[str]) -> None:
+        expected.setdefault(file_name, []).append(ExpectedItem(key, course_id, parent))
+    
+    for snapshot in snapshots:
+        course_id = extract_course_id(snapshot.get("course_url", ""))
+        
+        for aula_id, lesson in snapshot.get("lessons", {}).items():
+            lesson_name, lesson_subtitle = _lesson_names(lesson)
+            
+            # PDFs: todas as variantes, na pasta do curso
+            base_file_name = sanitize_filename(f'{lesson_name} - {lesson_subtitle}', 180)
+            for href in lesson.get("pdfs", []):
+                if href.startswith('/api'):
+                    href = "https://www.estrategiaconcursos.com.br" + href
+                if not PDFProcessor.PDF_VARIANT_PATTERN.search(href):
+                    continue
+                for pdf_info in PDFProcessor.PDF_TYPES.values():
+                    variant_url = PDFProcessor.PDF_VARIANT_PATTERN.sub(
+                        f'/{pdf_info["urlPart"]}', href, count=1
+                    )
+                    file_name = f'{base_file_name} ({pdf_info["name"]}).pdf'
+                    add(file_name, pdf_key(aula_id, variant_url) or f'{aula_id}-{file_name}',
+                        course_id, None)
+            
+            # Vídeos e extras: pasta da aula (mesma regra de _get_video_ids)
+            videos = lesson.get("videos", [])
+            ids = [video_key(aula_id, v.get("href")) for v in videos]
+            if None in ids or len(set(ids)) != len(ids):
+                ids = [None] * len(videos)
+            
+            for index, (video, vid) in enumerate(zip(videos, ids), 1):
+                title = sanitize_filename(video.get("title") or "")
+                
+                for resolution in VideoProcessor.AVAILABLE_RESOLUTIONS:
+                    file_name = sanitize_filename(
+                        VideoProcessor._video_file_name(lesson_name, index, title, resolution)
+                    )
+                    add(file_name, vid or f'{aula_id}-{title}-{index}', course_id, lesson_name)
+                    # Streams HLS em MPEG-TS são salvos com a extensão .ts
+                    add(Path(file_name).with_suffix('.ts').name, vid or f'{aula_id}-{title}-{index}', course_id, lesson_name)
+                
+                for kind, info in VideoProcessor.EXTRA_TYPES.items():
+                    file_name = sanitize_filename(
+                        f'{lesson_name} - Vídeo {index} {title} - {info["suffix"]}.pdf'
+                    )
+                    key = extra_key(vid, kind) if vid else f'{aula_id}-{title}-{index}-{kind}'
+                    add(file_name, key, course_id, lesson_name)
+    
+    return expected
+
+
+def match_expected(
+    path: str,
+    expected: Dict[str, List[ExpectedItem]]
+) -> Optional[ExpectedItem]:
+    """
+    Associa um arquivo a um item esperado pelo nome (e pasta, se houver empate).
+    
+    Args:
+        path: Caminho do arquivo
+        expected: Resultado de build_expected()
+    
+    Returns:
+        Item ou None (desconhecido ou ambíguo)
+    """
+    candidates = expected.get(os.path.basename(path))
+    if not candidates:
+        return None
+    
+    parent = os.path.basename(os.path.dirname(path))
+    same_folder = [c for c in candidates if c.parent is None or c.parent == parent]
+    
+    keys = {c.key for c in same_folder}
+    return same_folder[0] if len(keys) == 1 else None
+
+
+class Reconciler:
+    """Compara progresso, catálogo e disco e repara o progresso"""
+    
+    def __init__(
+        self,
+        roots: List[Path],
+        progress: ProgressManager,
+        catalog: CatalogStore,
+        workers: int = 8,
+        base_dir: Path = CONFIG_ROOT
+    ):
+        """
+        Inicializa a reconciliação.
+        
+        Args:
+            roots: Pastas de download
+            progress: Gerenciador de progresso
+            catalog: Snapshots do catálogo (nomes de arquivo esperados)
+            workers: Threads para as verificações estruturais
+            base_dir: Pasta de onde partem os caminhos relativos do progresso
+        """
+        self.base_dir = Path(base_dir)
+        self.roots = [self._resolve(str(root)) for root in roots]
+        self.progress = progress
+        self.catalog = catalog
+        self.workers = max(1, workers)
+        
+        # Sem snapshots não há nomes esperados: arquivos sem registro não são reconstruídos
+        self.catalog_missing = False
+        self.outside_roots = 0
+        
+        self.report: Dict[str, List[str]] = {
+            "ok": [],
+            "reconstruidos": [],
+            "atualizados": [],
+            "ausentes": [],
+            "danificados": [],
+            "orfaos": [],
+            "nao_identificados": [],
+            "vazios": [],
+            "tmp_abandonados": []
+        }
+    
+    def run(self, apply: bool = False, clean: bool = False) -> Dict[str, List[str]]:
+        """
+        Executa a reconciliação.
+        
+        Args:
+            apply: Grava os reparos no progresso
+            clean: Remove arquivos vazios e .tmp abandonados
+        
+        Returns:
+            Relatório por categoria (listas de caminhos/chaves)
+        """
+        started = time.monotonic()
+        
+        files: Dict[str, FileEntry] = {}
+        for root in self.roots:
+            if os.path.isdir(root):
+                files.update(scan_tree(Path(root)))
+            else:
+                logger.warning(f"⚠ Pasta de downloads não encontrada: {root}")
+        
+        logger.info(f"📂 {len(files)} arquivo(s) encontrados em {time.monotonic() - started:.1f}s")
+        
+        snapshots = list(self.catalog.load_all())
+        expected = build_expected(snapshots)
+        self.catalog_missing = not snapshots
+        now = time.time()
+        
+        # 1. Sobras: arquivos vazios e .tmp abandonados
+        for abs_path, entry in files.items():
+            if abs_path.endswith('.tmp'):
+                if now - entry.mtime > STALE_TMP_SECONDS:
+                    self.report["tmp_abandonados"].append(entry.path)
+            elif entry.size == 0:
+                self.report["vazios"].append(entry.path)
+        
+        # 2. Itens do progresso com caminho registrado (só os das pastas verificadas)
+        known: Dict[str, Tuple[str, Optional[str], Optional[int]]] = {}
+        missing = []
+        for row in self.progress.store.completed_files():
+            abs_path = self._resolve(row["path"])
+            if abs_path in files:
+                known[abs_path] = (row["key"], row["course_id"], row["size"])
+            elif self._under_roots(abs_path):
+                missing.append(row["key"])
+            else:
+                self.outside_roots += 1
+        
+        # 3. Arquivos de mídia ainda sem registro: casa com o catálogo
+        matched: Dict[str, ExpectedItem] = {}
+        for abs_path, entry in files.items():
+            if abs_path in known or not abs_path.lower().endswith(MEDIA_EXTENSIONS) or entry.size == 0:
+                continue
+            item = match_expected(abs_path, expected)
+            if item is not None:
+                matched[abs_path] = item
+            elif self.catalog_missing:
+                self.report["nao_identificados"].append(entry.path)
+            else:
+                self.report["orfaos"].append(entry.path)
+        
+        if self.report["nao_identificados"]:
+            logger.warning(
+                f"⚠ Nenhum snapshot do catálogo em {self.catalog.catalog_dir}: "
+                f"{len(self.report['nao_identificados'])} arquivo(s) sem registro não podem ser "
+                "identificados (ative syncConfig.apenasNovidades e sincronize uma vez)"
+            )
+        
+        # 4. Verificação estrutural em paralelo (só cabeçalhos e final dos arquivos)
+        to_check = list(known) + list(matched)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            problems = dict(zip(to_check, pool.map(check_structure, to_check)))
+        
+        for key in missing:
+            self.report["ausentes"].append(key)
+            if apply:
+                self.progress.invalidate(key, "arquivo ausente no disco")
+        
+        for abs_path, (key, course_id, size) in known.items():
+            entry = files[abs_path]
+            problem = problems[abs_path]
+            
+            if problem:
+                self.report["danificados"].append(f"{entry.path} ({problem})")
+                if apply:
+                    self.progress.invalidate(key, problem)
+            elif size != entry.size:
+                # Arquivo trocado depois do download: atualiza tamanho, hash antigo não vale
+                self.report["atualizados"].append(entry.path)
+                if apply:
+                    self.progress.mark_completed(key, self._file_info(entry), course_id)
+            else:
+                self.report["ok"].append(entry.path)
+        
+        for abs_path, item in matched.items():
+            entry = files[abs_path]
+            problem = problems[abs_path]
+            
+            if problem:
+                self.report["danificados"].append(f"{entry.path} ({problem})")
+                continue
+            
+            # Concluído sem caminho (registro antigo) ou ausente do progresso
+            self.report["reconstruidos"].append(entry.path)
+            if apply:
+                self.progress.mark_completed(item.key, self._file_info(entry), item.course_id)
+        
+        if clean:
+            self._clean()
+        
+        self.progress.flush()
+        logger.info(f"⏱️  Reconciliação concluída em {time.monotonic() - started:.1f}s")
+        
+        return self.report
+    
+    def _resolve(self, path: str) -> str:
+        """Caminho absoluto (relativos partem de base_dir)"""
+        return os.path.abspath(os.path.join(self.base_dir, os.path.expanduser(path)))
+    
+    def _under_roots(self, abs_path: str) -> bool:
+        """True se o caminho está dentro de uma das pastas verificadas"""
+        path = os.path.normcase(abs_path)
+        for root in self.roots:
+            root = os.path.normcase(root)
+            try:
+                if os.path.commonpath([path, root]) == root:
+                    return True
+            except ValueError:
+                continue  # Outro drive (Windows)
+        return False
+    
+    @staticmethod
+    def _file_info(entry: FileEntry) -> dict:
+        """Dados do arquivo no formato de mark_as_downloaded()"""
+        return {
+            "path": entry.path,
+            "size": entry.size,
+            "sha256": None,
+            "completed_at": int(entry.mtime)
+        }
+    
+    def _clean(self) -> None:
+        """Remove arquivos vazios e .tmp abandonados"""
+        removed = 0
+        freed = 0
+        
+        for path in self.report["vazios"] + self.report["tmp_abandonados"]:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+                freed += size
+            except OSError as e:
+                logger.warning(f"⚠ Não foi possível remover {path}: {e}")
+        
+        logger.info(f"🧹 {removed} arquivo(s) removido(s) ({format_bytes(freed)} liberados)")
+    
+    def log_report(self, apply: bool) -> None:
+        """
+        Loga o resumo e exemplos de cada categoria.
+        
+        Args:
+            apply: Se os reparos foram gravados
+        """
+        labels = {
+            "ok": "✅ Íntegros e registrados",
+            "reconstruidos": "🔁 Reconstruídos a partir do disco",
+            "atualizados": "✏️  Registro atualizado (tamanho mudou)",
+            "ausentes": "❓ Registrados mas ausentes no disco",
+            "danificados": "💥 Danificados",
+            "orfaos": "👻 Órfãos (sem item correspondente)",
+            "nao_identificados": "❔ Sem registro (catálogo indisponível)",
+            "vazios": "🕳️  Vazios",
+            "tmp_abandonados": "🗑️  .tmp abandonados"
+        }
+        
+        logger.info("=" * 70)
+        logger.info("📊 RECONCILIAÇÃO")
+        logger.info("=" * 70)
+        
+        if self.outside_roots:
+            logger.info(f"📁 Registros fora das pastas verificadas (ignorados): {self.outside_roots}")
+        
+        for name, label in labels.items():
+            entries = self.report[name]
+            logger.info(f"{label}: {len(entries)}")
+            if name != "ok":
+                for entry in entries[:REPORT_LIMIT]:
+                    logger.info(f"   {entry}")
+                if len(entries) > REPORT_LIMIT:
+                    logger.info(f"   ... e mais {len(entries) - REPORT_LIMIT}")
+        
+        if not apply and (self.report["reconstruidos"] or self.report["ausentes"]
+                          or self.report["danificados"] or self.report["atualizados"]):
+            logger.info("💡 Execute com --aplicar para gravar os reparos no progresso")
+        
+        logger.info("=" * 70)
+
+
+def main() -> int:
+    """
+    Função principal para execução via linha de comando.
+    
+    Returns:
+        Código de saída (0 = sucesso, 1 = sem snapshots do catálogo para identificar arquivos)
+    """
+    global logger
+    logger = setup_logger(__name__)
+    
+    parser = argparse.ArgumentParser(description="Reconcilia o progresso com os arquivos baixados")
+    parser.add_argument("--aplicar", action="store_true", help="grava os reparos no progresso")
+    parser.add_argument("--limpar", action="store_true", help="remove arquivos vazios e .tmp abandonados")
+    parser.add_argument("--pasta", action="append", help="pasta de downloads (padrão: as do config)")
+    parser.add_argument("--threads", type=int, default=min(32, (os.cpu_count() or 4) * 2),
+                        help="threads para as verificações estruturais")
+    args = parser.parse_args()
+    
+    config = ConfigManager()
+    
+    if args.pasta:
+        roots = [Path(p).resolve() for p in args.pasta]
+    else:
+        roots = []
+        for section in ("pdfConfig", "videoConfig"):
+            folder = config.get(section, "pastaDownloads")
+            if folder and Path(folder) not in roots:
+                roots.append(Path(folder))
+    
+    progress = ProgressManager()
+    try:
+        reconciler = Reconciler(
+            roots,
+            progress,
+            CatalogStore(config.get("syncConfig", "pastaCatalogo", default=None)),
+            workers=args.threads
+        )
+        reconciler.run(apply=args.aplicar, clean=args.limpar)
+        reconciler.log_report(args.aplicar)
+    finally:
+        progress.close()
+    
+    return 1 if reconciler.catalog_missing and reconciler.report["nao_identificados"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
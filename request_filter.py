@@ -0,0 +1,192 @@
+"""
+Filtro de Requisições do Navegador
+Bloqueia imagens, fontes, mídia e rastreadores que a automação não precisa
+"""
+import logging
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Route
+from utils import format_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class RequestFilter:
+    """Intercepta requisições do contexto e descarta as desnecessárias"""
+    
+    # Tipos de recurso liberados por padrão (SPA precisa de JS, XHR e HTML)
+    DEFAULT_ALLOWED_TYPES = [
+        'document', 'script', 'xhr', 'fetch', 'stylesheet', 'websocket', 'manifest', 'other'
+    ]
+    
+    # Domínios de analytics/rastreamento (bloqueados mesmo sendo script/xhr)
+    DEFAULT_BLOCKED_HOSTS = [
+        'google-analytics.com',
+        'googletagmanager.com',
+        'doubleclick.net',
+        'facebook.net',
+        'facebook.com',
+        'hotjar.com',
+        'clarity.ms',
+        'tiktok.com',
+        'linkedin.com',
+        'bing.com',
+        'onesignal.com',
+        'intercom.io',
+        'rdstation.com.br',
+        'rdstation.com',
+    ]
+    
+    # Tamanhos médios usados para estimar bytes economizados (não são medidos)
+    ESTIMATED_SIZES = {
+        'image': 40 * 1024,
+        'font': 60 * 1024,
+        'media': 1024 * 1024,
+        'tracker': 30 * 1024,
+    }
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        allowed_types: Optional[Iterable[str]] = None,
+        blocked_hosts: Optional[Iterable[str]] = None,
+        allowed_hosts: Optional[Iterable[str]] = None
+    ):
+        """
+        Inicializa o filtro.
+        
+        Args:
+            enabled: Se False, nenhuma requisição é interceptada
+            allowed_types: Tipos de recurso permitidos (allowlist)
+            blocked_hosts: Domínios sempre bloqueados (inclui subdomínios)
+            allowed_hosts: Se informado, apenas estes domínios são permitidos
+        """
+        self.enabled = enabled
+        self.allowed_types = set(allowed_types or self.DEFAULT_ALLOWED_TYPES)
+        self.blocked_hosts = tuple(h.lower() for h in (blocked_hosts or self.DEFAULT_BLOCKED_HOSTS))
+        self.allowed_hosts = tuple(h.lower() for h in (allowed_hosts or []))
+        
+        self.allowed_count = 0
+        self.blocked_by_type: Dict[str, int] = {}
+    
+    @classmethod
+    def from_config(cls, config_manager) -> "RequestFilter":
+        """
+        Cria filtro a partir da seção 'browserConfig' das configurações.
+        
+        Args:
+            config_manager: Gerenciador de configurações
+        
+        Returns:
+            Instância configurada
+        """
+        return cls(
+            enabled=config_manager.get("browserConfig", "bloquearRecursos", default=True),
+            allowed_types=config_manager.get("browserConfig", "tiposPermitidos", default=None),
+            blocked_hosts=config_manager.get("browserConfig", "hostsBloqueados", default=None),
+            allowed_hosts=config_manager.get("browserConfig", "hostsPermitidos", default=None)
+        )
+    
+    @staticmethod
+    def _host_matches(host: str, domains: tuple) -> bool:
+        """Verifica se host é igual ou subdomínio de algum domínio da lista"""
+        return any(host == d or host.endswith('.' + d) for d in domains)
+    
+    def classify(self, url: str, resource_type: str) -> Optional[str]:
+        """
+        Decide se uma requisição deve ser bloqueada.
+        
+        Args:
+            url: URL da requisição
+            resource_type: Tipo de recurso do Playwright
+        
+        Returns:
+            Motivo do bloqueio ('tracker', tipo de recurso) ou None se permitida
+        """
+        if url.startswith(('data:', 'blob:')):
+            return None
+        
+        host = (urlparse(url).hostname or '').lower()
+        
+        if self._host_matches(host, self.blocked_hosts):
+            return 'tracker'
+        
+        if self.allowed_hosts and not self._host_matches(host, self.allowed_hosts):
+            return 'host'
+        
+        if resource_type not in self.allowed_types:
+            return resource_type
+        
+        return None
+    
+    async def install(self, context: BrowserContext) -> None:
+        """
+        Registra o interceptador em todas as páginas do contexto.
+        
+        Args:
+            context: Contexto do navegador
+        """
+        if not self.enabled:
+            logger.info("✓ Filtro de requisições desativado")
+            return
+        
+        await context.route("**/*", self._handle_route)
+        logger.info(f"✓ Filtro de requisições ativo (permitidos: {', '.join(sorted(self.allowed_types))})")
+    
+    async def _handle_route(self, route: Route) -> None:
+        """Aborta ou libera requisição interceptada"""
+        request = route.request
+        
+        try:
+            reason = self.classify(request.url, request.resource_type)
+        except Exception as e:
+            logger.debug(f"Erro ao classificar requisição: {e}")
+            reason = None
+        
+        try:
+            if reason:
+                self.blocked_by_type[reason] = self.blocked_by_type.get(reason, 0) + 1
+                await route.abort('blockedbyclient')
+            else:
+                self.allowed_count += 1
+                await route.continue_()
+        except Exception as e:
+            # Página pode ter sido fechada durante a requisição
+            logger.debug(f"Erro ao tratar requisição interceptada: {e}")
+    
+    def get_stats(self) -> dict:
+        """
+        Obtém estatísticas de bloqueio.
+        
+        Returns:
+            Dicionário com requisições liberadas/bloqueadas e bytes estimados
+        """
+        blocked_total = sum(self.blocked_by_type.values())
+        estimated_bytes = sum(
+            count * self.ESTIMATED_SIZES.get(kind, 0)
+            for kind, count in self.blocked_by_type.items()
+        )
+        
+        return {
+            "allowed": self.allowed_count,
+            "blocked": blocked_total,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": estimated_bytes
+        }
+    
+    def log_stats(self, logger: logging.Logger) -> None:
+        """
+        Loga estatísticas de bloqueio.
+        
+        Args:
+            logger: Logger para output
+        """
+        if not self.enabled:
+            return
+        
+        stats = self.get_stats()
+        details = ', '.join(f"{k}: {v}" for k, v in sorted(stats["blocked_by_type"].items()))
+        
+        logger.info(f"🛡️  Requisições bloqueadas: {stats['blocked']} ({details or 'nenhuma'})")
+        logger.info(f"🛡️  Requisições liberadas: {stats['allowed']}")
+        logger.info(f"🛡️  Economia estimada: {format_bytes(stats['estimated_bytes_saved'])}")
@@ -0,0 +1,239 @@
+"""
+Resolução Automática
+Escolhe a resolução de cada vídeo pela vazão medida, pelo tamanho estimado do que
+ainda falta baixar e pelo prazo desejado para terminar a execução
+"""
+import logging
+import time
+from typing import Dict, List, Optional
+from utils import format_bytes
+
+logger = logging.getLogger(__name__)
+
+AUTO_RESOLUTION = 'auto'
+
+# Peso da amostra mais recente na média móvel da vazão
+THROUGHPUT_EWMA_ALPHA = 0.3
+
+# Tempo mínimo de link ocupado por amostra (várias conclusões por amostra, sem picos)
+SAMPLE_WINDOW_SECONDS = 60.0
+
+# Bytes baixados antes de confiar na vazão medida (até lá, usa a maior resolução)
+MIN_MEASURED_BYTES = 20 * 1024 * 1024
+
+
+class ResolutionPolicy:
+    """Política 'auto' de resolução compartilhada pelos cursos da execução"""
+    
+    def __init__(self, resolutions: List[str], deadline_hours: float = 12, pending_courses: int = 0):
+        """
+        Inicializa a política.
+        
+        Args:
+            resolutions: Resoluções da maior para a menor (ex: ['720p', '480p', '360p'])
+            deadline_hours: Prazo para terminar a fila, em horas a partir de agora
+            pending_courses: Cursos da execução ainda não iniciados
+        """
+        self.resolutions = list(resolutions)
+        self.deadline = time.time() + max(0.1, float(deadline_hours)) * 3600
+        self.pending_courses = max(0, pending_courses)
+        
+        # Vazão agregada: bytes por segundo com pelo menos uma transferência ativa
+        self.throughput: Optional[float] = None
+        self.measured_bytes = 0
+        self._active = 0
+        self._busy_since: Optional[float] = None
+        self._window_busy = 0.0
+        self._window_bytes = 0
+        
+        # Bytes já escolhidos e ainda não transferidos
+        self.queued_bytes = 0
+        
+        # Aulas restantes por curso iniciado e médias observadas
+        self._remaining_lessons: Dict[str, int] = {}
+        self._started_courses = set()
+        self.lessons_seen = 0
+        self.lessons_total = 0
+        self.videos_decided = 0
+        
+        # Tamanho médio de cada resolução (vídeos sondados)
+        self._size_sum: Dict[str, int] = {res: 0 for res in self.resolutions}
+        self._size_count: Dict[str, int] = {res: 0 for res in self.resolutions}
+        
+        # Relatório: vídeos por resolução e bytes comparados à maior resolução
+        self.chosen: Dict[str, int] = {res: 0 for res in self.resolutions}
+        self.bytes_chosen = 0
+        self.bytes_at_top = 0
+    
+    # ----- Fila restante -----
+    
+    def start_course(self, course_id: str, total_lessons: int) -> None:
+        """
+        Registra o início de um curso (a retomada após queda não conta de novo).
+        
+        Args:
+            course_id: ID do curso
+            total_lessons: Aulas do curso
+        """
+        if course_id not in self._started_courses:
+            self._started_courses.add(course_id)
+            self.pending_courses = max(0, self.pending_courses - 1)
+            self.lessons_total += total_lessons
+        self._remaining_lessons[course_id] = total_lessons
+    
+    def lesson_done(self, course_id: str) -> None:
+        """Conta uma aula processada do curso"""
+        self.lessons_seen += 1
+        if self._remaining_lessons.get(course_id, 0) > 0:
+            self._remaining_lessons[course_id] -= 1
+    
+    def finish_course(self, course_id: str) -> None:
+        """Remove o curso da fila restante"""
+        self._remaining_lessons.pop(course_id, None)
+    
+    def backlog_videos(self) -> float:
+        """
+        Estimativa de vídeos que ainda serão baixados.
+        
+        Usa a média observada de vídeos baixados por aula (aulas puladas ou já
+        baixadas entram na média) e de aulas por curso.
+        
+        Returns:
+            Quantidade estimada de vídeos (inclui o atual)
+        """
+        per_lesson = self.videos_decided / self.lessons_seen if self.lessons_seen else 1.0
+        remaining_lessons = sum(self._remaining_lessons.values())
+        
+        if self.pending_courses:
+            started = len(self._started_courses)
+            per_course = self.lessons_total / started if started else 0
+            remaining_lessons += self.pending_courses * per_course
+        
+        return max(1.0, remaining_lessons * per_lesson)
+    
+    def average_size(self, resolution: str, sizes: Dict[str, int]) -> Optional[float]:
+        """Tamanho médio observado de uma resolução (ou o do vídeo atual)"""
+        if self._size_count.get(resolution):
+            return self._size_sum[resolution] / self._size_count[resolution]
+        return sizes.get(resolution)
+    
+    # ----- Vazão -----
+    
+    def transfer_started(self) -> None:
+        """Marca o início de uma transferência de vídeo"""
+        if self._active == 0:
+            self._busy_since = time.monotonic()
+        self._active += 1
+    
+    def dequeue(self, expected: int) -> None:
+        """
+        Tira da fila os bytes previstos de um vídeo (baixado, recusado ou descartado).
+        
+        Args:
+            expected: Bytes previstos na escolha
+        """
+        self.queued_bytes = max(0, self.queued_bytes - expected)
+    
+    def transfer_finished(self, written: int) -> None:
+        """
+        Marca o fim de uma transferência e atualiza a vazão medida.
+        
+        Args:
+            written: Bytes baixados (0 se falhou)
+        """
+        self._active = max(0, self._active - 1)
+        self.measured_bytes += written
+        self._window_bytes += written
+        
+        # Tempo com o link ocupado (transferências simultâneas contam uma vez)
+        now = time.monotonic()
+        if self._busy_since is not None:
+            self._window_busy += now - self._busy_since
+        self._busy_since = now if self._active else None
+        
+        if self._window_busy < SAMPLE_WINDOW_SECONDS and self.throughput is not None:
+            return
+        if not self._window_bytes or self._window_busy <= 0:
+            return
+        
+        sample = self._window_bytes / self._window_busy
+        if self.throughput is None:
+            self.throughput = sample
+        else:
+            self.throughput += THROUGHPUT_EWMA_ALPHA * (sample - self.throughput)
+        
+        if self._window_busy >= SAMPLE_WINDOW_SECONDS:
+            self._window_busy = 0.0
+            self._window_bytes = 0
+    
+    # ----- Decisão -----
+    
+    def choose(self, sizes: Dict[str, int]) -> str:
+        """
+        Escolhe a resolução de um vídeo.
+        
+        A maior resolução cuja fila estimada (bytes já escolhidos + vídeos restantes
+        no tamanho médio dela) termina dentro do prazo com a vazão medida; sem
+        medição suficiente, a maior disponível.
+        
+        Args:
+            sizes: Tamanho deste vídeo em cada resolução disponível
+        
+        Returns:
+            Resolução escolhida
+        """
+        available = [res for res in self.resolutions if sizes.get(res)]
+        for res in available:
+            self._size_sum[res] += sizes[res]
+            self._size_count[res] += 1
+        
+        self.videos_decided += 1
+        backlog = self.backlog_videos()
+        time_left = max(0.0, self.deadline - time.time())
+        
+        chosen = available[0]
+        reason = "sem vazão medida"
+        
+        if self.throughput and self.measured_bytes >= MIN_MEASURED_BYTES:
+            chosen = available[-1]
+            reason = "nenhuma resolução cabe no prazo"
+            for res in available:
+                needed = self.queued_bytes + backlog * self.average_size(res, sizes)
+                if needed / self.throughput <= time_left:
+                    chosen = res
+                    reason = f"fila ~{format_bytes(int(needed))} em {needed / self.throughput / 3600:.1f}h"
+                    break
+        
+        self.chosen[chosen] += 1
+        self.bytes_chosen += sizes[chosen]
+        self.bytes_at_top += sizes[available[0]]
+        self.queued_bytes += sizes[chosen]
+        
+        speed = f"{format_bytes(int(self.throughput))}/s" if self.throughput else "?"
+        trade_off = ', '.join(f"{res} {format_bytes(sizes[res])}" for res in available)
+        logger.info(
+            f"🎚️  Auto: {chosen} ({trade_off}) | {reason}, ~{backlog:.0f} vídeo(s) restantes, "
+            f"{speed}, prazo em {time_left / 3600:.1f}h"
+        )
+        
+        return chosen
+    
+    def log_report(self, logger: logging.Logger) -> None:
+        """
+        Loga as escolhas da execução e a economia em relação à maior resolução.
+        
+        Args:
+            logger: Logger de destino
+        """
+        if not self.videos_decided:
+            return
+        
+        distribution = ', '.join(f"{res}: {count}" for res, count in self.chosen.items() if count)
+        saved = self.bytes_at_top - self.bytes_chosen
+        speed = f"{format_bytes(int(self.throughput))}/s" if self.throughput else "não medida"
+        
+        logger.info(f"🎚️  Resolução automática: {distribution}")
+        logger.info(
+            f"   {format_bytes(self.bytes_chosen)} escolhidos vs {format_bytes(self.bytes_at_top)} "
+            f"na maior resolução ({format_bytes(saved)} economizados), vazão {speed}"
+        )
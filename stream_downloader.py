@@ -0,0 +1,663 @@
+"""
+Download de Streams Segmentados (HLS/DASH)
+Lê o manifesto (.m3u8/.mpd), escolhe a rendição da resolução preferida e baixa os
+segmentos em paralelo, gravando-os em ordem num único arquivo MP4 ou TS
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+import aiohttp
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from utils import download_file
+
+MANIFEST_PATTERN = re.compile(r'\.(m3u8|mpd)$', re.IGNORECASE)
+
+SEGMENT_CONCURRENCY = 4   # Segmentos baixados ao mesmo tempo
+SEGMENT_WINDOW = 12       # Segmentos à frente do último gravado (limite de memória)
+
+
+class StreamError(Exception):
+    """Manifesto inválido ou recurso de streaming não suportado"""
+    pass
+
+
+class StreamKey:
+    """Chave de criptografia AES-128 de um trecho da playlist HLS"""
+    
+    __slots__ = ('uri', 'iv')
+    
+    def __init__(self, uri: str, iv: Optional[bytes]):
+        self.uri = uri
+        self.iv = iv
+
+
+class Segment:
+    """Segmento (ou inicialização) a baixar"""
+    
+    __slots__ = ('url', 'byte_range', 'key', 'sequence')
+    
+    def __init__(
+        self,
+        url: str,
+        byte_range: Optional[Tuple[int, int]] = None,
+        key: Optional[StreamKey] = None,
+        sequence: int = 0
+    ):
+        """
+        Args:
+            url: URL absoluta
+            byte_range: Intervalo (início, fim inclusivo) ou None para o arquivo todo
+            key: Chave AES-128 (HLS) ou None
+            sequence: Número de sequência (IV padrão do HLS)
+        """
+        self.url = url
+        self.byte_range = byte_range
+        self.key = key
+        self.sequence = sequence
+
+
+class StreamPlan:
+    """Rendição escolhida e lista ordenada de segmentos"""
+    
+    def __init__(
+        self,
+        container: str,
+        segments: List[Segment],
+        init: Optional[Segment] = None,
+        description: str = ""
+    ):
+        """
+        Args:
+            container: Extensão do arquivo final ('.mp4' ou '.ts')
+            segments: Segmentos de mídia em ordem
+            init: Segmento de inicialização (fMP4), gravado primeiro
+            description: Rendição escolhida (para o log)
+        """
+        self.container = container
+        self.segments = segments
+        self.init = init
+        self.description = description
+
+
+def stream_kind(url: Optional[str]) -> Optional[str]:
+    """
+    Identifica URLs de manifesto de streaming.
+    
+    Args:
+        url: URL do vídeo
+    
+    Returns:
+        'hls', 'dash' ou None
+    """
+    if not url:
+        return None
+    match = MANIFEST_PATTERN.search(urlparse(url).path)
+    if not match:
+        return None
+    return 'hls' if match.group(1).lower() == 'm3u8' else 'dash'
+
+
+def _target_height(resolution: Optional[str]) -> int:
+    """Altura em pixels de '720p', '480p'... (720 se não reconhecida)"""
+    match = re.match(r'(\d+)p$', resolution or '')
+    return int(match.group(1)) if match else 720
+
+
+def _pick_rendition(renditions: List[dict], height: int) -> dict:
+    """
+    Escolhe a rendição pela altura: a exata, senão a maior abaixo, senão a menor acima.
+    
+    Args:
+        renditions: Dicionários com 'height' (0 = desconhecida) e 'bandwidth'
+        height: Altura desejada
+    
+    Returns:
+        Rendição escolhida
+    """
+    def rank(r):
+        return (r['height'], r['bandwidth'])
+    
+    exact = [r for r in renditions if r['height'] == height]
+    if exact:
+        return max(exact, key=rank)
+    
+    below = [r for r in renditions if 0 < r['height'] < height]
+    if below:
+        return max(below, key=rank)
+    
+    above = [r for r in renditions if r['height'] > height]
+    if above:
+        return min(above, key=rank)
+    
+    return max(renditions, key=rank)
+
+
+# ----- HLS -----
+
+_ATTRIBUTE_PATTERN = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def _hls_attributes(line: str) -> Dict[str, str]:
+    """Atributos de uma tag HLS (ex: #EXT-X-KEY:METHOD=AES-128,URI="...")"""
+    _, _, values = line.partition(':')
+    return {name: value.strip('"') for name, value in _ATTRIBUTE_PATTERN.findall(values)}
+
+
+def _hls_byte_range(value: str, next_offset: int) -> Tuple[int, int]:
+    """Converte 'tamanho[@início]' em (início, fim inclusivo)"""
+    length, _, start = value.partition('@')
+    offset = int(start) if start else next_offset
+    return offset, offset + int(length) - 1
+
+
+def _parse_hls_master(text: str, base_url: str, height: int) -> Tuple[str, str]:
+    """
+    Escolhe a variante de uma playlist mestre.
+    
+    Returns:
+        Tupla (url da playlist de mídia, descrição)
+    
+    Raises:
+        StreamError: Se só houver variantes com áudio separado
+    """
+    audio_groups = set()
+    variants = []
+    pending = None
+    
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#EXT-X-MEDIA:'):
+            attributes = _hls_attributes(line)
+            if attributes.get('TYPE') == 'AUDIO' and attributes.get('URI'):
+                audio_groups.add(attributes.get('GROUP-ID'))
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending = _hls_attributes(line)
+        elif line and not line.startswith('#') and pending is not None:
+            resolution = pending.get('RESOLUTION', '')
+            variants.append({
+                'url': urljoin(base_url, line),
+                'height': int(resolution.split('x')[1]) if 'x' in resolution else 0,
+                'bandwidth': int(pending.get('BANDWIDTH', 0) or 0),
+                'resolution': resolution,
+                'audio': pending.get('AUDIO')
+            })
+            pending = None
+    
+    if not variants:
+        raise StreamError("Playlist mestre sem variantes")
+    
+    # Áudio em playlist separada exigiria remux: só variantes com áudio embutido
+    muxed = [v for v in variants if v['audio'] not in audio_groups]
+    if not muxed:
+        raise StreamError("Stream HLS com áudio separado (remux não suportado)")
+    
+    chosen = _pick_rendition(muxed, height)
+    return chosen['url'], chosen['resolution'] or f"{chosen['bandwidth']} bps"
+
+
+def _parse_hls_media(text: str, base_url: str) -> StreamPlan:
+    """
+    Lê uma playlist de mídia HLS (VOD).
+    
+    Raises:
+        StreamError: Se for transmissão ao vivo ou usar criptografia não suportada
+    """
+    if '#EXT-X-ENDLIST' not in text:
+        raise StreamError("Playlist HLS sem #EXT-X-ENDLIST (transmissão ao vivo)")
+    
+    segments: List[Segment] = []
+    init = None
+    key = None
+    sequence = 0
+    byte_range = None
+    next_offset = 0
+    
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        
+        if line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            sequence = int(line.split(':', 1)[1])
+        
+        elif line.startswith('#EXT-X-KEY:'):
+            attributes = _hls_attributes(line)
+            method = attributes.get('METHOD', 'NONE')
+            if method == 'NONE':
+                key = None
+            elif method == 'AES-128':
+                iv = attributes.get('IV')
+                key = StreamKey(
+                    urljoin(base_url, attributes['URI']),
+                    bytes.fromhex(iv[2:] if iv.lower().startswith('0x') else iv) if iv else None
+                )
+            else:
+                raise StreamError(f"Criptografia HLS não suportada: {method}")
+        
+        elif line.startswith('#EXT-X-MAP:'):
+            attributes = _hls_attributes(line)
+            init_range = None
+            if attributes.get('BYTERANGE'):
+                init_range = _hls_byte_range(attributes['BYTERANGE'], 0)
+            init = Segment(urljoin(base_url, attributes['URI']), init_range, key)
+        
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            byte_range = _hls_byte_range(line.split(':', 1)[1], next_offset)
+        
+        elif not line.startswith('#'):
+            segments.append(Segment(urljoin(base_url, line), byte_range, key, sequence))
+            if byte_range:
+                next_offset = byte_range[1] + 1
+            byte_range = None
+            sequence += 1
+    
+    if not segments:
+        raise StreamError("Playlist HLS sem segmentos")
+    
+    # fMP4 (com #EXT-X-MAP) vira MP4 fragmentado; senão, MPEG-TS
+    return StreamPlan('.mp4' if init else '.ts', segments, init)
+
+
+# ----- DASH -----
+
+_DURATION_PATTERN = re.compile(
+    r'P(?:(?P<days>[\d.]+)D)?(?:T(?:(?P<hours>[\d.]+)H)?(?:(?P<minutes>[\d.]+)M)?(?:(?P<seconds>[\d.]+)S)?)?'
+)
+_TEMPLATE_PATTERN = re.compile(r'\$(RepresentationID|Number|Bandwidth|Time)(?:%0(\d+)d)?\$')
+
+
+def _iso_duration(value: Optional[str]) -> float:
+    """Converte duração ISO 8601 (ex: PT1H2M3.5S) em segundos"""
+    match = _DURATION_PATTERN.fullmatch(value or '')
+    if not match:
+        return 0.0
+    parts = {name: float(number) for name, number in match.groupdict().items() if number}
+    return (parts.get('days', 0) * 86400 + parts.get('hours', 0) * 3600
+            + parts.get('minutes', 0) * 60 + parts.get('seconds', 0))
+
+
+def _local(tag: str) -> str:
+    """Nome da tag sem o namespace XML"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child(element, name: str):
+    """Primeiro filho com o nome (ignorando namespace)"""
+    return next((c for c in element if _local(c.tag) == name), None)
+
+
+def _children(element, name: str) -> list:
+    """Filhos com o nome (ignorando namespace)"""
+    return [c for c in element if _local(c.tag) == name]
+
+
+def _base_url(element, base: str) -> str:
+    """Aplica o <BaseURL> do elemento, se houver"""
+    node = _child(element, 'BaseURL')
+    return urljoin(base, node.text.strip()) if node is not None and node.text else base
+
+
+def _fill_template(template: str, values: Dict[str, object]) -> str:
+    """Substitui $Number$, $Time$, $RepresentationID$, $Bandwidth$ (com %0Nd) e $$"""
+    def substitute(match):
+        value = values[match.group(1)]
+        width = match.group(2)
+        return str(value).zfill(int(width)) if width else str(value)
+    return _TEMPLATE_PATTERN.sub(substitute, template).replace('$$', '$')
+
+
+def _dash_byte_range(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Converte 'início-fim' em tupla"""
+    if not value:
+        return None
+    start, _, end = value.partition('-')
+    return int(start), int(end)
+
+
+def _parse_dash(text: str, base_url: str, height: int) -> StreamPlan:
+    """
+    Lê um MPD (VOD) e monta os segmentos da representação escolhida.
+    
+    Raises:
+        StreamError: Se for ao vivo, sem vídeo, com áudio separado ou sem segmentos
+    """
+    try:
+        mpd = ET.fromstring(text)
+    except ET.ParseError as e:
+        raise StreamError(f"MPD inválido: {e}")
+    
+    if mpd.get('type') == 'dynamic':
+        raise StreamError("MPD dinâmico (transmissão ao vivo)")
+    
+    period = _child(mpd, 'Period')
+    if period is None:
+        raise StreamError("MPD sem Period")
+    
+    duration = _iso_duration(period.get('duration') or mpd.get('mediaPresentationDuration'))
+    base = _base_url(period, _base_url(mpd, base_url))
+    
+    video_sets, has_audio_set = [], False
+    for adaptation in _children(period, 'AdaptationSet'):
+        kind = adaptation.get('contentType') or (adaptation.get('mimeType') or '').split('/')[0]
+        if not kind:
+            representation = _child(adaptation, 'Representation')
+            kind = ((representation.get('mimeType') if representation is not None else '') or '').split('/')[0]
+        if kind == 'video':
+            video_sets.append(adaptation)
+        elif kind == 'audio':
+            has_audio_set = True
+    
+    renditions = []
+    for adaptation in video_sets:
+        for representation in _children(adaptation, 'Representation'):
+            codecs = representation.get('codecs') or adaptation.get('codecs') or ''
+            renditions.append({
+                'adaptation': adaptation,
+                'representation': representation,
+                'height': int(representation.get('height') or adaptation.get('height') or 0),
+                'bandwidth': int(representation.get('bandwidth') or 0),
+                'muxed': 'mp4a' in codecs or not has_audio_set
+            })
+    
+    if not renditions:
+        raise StreamError("MPD sem representações de vídeo")
+    
+    muxed = [r for r in renditions if r['muxed']]
+    if not muxed:
+        raise StreamError("Stream DASH com áudio separado (remux não suportado)")
+    
+    chosen = _pick_rendition(muxed, height)
+    adaptation, representation = chosen['adaptation'], chosen['representation']
+    rep_base = _base_url(representation, _base_url(adaptation, base))
+    values = {
+        'RepresentationID': representation.get('id', ''),
+        'Bandwidth': representation.get('bandwidth', ''),
+        'Number': 0,
+        'Time': 0
+    }
+    description = f"{representation.get('width', '?')}x{chosen['height'] or '?'}"
+    
+    # Elementos sem filhos são falsos em ElementTree: compara com None
+    template = _child(representation, 'SegmentTemplate')
+    if template is None:
+        template = _child(adaptation, 'SegmentTemplate')
+    segment_list = _child(representation, 'SegmentList')
+    if segment_list is None:
+        segment_list = _child(adaptation, 'SegmentList')
+    
+    if template is not None:
+        init = None
+        if template.get('initialization'):
+            init = Segment(urljoin(rep_base, _fill_template(template.get('initialization'), values)))
+        
+        media = template.get('media')
+        if not media:
+            raise StreamError("SegmentTemplate sem atributo media")
+        
+        number = int(template.get('startNumber', 1))
+        timescale = int(template.get('timescale', 1))
+        segments = []
+        timeline = _child(template, 'SegmentTimeline')
+        
+        if timeline is not None:
+            current = 0
+            for s in _children(timeline, 'S'):
+                current = int(s.get('t', current))
+                length = int(s.get('d'))
+                repeat = int(s.get('r', 0))
+                if repeat < 0:
+                    # Repete até o fim do período
+                    repeat = max(0, math.ceil((duration * timescale - current) / length) - 1)
+                for _ in range(repeat + 1):
+                    values.update(Number=number, Time=current)
+                    segments.append(Segment(urljoin(rep_base, _fill_template(media, values))))
+                    number += 1
+                    current += length
+        else:
+            segment_duration = int(template.get('duration', 0)) / timescale
+            if not segment_duration or not duration:
+                raise StreamError("SegmentTemplate sem duração para calcular os segmentos")
+            for offset in range(math.ceil(duration / segment_duration)):
+                values.update(Number=number + offset)
+                segments.append(Segment(urljoin(rep_base, _fill_template(media, values))))
+        
+        return StreamPlan('.mp4', segments, init, description)
+    
+    if segment_list is not None:
+        init = None
+        initialization = _child(segment_list, 'Initialization')
+        if initialization is not None:
+            init = Segment(
+                urljoin(rep_base, initialization.get('sourceURL', '')),
+                _dash_byte_range(initialization.get('range'))
+            )
+        segments = [
+            Segment(urljoin(rep_base, s.get('media', '')), _dash_byte_range(s.get('mediaRange')))
+            for s in _children(segment_list, 'SegmentURL')
+        ]
+        if not segments:
+            raise StreamError("SegmentList vazio")
+        return StreamPlan('.mp4', segments, init, description)
+    
+    # SegmentBase/BaseURL: a representação é um único arquivo
+    return StreamPlan('.mp4', [Segment(rep_base)], None, description)
+
+
+# ----- Download -----
+
+async def _fetch(
+    session: aiohttp.ClientSession,
+    segment: Segment,
+    retries: int
+) -> bytes:
+    """Baixa um segmento (ou intervalo) com retries e backoff"""
+    headers = {}
+    if segment.byte_range:
+        headers['Range'] = f'bytes={segment.byte_range[0]}-{segment.byte_range[1]}'
+    
+    for attempt in range(1, retries + 1):
+        try:
+            async with session.get(segment.url, headers=headers) as response:
+                if response.status not in (200, 206):
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history,
+                        status=response.status, message=f"Status HTTP inválido: {response.status}"
+                    )
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                raise StreamError(f"Falha no segmento {segment.url} após {retries} tentativas: {e}")
+            await asyncio.sleep(2 ** attempt)
+
+
+def _decrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
+    """AES-128-CBC com padding PKCS#7 (HLS)"""
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    plain = decryptor.update(data) + decryptor.finalize()
+    padding = plain[-1] if plain else 0
+    return plain[:-padding] if 0 < padding <= 16 else plain
+
+
+async def resolve_stream(
+    session: aiohttp.ClientSession,
+    url: str,
+    preferred_resolution: str
+) -> StreamPlan:
+    """
+    Lê o manifesto e monta o plano de download da rendição preferida.
+    
+    Args:
+        session: Sessão aiohttp
+        url: URL do manifesto (.m3u8 ou .mpd)
+        preferred_resolution: Resolução preferida ('720p', '480p', '360p')
+    
+    Returns:
+        Plano com os segmentos em ordem
+    
+    Raises:
+        StreamError: Se o manifesto for inválido ou não suportado
+    """
+    height = _target_height(preferred_resolution)
+    
+    async with session.get(url) as response:
+        if response.status != 200:
+            raise StreamError(f"Manifesto indisponível (HTTP {response.status})")
+        text = await response.text()
+        base_url = str(response.url)
+    
+    if text.lstrip().startswith('#EXTM3U'):
+        description = ""
+        if '#EXT-X-STREAM-INF' in text:
+            media_url, description = _parse_hls_master(text, base_url, height)
+            async with session.get(media_url) as response:
+                if response.status != 200:
+                    raise StreamError(f"Playlist de mídia indisponível (HTTP {response.status})")
+                text = await response.text()
+                base_url = str(response.url)
+        plan = _parse_hls_media(text, base_url)
+        plan.description = description
+        return plan
+    
+    if '<MPD' in text[:2048]:
+        return _parse_dash(text, base_url, height)
+    
+    raise StreamError("Conteúdo não é um manifesto HLS nem DASH")
+
+
+async def download_stream(
+    url: str,
+    file_path: Path,
+    logger: logging.Logger,
+    preferred_resolution: str = '720p',
+    concurrency: int = SEGMENT_CONCURRENCY,
+    window: int = SEGMENT_WINDOW,
+    retries: int = 3,
+    timeout: int = 60,
+    progress_callback=None
+) -> Tuple[str, Path]:
+    """
+    Baixa um stream HLS/DASH num único arquivo.
+    
+    Os segmentos são baixados em paralelo, mas gravados em ordem assim que o
+    próximo fica pronto; no máximo 'window' segmentos ficam em memória.
+    Representações de arquivo único (SegmentBase) vão ao disco em blocos.
+    
+    Args:
+        url: URL do manifesto
+        file_path: Caminho de destino (a extensão segue o contêiner: .mp4 ou .ts)
+        logger: Logger para mensagens
+        preferred_resolution: Resolução preferida
+        concurrency: Segmentos baixados ao mesmo tempo
+        window: Segmentos à frente do último gravado
+        retries: Tentativas por segmento
+        timeout: Timeout por requisição em segundos
+        progress_callback: Função chamada com (downloaded_bytes, total_estimado, speed)
+    
+    Returns:
+        Tupla (SHA-256 do arquivo, caminho final)
+    
+    Raises:
+        StreamError: Se o manifesto não for suportado ou um segmento falhar
+    """
+    timeout_config = aiohttp.ClientTimeout(total=None, connect=30, sock_read=timeout)
+    connector = aiohttp.TCPConnector(limit_per_host=max(1, concurrency))
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout_config) as session:
+        plan = await resolve_stream(session, url, preferred_resolution)
+        final_path = file_path.with_suffix(plan.container)
+        temp_path = final_path.with_suffix('.tmp')
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # SegmentBase/BaseURL: arquivo único, gravado em blocos como um download comum
+        single = plan.segments[0] if len(plan.segments) == 1 else None
+        if plan.init is None and single is not None and single.byte_range is None and single.key is None:
+            logger.info(
+                f"📺 Stream {plan.container[1:].upper()}: arquivo único"
+                + (f", rendição {plan.description}" if plan.description else "")
+            )
+            sha256 = await download_file(
+                single.url, final_path, logger,
+                retries=retries, progress_callback=progress_callback
+            )
+            logger.info(f"✓ Stream baixado: {final_path.name}")
+            return sha256, final_path
+        
+        items = ([plan.init] if plan.init else []) + plan.segments
+        logger.info(
+            f"📺 Stream {plan.container[1:].upper()}: {len(plan.segments)} segmento(s)"
+            + (f", rendição {plan.description}" if plan.description else "")
+        )
+        
+        limit = asyncio.Semaphore(max(1, concurrency))
+        keys: Dict[str, asyncio.Future] = {}
+        
+        async def load_key(uri: str) -> bytes:
+            async with session.get(uri) as response:
+                if response.status != 200:
+                    raise StreamError(f"Chave HLS indisponível (HTTP {response.status})")
+                return await response.read()
+        
+        async def get_key(uri: str) -> bytes:
+            # Uma requisição por chave, mesmo com vários segmentos pedindo ao mesmo tempo
+            if uri not in keys:
+                keys[uri] = asyncio.ensure_future(load_key(uri))
+            return await keys[uri]
+        
+        async def fetch(segment: Segment) -> bytes:
+            async with limit:
+                data = await _fetch(session, segment, retries)
+                if segment.key is not None:
+                    iv = segment.key.iv or segment.sequence.to_bytes(16, 'big')
+                    data = _decrypt(data, await get_key(segment.key.uri), iv)
+                return data
+        
+        # Fila limitada: o produtor só agenda novos segmentos quando a gravação avança
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, window))
+        
+        async def produce() -> None:
+            for segment in items:
+                await queue.put(asyncio.ensure_future(fetch(segment)))
+        
+        producer = asyncio.ensure_future(produce())
+        digest = hashlib.sha256()
+        written = 0
+        start_time = time.time()
+        last_update = 0
+        
+        try:
+            with open(temp_path, 'wb') as f:
+                for done, _ in enumerate(items, 1):
+                    task = await queue.get()
+                    data = await task
+                    f.write(data)
+                    digest.update(data)
+                    written += len(data)
+                    
+                    now = time.time()
+                    if progress_callback and (now - last_update > 0.5 or done == len(items)):
+                        elapsed = now - start_time
+                        estimated_total = int(written / done * len(items))
+                        progress_callback(written, estimated_total, written / elapsed if elapsed > 0 else 0)
+                        last_update = now
+            
+            temp_path.replace(final_path)
+        
+        except BaseException:
+            producer.cancel()
+            while not queue.empty():
+                queue.get_nowait().cancel()
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+        
+        await producer
+    
+    logger.info(f"✓ Stream baixado: {final_path.name}")
+    return digest.hexdigest(), final_path
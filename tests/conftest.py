@@ -0,0 +1,19 @@
+"""
+Configuração dos testes: os módulos do projeto ficam na raiz do repositório
+"""
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_manager import ProgressManager  # noqa: E402
+
+
+@pytest.fixture
+def progress(tmp_path, monkeypatch):
+    """ProgressManager isolado por teste (progress.db é criado na pasta atual)"""
+    monkeypatch.chdir(tmp_path)
+    manager = ProgressManager()
+    yield manager
+    manager.close()
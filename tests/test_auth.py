@@ -0,0 +1,83 @@
+"""
+Validação da sessão do perfil: só a API com resposta JSON confirma o login
+"""
+import asyncio
+import time
+import pytest
+from auth import AuthManager
+
+
+class FakeResponse:
+    def __init__(self, status, content_type, body):
+        self.status = status
+        self.headers = {'content-type': content_type}
+        self._body = body
+    
+    async def json(self):
+        return self._body
+    
+    async def dispose(self):
+        pass
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+        self.urls = []
+    
+    async def get(self, url, **kwargs):
+        self.urls.append(url)
+        return self.response
+
+
+class FakeContext:
+    def __init__(self, response, expires):
+        self.request = FakeRequest(response)
+        self._cookies = [{'domain': '.estrategiaconcursos.com.br', 'expires': expires}]
+    
+    async def cookies(self):
+        return self._cookies
+
+
+class FakePage:
+    def __init__(self, response, expires=None):
+        self.context = FakeContext(response, time.time() + 3600 if expires is None else expires)
+
+
+@pytest.fixture
+def auth(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AuthManager("aluno@example.com", "senha")
+
+
+def _probe(auth, page):
+    return asyncio.run(auth._probe_saved_session(page))
+
+
+def test_json_api_response_confirms_session(auth):
+    page = FakePage(FakeResponse(200, 'application/json', {'data': []}))
+    assert _probe(auth, page)
+    assert page.context.request.urls == [AuthManager.SESSION_PROBE_URL]
+
+
+def test_html_shell_is_not_a_valid_session(auth):
+    assert not _probe(auth, FakePage(FakeResponse(200, 'text/html', None)))
+
+
+def test_unauthorized_and_expired_cookies_are_rejected(auth):
+    assert not _probe(auth, FakePage(FakeResponse(401, 'application/json', {'error': 'token'})))
+    assert not _probe(auth, FakePage(FakeResponse(200, 'application/json', {}), expires=time.time() - 1))
+
+
+def test_invalidated_session_skips_probe(auth):
+    page = FakePage(FakeResponse(200, 'application/json', {'data': []}))
+    auth.invalidate_session()
+    assert not _probe(auth, page)
+    assert page.context.request.urls == []
+
+
+def test_legacy_plaintext_state_is_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "auth-state.json").write_text('{"cookies": []}')
+    AuthManager("aluno@example.com", "senha")
+    assert not (tmp_path / "auth-state.json").exists()
@@ -0,0 +1,73 @@
+"""
+Página de um navegador já reiniciado por outro worker não provoca novo reinício
+"""
+import asyncio
+from browser_supervisor import BrowserSupervisor
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+    
+    def is_closed(self):
+        return self.closed
+    
+    def on(self, event, handler):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+    
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+    
+    async def close(self):
+        for page in self.pages:
+            page.closed = True
+    
+    def on(self, event, handler):
+        pass
+
+
+def _supervisor():
+    async def launch():
+        return FakeContext()
+    
+    async def authenticate(page):
+        pass
+    
+    return BrowserSupervisor(launch, authenticate, max_relaunches=2)
+
+
+def test_stale_page_is_replaced_without_relaunch():
+    async def scenario():
+        supervisor = _supervisor()
+        await supervisor.start()
+        stale = await supervisor.new_page()
+        
+        # Outro worker detecta a queda e reinicia o navegador
+        await supervisor.recover(supervisor.generation)
+        
+        page = await supervisor.ensure_page(stale)
+        return supervisor, stale, page
+    
+    supervisor, stale, page = asyncio.run(scenario())
+    assert page is not stale
+    assert page.context is supervisor.context
+    assert supervisor.relaunches == 1
+
+
+def test_live_page_is_kept():
+    async def scenario():
+        supervisor = _supervisor()
+        await supervisor.start()
+        page = await supervisor.new_page()
+        return page, await supervisor.ensure_page(page)
+    
+    page, ensured = asyncio.run(scenario())
+    assert ensured is page
@@ -0,0 +1,22 @@
+"""
+Detecção de novidades: aulas com itens que falharam voltam na próxima execução
+"""
+from catalog import diff_catalog
+
+
+def _snapshot(**lesson_extra):
+    lesson = {"title": "Aula 01", "videos": [{"href": "/v/1", "title": "Intro"}], "pdfs": []}
+    lesson.update(lesson_extra)
+    return {"lessons": {"101": lesson}}
+
+
+def test_unchanged_catalog_has_no_changes():
+    assert not diff_catalog(_snapshot(), _snapshot()).has_changes
+
+
+def test_incomplete_lesson_is_visited_again():
+    delta = diff_catalog(_snapshot(incomplete=True), _snapshot())
+    
+    assert delta.has_changes
+    assert delta.lesson_ids == {"101"}
+    assert delta.changed_lessons["101"] == ["itens pendentes"]
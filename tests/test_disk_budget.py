@@ -0,0 +1,31 @@
+"""
+Downloads em andamento contam no espaço livre só pela parte ainda não gravada
+"""
+import asyncio
+from disk_budget import DiskAdmission
+
+DISK = 1000
+
+
+def test_partly_written_download_is_not_counted_twice(tmp_path, monkeypatch):
+    first = tmp_path / "aula1.mp4"
+    
+    # O .tmp gravado já ocupa o disco de verdade
+    monkeypatch.setattr(
+        DiskAdmission, "free_space",
+        staticmethod(lambda path: DISK - sum(f.stat().st_size for f in tmp_path.iterdir()))
+    )
+    admission = DiskAdmission(progress_manager=None, reserve_mb=0)
+    
+    async def scenario():
+        reservation = await admission.acquire(None, first, 600)
+        first.with_suffix('.tmp').write_bytes(b'\0' * 400)
+        
+        # Livre: 600; pendente do primeiro: 200 -> cabem 400
+        fits = admission.fits(None, tmp_path / "aula2.mp4", 400)
+        too_big = admission.fits(None, tmp_path / "aula2.mp4", 401)
+        
+        await admission.release(reservation, 400)
+        return fits, too_big
+    
+    assert asyncio.run(scenario()) == (True, False)
@@ -0,0 +1,137 @@
+"""
+Faststart: o 'moov' vai para o início e cada chunk continua apontando para os mesmos dados
+"""
+import hashlib
+import io
+import struct
+import pytest
+import faststart
+from reconcile import check_structure
+
+CHUNK = 1000
+
+
+def _box(box_type, payload):
+    return struct.pack('>I4s', len(payload) + 8, box_type) + payload
+
+
+def _moov(offsets, wide=False):
+    if wide:
+        table = _box(b'co64', struct.pack(f'>4sI{len(offsets)}Q', b'\0' * 4, len(offsets), *offsets))
+    else:
+        table = _box(b'stco', struct.pack(f'>4sI{len(offsets)}I', b'\0' * 4, len(offsets), *offsets))
+    stbl = _box(b'stbl', _box(b'stsd', b'\0' * 8) + table)
+    trak = _box(b'trak', _box(b'mdia', _box(b'minf', stbl)))
+    return _box(b'moov', _box(b'mvhd', b'\0' * 100) + trak)
+
+
+def _write_mp4(path, layout, wide=False):
+    """
+    Monta um MP4 com o 'moov' na posição indicada.
+    
+    layout: lista de caixas ('ftyp', 'moov', 'free' ou número de chunks de um 'mdat')
+    """
+    chunks = []
+    moov_size = len(_moov([0] * sum(n for n in layout if isinstance(n, int)), wide))
+    offsets = []
+    position = 0
+    
+    for item in layout:
+        if item == 'ftyp':
+            position += 16
+        elif item == 'moov':
+            position += moov_size
+        elif item == 'free':
+            position += 18
+        else:
+            position += 8
+            for _ in range(item):
+                chunks.append(bytes([len(chunks) + 1]) * CHUNK)
+                offsets.append(position)
+                position += CHUNK
+    
+    parts = []
+    chunk_iter = iter(chunks)
+    for item in layout:
+        if item == 'ftyp':
+            parts.append(_box(b'ftyp', b'isom' + b'\0' * 4))
+        elif item == 'moov':
+            parts.append(_moov(offsets, wide))
+        elif item == 'free':
+            parts.append(_box(b'free', b'x' * 10))
+        else:
+            parts.append(_box(b'mdat', b''.join(next(chunk_iter) for _ in range(item))))
+    
+    path.write_bytes(b''.join(parts))
+    return chunks
+
+
+def _chunk_offsets(data):
+    boxes = faststart._top_level_boxes(io.BytesIO(data), len(data))
+    assert [box_type for box_type, _, _ in boxes].index(b'moov') < \
+        [box_type for box_type, _, _ in boxes].index(b'mdat')
+    
+    index, entry_format = data.find(b'stco'), 'I'
+    if index < 0:
+        index, entry_format = data.find(b'co64'), 'Q'
+    count = struct.unpack_from('>I', data, index + 8)[0]
+    return struct.unpack_from(f'>{count}{entry_format}', data, index + 12)
+
+
+def _assert_chunks(path, chunks):
+    data = path.read_bytes()
+    offsets = _chunk_offsets(data)
+    assert len(offsets) == len(chunks)
+    for offset, chunk in zip(offsets, chunks):
+        assert data[offset:offset + CHUNK] == chunk
+    assert check_structure(str(path)) is None
+
+
+@pytest.mark.parametrize("wide", [False, True])
+def test_moves_moov_before_mdat(tmp_path, wide):
+    path = tmp_path / "video.mp4"
+    chunks = _write_mp4(path, ['ftyp', 3, 'moov', 'free'], wide)
+    
+    assert faststart.needs_faststart(str(path))
+    changed, size, sha256 = faststart.faststart_file(str(path))
+    
+    assert changed
+    assert size == path.stat().st_size
+    assert sha256 == hashlib.sha256(path.read_bytes()).hexdigest()
+    _assert_chunks(path, chunks)
+    assert not faststart.needs_faststart(str(path))
+    assert faststart.faststart_file(str(path)) == (False, size, None)
+
+
+def test_mdat_after_moov_keeps_offsets(tmp_path):
+    # ftyp/mdat/moov/mdat: o segundo 'mdat' não avança (o 'moov' sai da frente dele)
+    path = tmp_path / "video.mp4"
+    chunks = _write_mp4(path, ['ftyp', 2, 'moov', 2])
+    
+    changed, _, _ = faststart.faststart_file(str(path))
+    
+    assert changed
+    _assert_chunks(path, chunks)
+
+
+def test_upgrades_stco_to_co64_on_overflow(tmp_path, monkeypatch):
+    path = tmp_path / "video.mp4"
+    chunks = _write_mp4(path, ['ftyp', 2, 'moov', 2])
+    monkeypatch.setattr(faststart, 'UINT32_MAX', 1500)
+    
+    faststart.faststart_file(str(path))
+    
+    data = path.read_bytes()
+    assert b'co64' in data and b'stco' not in data
+    _assert_chunks(path, chunks)
+
+
+def test_invalid_file_is_left_untouched(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b'junk' * 300)
+    
+    with pytest.raises(faststart.FaststartError):
+        faststart.faststart_file(str(path))
+    
+    assert path.read_bytes() == b'junk' * 300
+    assert not path.with_suffix('.tmp').exists()
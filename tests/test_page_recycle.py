@@ -0,0 +1,54 @@
+"""
+Reciclagem de página espera só os downloads por clique da própria página
+"""
+import asyncio
+import pytest
+from video_processor import VideoProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, progress):
+    return VideoProcessor(tmp_path / "videos", progress, pipeline_window=2)
+
+
+class FakeContext:
+    async def new_page(self):
+        raise RuntimeError("falha simulada ao abrir página")
+
+
+class FakePage:
+    context = FakeContext()
+
+
+class FakeDownload:
+    def __init__(self, page):
+        self.page = page
+
+
+def test_recycle_does_not_wait_for_http_or_other_tab_jobs(processor, monkeypatch):
+    page, other_tab = FakePage(), FakePage()
+    release = asyncio.Event()
+    finished = []
+    
+    async def fake_transfer(job):
+        if job['name'] != 'clique':
+            await release.wait()  # HTTP e outra aba seguem baixando
+        finished.append(job['name'])
+    
+    monkeypatch.setattr(processor, "_transfer_job", fake_transfer)
+    
+    async def scenario():
+        processor._start_pipeline()
+        await processor._enqueue_transfer({'name': 'http'})
+        await processor._enqueue_transfer({'name': 'outra aba', 'download': FakeDownload(other_tab)})
+        await processor._enqueue_transfer({'name': 'clique', 'download': FakeDownload(page)})
+        
+        await asyncio.wait_for(processor._recycle_page(page, [], "https://curso", "videos"), 1)
+        done_at_recycle = list(finished)
+        
+        release.set()
+        await processor._finish_pipeline()
+        return done_at_recycle
+    
+    assert asyncio.run(scenario()) == ['clique']
+    assert processor._page_downloads == {}
@@ -0,0 +1,60 @@
+"""
+Variantes de PDF de uma aula: um download por arquivo e variantes inexistentes ignoradas
+"""
+import asyncio
+from pdf_processor import PDFProcessor
+
+BASE = "https://www.estrategiaconcursos.com.br/api/aluno/pdf/10"
+
+
+class FakeLocator:
+    def __init__(self, hrefs):
+        self.hrefs = hrefs
+    
+    async def evaluate_all(self, script):
+        return self.hrefs
+
+
+class FakeLesson:
+    def __init__(self, hrefs):
+        self.hrefs = hrefs
+    
+    def locator(self, selector):
+        return FakeLocator(self.hrefs)
+
+
+def _run(processor, hrefs, tmp_path, missing=()):
+    downloads = []
+    
+    async def fake_download(url, file_path, file_name, progress_key):
+        downloads.append((url, file_path))
+        return True
+    
+    async def fake_available(url):
+        return url not in missing
+    
+    processor._download_pdf = fake_download
+    processor._variant_available = fake_available
+    asyncio.run(processor.download_lesson_pdfs(FakeLesson(hrefs), tmp_path, "Aula 01", "Intro", "101"))
+    return downloads
+
+
+def test_two_links_to_the_same_file_download_once(progress, tmp_path):
+    processor = PDFProcessor(tmp_path, progress, pdf_type=2)
+    hrefs = [f"{BASE}/pdfSimplificado/download", f"{BASE}-b/pdf/download"]
+    
+    downloads = _run(processor, hrefs, tmp_path)
+    
+    # O link com botão próprio vence a variante deduzida do outro
+    assert downloads == [(f"{BASE}-b/pdf/download", tmp_path / "Aula 01 - Intro (versão original).pdf")]
+
+
+def test_missing_derived_variants_are_skipped(progress, tmp_path):
+    processor = PDFProcessor(tmp_path, progress, pdf_type=4)
+    failed = []
+    processor.mark_as_failed = lambda key, error: failed.append(key)
+    
+    downloads = _run(processor, [f"{BASE}/pdf/download"], tmp_path, missing={f"{BASE}/pdfGrifado/download"})
+    
+    assert sorted(url for url, _ in downloads) == [f"{BASE}/pdf/download", f"{BASE}/pdfSimplificado/download"]
+    assert failed == []
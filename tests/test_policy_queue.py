@@ -0,0 +1,48 @@
+"""
+Bytes previstos pela resolução automática saem da fila mesmo sem transferência
+"""
+import asyncio
+import pytest
+from disk_budget import DiskSpaceError
+from video_processor import VideoProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, progress):
+    return VideoProcessor(tmp_path / "videos", progress, preferred_resolution='auto')
+
+
+def _job(tmp_path, key):
+    return {
+        'url': 'https://cdn/aulas/1/720/v1.mp4',
+        'file_path': tmp_path / f"{key}.mp4",
+        'file_name': f"{key}.mp4",
+        'progress_key': key,
+        'expected_extension': '.mp4',
+        'policy_bytes': 500
+    }
+
+
+def test_refused_job_releases_queued_bytes(processor, tmp_path, monkeypatch):
+    async def refuse(file_path, expected_size):
+        raise DiskSpaceError("sem espaço")
+    
+    monkeypatch.setattr(processor, "reserve_space", refuse)
+    processor.resolution_policy.queued_bytes = 500
+    
+    asyncio.run(processor._enqueue_transfer(_job(tmp_path, "video:1")))
+    assert processor.resolution_policy.queued_bytes == 0
+
+
+def test_skipped_jobs_release_queued_bytes(processor, tmp_path):
+    processor.resolution_policy.queued_bytes = 1000
+    processor.request_cancel()
+    
+    async def scenario():
+        processor._start_pipeline()
+        await processor._enqueue_transfer(_job(tmp_path, "video:1"))
+        await processor._enqueue_transfer(_job(tmp_path, "video:2"))
+        await processor._finish_pipeline()
+    
+    asyncio.run(scenario())
+    assert processor.resolution_policy.queued_bytes == 0
@@ -0,0 +1,75 @@
+"""
+Cache das verificações de URL: uma resolução validada vale para as demais aulas do curso
+"""
+import asyncio
+import pytest
+import video_processor
+from video_processor import VideoProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, progress, monkeypatch):
+    processor = VideoProcessor(tmp_path / "videos", progress)
+    processor.course_id = "curso-1"
+    
+    calls = []
+    
+    async def fake_probe(session, url):
+        calls.append(url)
+        return "/720/" in url, 1000 + len(calls)
+    
+    async def fake_session():
+        return None
+    
+    monkeypatch.setattr(video_processor, "probe_url", fake_probe)
+    monkeypatch.setattr(processor, "get_http_session", fake_session)
+    processor.calls = calls
+    return processor
+
+
+def test_pattern_strips_lesson_and_video_ids():
+    assert (VideoProcessor._url_pattern("/cursos/4521/aulas/98/720/a1b2c3.mp4")
+            == "/cursos/*/aulas/*/720/*.mp4")
+    assert (VideoProcessor._url_pattern("/cursos/4521/aulas/99/480/f00d.mp4")
+            == "/cursos/*/aulas/*/480/*.mp4")
+
+
+def test_forced_resolution_is_validated_once_per_course(processor):
+    first = asyncio.run(processor._force_resolution("https://cdn/cursos/1/aulas/1/360/v1.mp4", "720"))
+    second = asyncio.run(processor._force_resolution("https://cdn/cursos/1/aulas/2/360/v2.mp4", "720"))
+    
+    assert first.endswith("/aulas/1/720/v1.mp4")
+    assert second.endswith("/aulas/2/720/v2.mp4")
+    assert len(processor.calls) == 1
+
+
+def test_sizes_are_not_shared_between_videos(processor):
+    first = asyncio.run(processor._probe_cached("https://cdn/aulas/1/720/v1.mp4", "720p"))
+    second = asyncio.run(processor._probe_cached("https://cdn/aulas/2/720/v2.mp4", "720p"))
+    
+    assert first == (True, 1001)
+    assert second == (True, 1002)
+    assert processor.get_known_size("https://cdn/aulas/1/720/v1.mp4") == 1001
+
+
+def test_invalid_url_is_not_probed_again(processor):
+    asyncio.run(processor._probe_cached("https://cdn/aulas/1/480/v1.mp4", "480p"))
+    probe = asyncio.run(processor._probe_cached("https://cdn/aulas/1/480/v1.mp4", "480p"))
+    
+    assert probe == (False, None)
+    assert len(processor.calls) == 1
+
+
+def test_one_lesson_without_720p_does_not_disable_forcing(processor, monkeypatch):
+    async def missing_in_first_lesson(session, url):
+        processor.calls.append(url)
+        return "/aulas/1/" not in url, 1000
+    
+    monkeypatch.setattr(video_processor, "probe_url", missing_in_first_lesson)
+    
+    first = asyncio.run(processor._force_resolution("https://cdn/cursos/1/aulas/1/360/v1.mp4", "720"))
+    second = asyncio.run(processor._force_resolution("https://cdn/cursos/1/aulas/2/360/v2.mp4", "720"))
+    
+    assert first is None
+    assert second.endswith("/aulas/2/720/v2.mp4")
+    assert len(processor.calls) == 2
@@ -0,0 +1,50 @@
+"""
+Thread de gravação do progresso: uma operação inválida não derruba as demais
+"""
+import logging
+from progress_store import ProgressStore, ProgressWriter
+
+
+def test_invalid_operation_is_dropped_and_writer_keeps_running(tmp_path, caplog):
+    db_path = tmp_path / "progress.db"
+    ProgressStore(db_path).close()  # Cria o esquema
+    writer = ProgressWriter(db_path, interval=10)
+    
+    writer.submit(("mark_completed", "pdf:1:/a.pdf", {"path": "a.pdf", "size": 1}, "c1"))
+    writer.submit(("mark_failed", "pdf:2:/b.pdf"))  # Faltam argumentos: TypeError
+    writer.submit(("mark_completed", "pdf:3:/c.pdf", {"path": "c.pdf", "size": 1}, "c1"))
+    
+    with caplog.at_level(logging.ERROR):
+        assert writer.flush()
+    assert writer.dropped == 1
+    assert "descartada" in caplog.text
+    
+    # A thread continua gravando depois do erro
+    writer.submit(("mark_completed", "pdf:4:/d.pdf", {"path": "d.pdf", "size": 1}, "c1"))
+    assert writer.flush()
+    writer.close()
+    
+    store = ProgressStore(db_path)
+    try:
+        assert [store.is_completed(f"pdf:{n}:/{name}.pdf") for n, name in
+                ((1, "a"), (3, "c"), (4, "d"))] == [True, True, True]
+    finally:
+        store.close()
+
+
+def test_close_writes_pending_operations_if_thread_stopped(tmp_path):
+    db_path = tmp_path / "progress.db"
+    ProgressStore(db_path).close()
+    writer = ProgressWriter(db_path, interval=10)
+    writer._stopping = True
+    writer._wake.set()
+    writer._thread.join()
+    
+    writer.submit(("mark_completed", "pdf:1:/a.pdf", {"path": "a.pdf", "size": 1}, "c1"))
+    writer.close()
+    
+    store = ProgressStore(db_path)
+    try:
+        assert store.is_completed("pdf:1:/a.pdf")
+    finally:
+        store.close()
@@ -0,0 +1,58 @@
+"""
+Reconciliação: só as pastas verificadas contam e caminhos relativos partem da pasta do programa
+"""
+from catalog import CatalogStore
+from reconcile import Reconciler
+
+PDF = b'%PDF-1.4\n' + b'0' * 2048 + b'\n%%EOF\n'
+
+
+def _reconciler(tmp_path, progress, roots, base_dir):
+    return Reconciler(roots, progress, CatalogStore(tmp_path / "catalog"), workers=2, base_dir=base_dir)
+
+
+def test_records_outside_scanned_roots_are_not_missing(tmp_path, progress):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    pdf = tmp_path / "pdfs" / "Aula 01.pdf"
+    pdf.parent.mkdir()
+    pdf.write_bytes(PDF)
+    progress.mark_completed("pdf:1:/a.pdf", {"path": str(pdf), "size": len(PDF)}, "c1")
+    progress.mark_completed("pdf:2:/b.pdf", {"path": str(videos / "sumiu.pdf"), "size": 1}, "c1")
+    progress.flush()
+    
+    reconciler = _reconciler(tmp_path, progress, [videos], tmp_path)
+    reconciler.run(apply=True)
+    
+    assert reconciler.report["ausentes"] == ["pdf:2:/b.pdf"]
+    assert reconciler.outside_roots == 1
+    assert progress.is_completed("pdf:1:/a.pdf")
+    assert not progress.is_completed("pdf:2:/b.pdf")
+
+
+def test_relative_record_paths_resolve_against_base_dir(tmp_path, progress, monkeypatch):
+    pdf = tmp_path / "pdfs" / "Aula 01.pdf"
+    pdf.parent.mkdir()
+    pdf.write_bytes(PDF)
+    progress.mark_completed("pdf:1:/a.pdf", {"path": "pdfs/Aula 01.pdf", "size": len(PDF)}, "c1")
+    progress.flush()
+    
+    monkeypatch.chdir(tmp_path / "pdfs")  # Pasta atual diferente da do programa
+    reconciler = _reconciler(tmp_path, progress, ["pdfs"], tmp_path)
+    reconciler.run()
+    
+    assert reconciler.report["ausentes"] == []
+    assert reconciler.report["ok"] == [str(pdf)]
+
+
+def test_files_without_catalog_are_not_orphans(tmp_path, progress):
+    pdf = tmp_path / "pdfs" / "Aula 01.pdf"
+    pdf.parent.mkdir()
+    pdf.write_bytes(PDF)
+    
+    reconciler = _reconciler(tmp_path, progress, [tmp_path / "pdfs"], tmp_path)
+    reconciler.run()
+    
+    assert reconciler.catalog_missing
+    assert reconciler.report["orfaos"] == []
+    assert reconciler.report["nao_identificados"] == [str(pdf)]
@@ -0,0 +1,51 @@
+"""
+Representação DASH de arquivo único é gravada em blocos, sem carregar o vídeo na memória
+"""
+import asyncio
+import logging
+import stream_downloader
+from stream_downloader import Segment, StreamPlan, download_stream
+
+MPD = """<?xml version="1.0"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static">
+  <Period>
+    <AdaptationSet mimeType="video/mp4">
+      <Representation id="v720" height="720" bandwidth="2000000">
+        <BaseURL>video_720.mp4</BaseURL>
+        <SegmentBase indexRange="0-999"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>"""
+
+
+def test_segment_base_plan_is_a_single_whole_file():
+    plan = stream_downloader._parse_dash(MPD, "https://cdn/curso/manifest.mpd", 720)
+    assert len(plan.segments) == 1
+    assert plan.segments[0].url == "https://cdn/curso/video_720.mp4"
+    assert plan.segments[0].byte_range is None
+
+
+def test_single_file_is_streamed_to_disk(tmp_path, monkeypatch):
+    calls = []
+    
+    async def fake_resolve(session, url, preferred_resolution):
+        return StreamPlan('.mp4', [Segment("https://cdn/curso/video_720.mp4")])
+    
+    async def fake_download_file(url, file_path, logger, **kwargs):
+        calls.append((url, file_path))
+        return "sha"
+    
+    async def fail_fetch(*args):
+        raise AssertionError("arquivo único não deve ser lido inteiro na memória")
+    
+    monkeypatch.setattr(stream_downloader, "resolve_stream", fake_resolve)
+    monkeypatch.setattr(stream_downloader, "download_file", fake_download_file)
+    monkeypatch.setattr(stream_downloader, "_fetch", fail_fetch)
+    
+    sha256, path = asyncio.run(download_stream(
+        "https://cdn/curso/manifest.mpd", tmp_path / "aula.mp4", logging.getLogger(__name__)
+    ))
+    
+    assert (sha256, path) == ("sha", tmp_path / "aula.mp4")
+    assert calls == [("https://cdn/curso/video_720.mp4", tmp_path / "aula.mp4")]
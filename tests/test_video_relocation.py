@@ -0,0 +1,61 @@
+"""
+Nova execução sobre vídeos já baixados: streams salvos como .ts continuam .ts
+"""
+import pytest
+from utils import sanitize_filename
+from video_processor import VideoProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, progress):
+    return VideoProcessor(tmp_path / "videos", progress)
+
+
+def _stream_file(processor, lesson_dir, title, data=b'\x47' * 376):
+    name = sanitize_filename(VideoProcessor._video_file_name("Aula 01", 1, title, "720p"))
+    path = (lesson_dir / name).with_suffix('.ts')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    processor.progress_manager.mark_completed(
+        "video:1", {"path": str(path), "size": len(data), "sha256": None}
+    )
+    return path
+
+
+def test_rerun_keeps_ts_stream_in_place(processor, tmp_path):
+    lesson_dir = tmp_path / "videos" / "Curso" / "Aula 01"
+    ts_path = _stream_file(processor, lesson_dir, "Introdução")
+    
+    expected = processor._existing_video_path("video:1", lesson_dir, "Aula 01", 1, "Introdução")
+    assert expected == ts_path
+    
+    assert processor.adopt_existing("video:1", None, expected)
+    assert ts_path.exists()
+    assert not ts_path.with_suffix('.mp4').exists()
+    assert processor.progress_manager.get_info("video:1")["path"] == str(ts_path)
+
+
+def test_renamed_ts_stream_keeps_extension(processor, tmp_path):
+    lesson_dir = tmp_path / "videos" / "Curso" / "Aula 01"
+    old_path = _stream_file(processor, lesson_dir, "Introdução")
+    
+    expected = processor._existing_video_path("video:1", lesson_dir, "Aula 01", 1, "Apresentação")
+    assert expected.suffix == '.ts'
+    
+    assert processor.adopt_existing("video:1", None, expected)
+    assert not old_path.exists()
+    assert expected.exists()
+    assert processor.progress_manager.get_info("video:1")["path"] == str(expected)
+
+
+def test_relocation_never_changes_extension(processor, tmp_path):
+    lesson_dir = tmp_path / "videos" / "Curso" / "Aula 01"
+    old_path = _stream_file(processor, lesson_dir, "Introdução")
+    
+    # Mesmo que o chamador peça .mp4, o arquivo MPEG-TS continua .ts
+    new_path = lesson_dir / "Novo nome [720p].mp4"
+    processor.adopt_existing("video:1", None, new_path)
+    
+    assert not new_path.exists()
+    assert new_path.with_suffix('.ts').exists()
+    assert not old_path.exists()
@@ -3,10 +3,11 @@ Utilitários e Funções Auxiliares - VERSÃO CORRIGIDA
 Parte 1/5 da refatoração
 """
 import re
+import hashlib
 import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Literal
+from typing import Optional, Literal, Tuple
 import aiohttp
 import asyncio
 import queue
@@ -80,6 +81,80 @@ def extract_materia_name(course_name: str) -> str:
     return materia or 'Matéria Desconhecida'
 
 
+def extract_course_id(course_url: str) -> str:
+    """
+    Extrai o ID numérico do curso a partir da URL.
+    
+    Args:
+        course_url: URL do curso (ex: .../cursos/12345/aulas)
+    
+    Returns:
+        ID do curso, ou a própria URL se o padrão não for encontrado
+    """
+    match = re.search(r'/cursos/(\d+)', course_url or '')
+    return match.group(1) if match else (course_url or '')
+
+
+def _parse_content_range_total(content_range: str) -> Optional[int]:
+    """
+    Extrai o tamanho total de um header Content-Range (ex: 'bytes 0-0/12345').
+    
+    Args:
+        content_range: Valor do header
+    
+    Returns:
+        Tamanho total em bytes ou None se desconhecido
+    """
+    match = re.search(r'/(\d+)\s*$', content_range or '')
+    return int(match.group(1)) if match else None
+
+
+async def probe_url(
+    session: aiohttp.ClientSession,
+    url: str,
+    timeout: int = 10
+) -> Tuple[bool, Optional[int]]:
+    """
+    Verifica se uma URL está acessível sem baixar o corpo do arquivo.
+    
+    Usa HEAD e, se o servidor não suportar, um GET com 'Range: bytes=0-0'.
+    
+    Args:
+        session: Sessão aiohttp (conexões reaproveitadas)
+        url: URL a ser verificada
+        timeout: Timeout total em segundos
+    
+    Returns:
+        Tupla (acessível, tamanho_em_bytes ou None)
+    """
+    timeout_config = aiohttp.ClientTimeout(total=timeout, connect=5)
+    
+    async with session.head(url, allow_redirects=True, timeout=timeout_config) as resp:
+        if resp.status == 200:
+            length = resp.headers.get('content-length')
+            if length and length.isdigit() and int(length) > 0:
+                return True, int(length)
+        elif resp.status == 404:
+            return False, None
+    
+    # HEAD não suportado ou sem tamanho: pede apenas o primeiro byte
+    async with session.get(
+        url,
+        headers={'Range': 'bytes=0-0'},
+        allow_redirects=True,
+        timeout=timeout_config
+    ) as resp:
+        if resp.status == 206:
+            return True, _parse_content_range_total(resp.headers.get('content-range', ''))
+        if resp.status == 200:
+            # Servidor ignorou o Range: não lê o corpo, apenas o status
+            length = resp.headers.get('content-length')
+            resp.close()
+            return True, int(length) if length and length.isdigit() else None
+    
+    return False, None
+
+
 async def download_file(
     url: str,
     file_path: Path,
@@ -87,8 +162,9 @@ async def download_file(
     retries: int = 3,
     chunk_size: int = 8192,
     timeout: int = 300,
-    progress_callback=None  # ✅ Callback de progresso
-) -> None:
+    progress_callback=None,  # ✅ Callback de progresso
+    expected_size: Optional[int] = None
+) -> str:
     """
     Faz download de arquivo com retries e backoff exponencial.
     
@@ -100,6 +176,11 @@ async def download_file(
         chunk_size: Tamanho dos chunks de download
         timeout: Timeout total em segundos
         progress_callback: Função chamada com (downloaded_bytes, total_bytes, speed)
+        expected_size: Tamanho já conhecido (sondado), usado quando o servidor
+                       não informa content-length
+    
+    Returns:
+        SHA-256 (hex) do conteúdo baixado, calculado durante a transferência
     """
     import time
     
@@ -129,18 +210,20 @@ async def download_file(
                     if response.status != 200:
                         raise Exception(f"Status HTTP inválido: {response.status}")
                     
-                    total_size = int(response.headers.get('content-length', 0))
+                    total_size = int(response.headers.get('content-length', 0)) or (expected_size or 0)
                     downloaded = 0
                     start_time = time.time()
                     last_update = 0
                     
                     # ✅ MELHORIA: Download com arquivo temporário
                     temp_path = file_path.with_suffix('.tmp')
+                    digest = hashlib.sha256()
                     
                     try:
                         with open(temp_path, 'wb') as f:
                             async for chunk in response.content.iter_chunked(chunk_size):
                                 f.write(chunk)
+                                digest.update(chunk)
                                 downloaded += len(chunk)
                                 
                                 # Atualiza progresso
@@ -161,7 +244,7 @@ async def download_file(
                         raise e
             
             logger.info(f"✓ Baixado: {file_path.name}")
-            return
+            return digest.hexdigest()
             
         except asyncio.CancelledError:
             logger.warning("Download cancelado pelo usuário")
@@ -196,7 +279,7 @@ async def verify_download(
     file_path: Path,
     logger: logging.Logger,
     min_size: int = 1024,
-    expected_extension: Optional[Literal['.pdf', '.mp4']] = None
+    expected_extension: Optional[Literal['.pdf', '.mp4', '.ts']] = None
 ) -> bool:
     """
     Verifica se o download foi bem-sucedido.
@@ -242,6 +325,12 @@ async def verify_download(
                     ftyp = f.read(4)
                     if ftyp not in [b'ftyp', b'mdat', b'moov', b'wide', b'free']:
                         raise ValueError(f"Arquivo não é MP4 válido: {file_path.name}")
+                
+                elif expected_extension == '.ts':
+                    # MPEG-TS: pacotes de 188 bytes começando com 0x47
+                    packets = f.read(189)
+                    if packets[:1] != b'\x47' or (len(packets) > 188 and packets[188:189] != b'\x47'):
+                        raise ValueError(f"Arquivo não é MPEG-TS válido: {file_path.name}")
         
         except (OSError, IOError) as e:
             raise ValueError(f"Erro ao validar arquivo {file_path.name}: {e}")
@@ -250,6 +339,24 @@ async def verify_download(
     return True
 
 
+def file_sha256(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcula o SHA-256 de um arquivo lendo em blocos (memória constante).
+    
+    Args:
+        file_path: Caminho do arquivo
+        chunk_size: Tamanho de cada leitura em bytes
+    
+    Returns:
+        Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def format_bytes(size: int) -> str:
     """
     Formata tamanho em bytes para formato legível.
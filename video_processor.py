@@ -6,10 +6,23 @@ Parte 3/5 da refatoração
 import logging
 import asyncio
 import re
+import time
 from pathlib import Path
-from playwright.async_api import Page, Locator, TimeoutError as PlaywrightTimeoutError
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from playwright.async_api import Page, Locator, Download, TimeoutError as PlaywrightTimeoutError
 from base_processor import BaseCourseProcessor
-from utils import sanitize_filename, download_file, verify_download
+from auth import SessionExpiredError
+from browser_supervisor import BrowserCrashedError
+from item_identity import video_key, extra_key
+from page_monitor import PageMonitor, PageStats
+from resolution_policy import ResolutionPolicy, AUTO_RESOLUTION
+from stream_downloader import download_stream, stream_kind
+from faststart import FaststartPool
+from utils import (
+    sanitize_filename, download_file, verify_download, probe_url,
+    extract_course_id, format_bytes, file_sha256
+)
 import aiohttp
 
 logger = logging.getLogger(__name__)
@@ -32,6 +45,17 @@ class VideoProcessor(BaseCourseProcessor):
     # ✅ NOVAS CONSTANTES: Para materiais complementares
     MATERIAL_LOAD_TIMEOUT = 10000
     MATERIAL_CLICK_DELAY = 0.5
+    MATERIAL_DOWNLOAD_WAIT = 2500  # ms: botão sem href que não dispara download
+    
+    # Materiais complementares: texto do botão e sufixo do arquivo
+    EXTRA_TYPES = {
+        'mapa': {'name': 'Mapa mental', 'label': 'Baixar Mapa Mental', 'suffix': 'Mapa Mental'},
+        'resumo': {'name': 'Resumo', 'label': 'Baixar Resumo', 'suffix': 'Resumo'},
+        'slides': {'name': 'Slides', 'label': 'Baixar Slides', 'suffix': 'Slides'},
+    }
+    
+    # Abas extras por curso (divisão das aulas)
+    MAX_LESSON_TABS = 4
     
     def __init__(
         self,
@@ -40,7 +64,16 @@ class VideoProcessor(BaseCourseProcessor):
         preferred_resolution: str = '720p',
         download_extras: bool = True,  # ✅ NOVO: Flag para baixar materiais extras
         skip_video: bool = False,      # ✅ NOVO: Se True, não baixa vídeo (apenas extras)
-        log_queue=None                 # ✅ Passa fila de logs
+        log_queue=None,                # ✅ Passa fila de logs
+        download_semaphore=None,       # Limitador global de downloads
+        lesson_tabs: int = 1,          # Abas que dividem as aulas do curso
+        pipeline_window: int = 2,      # Vídeos resolvidos à frente da transferência
+        heap_limit_mb: float = 0,      # Recicla a página acima deste heap JS (0 = sem limite)
+        recycle_every: int = 0,        # Recicla a página a cada N vídeos (0 = desativado)
+        page_stats: Optional[PageStats] = None,  # Memória/latência agregadas da execução
+        reduce_resolution: bool = True,  # Resolução menor quando falta espaço/orçamento
+        resolution_policy: Optional[ResolutionPolicy] = None,  # Política do modo 'auto'
+        faststart: Optional[FaststartPool] = None  # Reescreve os MP4 com 'moov' no início
     ):
         """
         Inicializa o processador de vídeos.
@@ -48,14 +81,32 @@ class VideoProcessor(BaseCourseProcessor):
         Args:
             base_dir: Diretório base para downloads
             progress_manager: Gerenciador de progresso
-            preferred_resolution: Resolução preferida (720p, 480p, 360p)
+            preferred_resolution: Resolução preferida (720p, 480p, 360p ou auto)
             download_extras: Se True, baixa também mapas mentais e resumos
             skip_video: Se True, apenas navega e baixa extras, ignorando o arquivo de vídeo
             log_queue: Fila para enviar status
+            download_semaphore: Limitador global de downloads (opcional)
+            lesson_tabs: Número de abas que processam aulas do mesmo curso em paralelo
+            pipeline_window: Quantos vídeos a página pode resolver à frente do
+                             que está sendo transferido
+            heap_limit_mb: Heap JS (MB) que dispara a reciclagem da página
+            recycle_every: Número de vídeos após o qual a página é reciclada
+            page_stats: Estatísticas de memória e latência da execução
+            reduce_resolution: Baixa em resolução menor quando o vídeo não cabe
+                               no disco ou no orçamento do curso
+            resolution_policy: Escolhe a resolução de cada vídeo no modo 'auto'
+                               (compartilhada entre os cursos da execução)
+            faststart: Pool que move o 'moov' dos vídeos concluídos para o início,
+                       fora do caminho dos downloads
         """
-        super().__init__(base_dir, progress_manager, log_queue)
+        super().__init__(base_dir, progress_manager, log_queue, download_semaphore)
         
-        if preferred_resolution not in self.AVAILABLE_RESOLUTIONS:
+        # Modo automático: o player seleciona a maior e a política decide por vídeo
+        self.resolution_policy = None
+        if preferred_resolution == AUTO_RESOLUTION:
+            self.resolution_policy = resolution_policy or ResolutionPolicy(self.AVAILABLE_RESOLUTIONS)
+            preferred_resolution = self.AVAILABLE_RESOLUTIONS[0]
+        elif preferred_resolution not in self.AVAILABLE_RESOLUTIONS:
             logger.warning(
                 f"⚠ Resolução inválida ({preferred_resolution}), usando padrão (720p)"
             )
@@ -64,12 +115,45 @@ class VideoProcessor(BaseCourseProcessor):
         self.preferred_resolution = preferred_resolution
         self.download_extras = download_extras
         self.skip_video = skip_video
+        self.lesson_tabs = max(1, min(int(lesson_tabs or 1), self.MAX_LESSON_TABS))
+        self.reduce_resolution = reduce_resolution
+        self.faststart = faststart
+        self.pipeline_window = max(0, int(pipeline_window or 0))
+        
+        # Pipeline: página resolve os próximos vídeos enquanto o atual é transferido
+        self._transfer_queue: Optional[asyncio.Queue] = None
+        self._lookahead: Optional[asyncio.Semaphore] = None
+        self._transfer_tasks: List[asyncio.Task] = []
+        
+        # Downloads por clique ainda na fila, por página de origem (reciclagem espera só estes)
+        self._page_downloads: Dict[Page, Set[asyncio.Future]] = {}
+        
+        # Cache de verificações de URL: válidas por (curso, padrão do caminho),
+        # inválidas só pelo caminho exato (uma aula sem 720p não vale para as outras)
+        self._probe_cache: Set[Tuple[str, str]] = set()
+        self._probe_failures: Set[Tuple[str, str]] = set()
+        
+        # Tamanhos já descobertos por caminho de URL (reaproveitados no download)
+        self.known_sizes: Dict[str, int] = {}
+        
+        # Reciclagem de páginas: monitor por página, página principal e abas próprias
+        self.heap_limit_mb = max(0, float(heap_limit_mb or 0))
+        self.recycle_every = max(0, int(recycle_every or 0))
+        self.page_stats = page_stats or PageStats()
+        self._monitors: Dict[Page, PageMonitor] = {}
+        self._main_page: Optional[Page] = None
+        self._owned_tabs: List[Page] = []
+        
+        # Último manifesto HLS/DASH pedido por página (players com src 'blob:')
+        self._stream_sources: Dict[Page, Optional[str]] = {}
         
         logger.info(f"🎥 Processador de vídeo inicializado")
-        logger.info(f"   Resolução: {preferred_resolution}")
+        logger.info(f"   Resolução: {AUTO_RESOLUTION if self.resolution_policy else preferred_resolution}")
         logger.info(f"   Baixar extras: {'Sim' if download_extras else 'Não'}")
         if skip_video:
             logger.info("   ⚠ MODO SOMENTE EXTRAS: Download de vídeo será ignorado")
+        if self.lesson_tabs > 1:
+            logger.info(f"   Abas por curso: {self.lesson_tabs}")
     
     async def process_course(self, page: Page, course_url: str) -> bool:
         """
@@ -85,6 +169,10 @@ class VideoProcessor(BaseCourseProcessor):
         try:
             await self.check_cancellation()
             
+            self.course_id = extract_course_id(course_url)
+            self._main_page = page
+            self.replaced_page = None
+            
             await self.navigate_to_course(page, course_url)
             course_name, course_dir = await self.extract_course_info(page)
             aulas = await self.get_lessons(page)
@@ -93,18 +181,27 @@ class VideoProcessor(BaseCourseProcessor):
                 logger.warning("⚠ Nenhuma aula encontrada no curso")
                 return False
             
-            success_count = 0
-            failed_count = 0
+            if self.resolution_policy is not None:
+                done = len(self.cursor.lessons_done) if self.cursor is not None else 0
+                self.resolution_policy.start_course(self.course_id, len(aulas) - done)
             
-            for index, aula_element in enumerate(aulas, 1):
-                await self.check_cancellation()
-                
-                try:
-                    await self._process_lesson(page, aula_element, course_dir, course_url, index)
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"❌ Erro ao processar aula: {e}")
-                    failed_count += 1
+            tabs = min(self.lesson_tabs, len(aulas))
+            self._start_pipeline()
+            
+            if tabs <= 1:
+                success_count, failed_count = await self._process_lesson_shard(
+                    page, aulas, list(range(len(aulas))), course_dir, course_url
+                )
+            else:
+                success_count, failed_count = await self._process_lessons_in_tabs(
+                    page, aulas, tabs, course_dir, course_url
+                )
+            
+            # Aguarda as transferências que ainda estão em andamento
+            await self._finish_pipeline(wait=True)
+            
+            if self.resolution_policy is not None:
+                self.resolution_policy.finish_course(self.course_id)
             
             logger.info(f"✅ Curso '{course_name}' processado!")
             logger.info(f"   ✓ Aulas processadas: {success_count}")
@@ -117,9 +214,562 @@ class VideoProcessor(BaseCourseProcessor):
             logger.warning("⚠ Processamento do curso cancelado")
             return False
         
+        except SessionExpiredError:
+            raise  # DownloadManager refaz o login e tenta novamente
+        
         except Exception as e:
+            if self.is_browser_lost(e):
+                # Transferências HTTP não dependem do navegador: terminam antes da retomada
+                await self._finish_pipeline(wait=True)
+                self.raise_if_browser_lost(e)
             logger.error(f"❌ Erro ao processar curso: {e}", exc_info=True)
             return False
+        
+        finally:
+            await self._finish_pipeline(wait=False)
+            await self.close()
+    
+    async def _process_lesson_shard(
+        self,
+        page: Page,
+        aulas: List[Locator],
+        indices: List[int],
+        course_dir: Path,
+        course_url: str
+    ) -> Tuple[int, int]:
+        """
+        Processa, em sequência, as aulas de índices informados numa mesma página.
+        
+        Args:
+            page: Página do Playwright
+            aulas: Elementos de aula desta página
+            indices: Índices (base 0) das aulas a processar
+            course_dir: Diretório do curso
+            course_url: URL do curso
+        
+        Returns:
+            Tupla (aulas_processadas, aulas_com_erro)
+        """
+        success_count = 0
+        failed_count = 0
+        monitor = await self._start_monitor(page)
+        
+        try:
+            for pos, i in enumerate(indices):
+                await self.check_cancellation()
+                
+                if i >= len(aulas):
+                    continue  # Lista de aulas mudou após reciclar a página
+                
+                # Retomada após queda do navegador: aulas já concluídas
+                if self.cursor is not None and self.cursor.skip_lesson(i + 1):
+                    continue
+                
+                try:
+                    await self._process_lesson(page, aulas[i], course_dir, course_url, i + 1)
+                    success_count += 1
+                except Exception as e:
+                    self.raise_if_browser_lost(e)
+                    logger.error(f"❌ Erro ao processar aula: {e}")
+                    failed_count += 1
+                
+                if self.cursor is not None:
+                    self.cursor.lesson_done(i + 1)
+                if self.resolution_policy is not None:
+                    self.resolution_policy.lesson_done(self.course_id)
+                
+                # ♻️ Entre aulas: recicla a página se a memória ou o nº de vídeos passou do limite
+                if pos < len(indices) - 1:
+                    reason = await monitor.recycle_reason()
+                    if reason:
+                        page, aulas = await self._recycle_page(page, aulas, course_url, reason)
+                        monitor = self._monitors.get(page) or await self._start_monitor(page)
+        
+        finally:
+            await self._stop_monitor(page)
+        
+        return success_count, failed_count
+    
+    async def _start_monitor(self, page: Page) -> PageMonitor:
+        """
+        Começa a monitorar memória e latência de uma página.
+        
+        Args:
+            page: Página do Playwright
+        
+        Returns:
+            Monitor da página
+        """
+        self._watch_streams(page)
+        monitor = PageMonitor(page, self.heap_limit_mb, self.recycle_every, self.page_stats)
+        await monitor.start()
+        await monitor.sample()
+        self._monitors[page] = monitor
+        return monitor
+    
+    async def _stop_monitor(self, page: Page) -> None:
+        """Encerra o monitor de uma página"""
+        self._stream_sources.pop(page, None)
+        monitor = self._monitors.pop(page, None)
+        if monitor is not None:
+            await monitor.close()
+    
+    def _watch_streams(self, page: Page) -> None:
+        """
+        Guarda o último manifesto HLS/DASH requisitado pela página.
+        
+        Players que tocam por MediaSource expõem só um 'blob:' no src; a URL real
+        é a do manifesto que o player buscou.
+        
+        Args:
+            page: Página do Playwright
+        """
+        if page in self._stream_sources:
+            return
+        self._stream_sources[page] = None
+        
+        def on_request(request) -> None:
+            if page in self._stream_sources and stream_kind(request.url):
+                self._stream_sources[page] = request.url
+        
+        page.on('request', on_request)
+    
+    def _record_step(self, page: Page, name: str, started_at: float) -> None:
+        """Registra a latência de uma etapa no monitor da página (se houver)"""
+        monitor = self._monitors.get(page)
+        if monitor is not None:
+            monitor.record_step(name, started_at)
+    
+    async def _recycle_page(
+        self,
+        page: Page,
+        aulas: List[Locator],
+        course_url: str,
+        reason: str
+    ) -> Tuple[Page, List[Locator]]:
+        """
+        Troca a página por uma nova no mesmo contexto e volta ao curso.
+        
+        A posição é restaurada pelo índice da próxima aula (as aulas são lidas
+        de novo na nova página). Downloads iniciados pelo navegador na página
+        antiga terminam antes de ela ser fechada.
+        
+        Args:
+            page: Página atual
+            aulas: Elementos de aula da página atual
+            course_url: URL do curso
+            reason: Motivo da reciclagem ('heap' ou 'videos')
+        
+        Returns:
+            Tupla (página, aulas) a usar daqui em diante
+        """
+        logger.info(f"♻️  Reciclando página do navegador (motivo: {reason})")
+        
+        # Downloads por clique desta página terminam antes de ela ser fechada
+        pending = self._page_downloads.pop(page, set())
+        if pending:
+            await asyncio.wait(pending)
+        
+        new_page = None
+        try:
+            new_page = await page.context.new_page()
+            await self.navigate_to_course(new_page, course_url)
+            new_aulas = await self.get_lessons(new_page)
+        except SessionExpiredError:
+            if new_page is not None:
+                await new_page.close()
+            raise
+        except Exception as e:
+            self.raise_if_browser_lost(e)
+            logger.error(f"❌ Falha ao reciclar página, mantendo a atual: {e}")
+            if new_page is not None:
+                await new_page.close()
+            # Evita tentar de novo a cada aula
+            monitor = self._monitors.get(page)
+            if monitor is not None:
+                monitor.videos_since_start = 0
+            return page, aulas
+        
+        await self._stop_monitor(page)
+        
+        # Atualiza quem é dono da página (principal volta ao DownloadManager)
+        if page is self._main_page:
+            self._main_page = new_page
+            self.replaced_page = new_page
+        elif page in self._owned_tabs:
+            self._owned_tabs[self._owned_tabs.index(page)] = new_page
+        
+        try:
+            await page.close()
+        except Exception as e:
+            logger.debug(f"Erro ao fechar página antiga: {e}")
+        
+        self.page_stats.record_recycle(reason)
+        logger.info("✓ Página reciclada, retomando na próxima aula")
+        
+        return new_page, new_aulas
+    
+    async def _process_lessons_in_tabs(
+        self,
+        page: Page,
+        aulas: List[Locator],
+        tabs: int,
+        course_dir: Path,
+        course_url: str
+    ) -> Tuple[int, int]:
+        """
+        Divide as aulas do curso entre várias abas, cada uma com seu próprio player.
+        
+        Args:
+            page: Página principal (já no curso)
+            aulas: Elementos de aula da página principal
+            tabs: Número de abas a usar
+            course_dir: Diretório do curso
+            course_url: URL do curso
+        
+        Returns:
+            Tupla (aulas_processadas, aulas_com_erro) somando todas as abas
+        """
+        # Distribuição intercalada: aulas longas e curtas ficam misturadas entre as abas
+        shards = [list(range(k, len(aulas), tabs)) for k in range(tabs)]
+        self._owned_tabs = []
+        
+        logger.info(f"🗂️  Dividindo {len(aulas)} aulas entre {tabs} abas")
+        
+        try:
+            jobs = [self._process_lesson_shard(page, aulas, shards[0], course_dir, course_url)]
+            
+            for shard in shards[1:]:
+                tab = await page.context.new_page()
+                self._owned_tabs.append(tab)
+                jobs.append(self._process_tab_shard(tab, shard, course_dir, course_url))
+            
+            results = await asyncio.gather(*jobs, return_exceptions=True)
+        
+        finally:
+            # Abas recicladas já foram trocadas na lista
+            for tab in self._owned_tabs:
+                try:
+                    await tab.close()
+                except Exception as e:
+                    logger.debug(f"Erro ao fechar aba: {e}")
+            self._owned_tabs = []
+        
+        success_count = 0
+        failed_count = 0
+        
+        for shard, result in zip(shards, results):
+            if isinstance(result, (asyncio.CancelledError, BrowserCrashedError)):
+                raise result
+            if isinstance(result, BaseException):
+                logger.error(f"❌ Erro em aba do curso: {result}")
+                failed_count += len(shard)
+            else:
+                success_count += result[0]
+                failed_count += result[1]
+        
+        return success_count, failed_count
+    
+    async def _process_tab_shard(
+        self,
+        tab: Page,
+        indices: List[int],
+        course_dir: Path,
+        course_url: str
+    ) -> Tuple[int, int]:
+        """
+        Abre o curso numa aba adicional e processa as aulas atribuídas a ela.
+        
+        Args:
+            tab: Nova aba do mesmo contexto autenticado
+            indices: Índices (base 0) das aulas desta aba
+            course_dir: Diretório do curso
+            course_url: URL do curso
+        
+        Returns:
+            Tupla (aulas_processadas, aulas_com_erro)
+        """
+        await self.navigate_to_course(tab, course_url)
+        aulas = await self.get_lessons(tab)
+        
+        return await self._process_lesson_shard(
+            tab, aulas, [i for i in indices if i < len(aulas)], course_dir, course_url
+        )
+    
+    def get_known_size(self, url: Optional[str]) -> Optional[int]:
+        """
+        Retorna o tamanho já sondado de uma URL, se conhecido.
+        
+        Args:
+            url: URL do arquivo
+        
+        Returns:
+            Tamanho em bytes ou None
+        """
+        if not url:
+            return None
+        return self.known_sizes.get(urlparse(url).path)
+    
+    def _start_pipeline(self) -> None:
+        """Cria a fila de transferências e os workers que consomem os jobs"""
+        window = self.pipeline_window
+        self._transfer_queue = asyncio.Queue()
+        # Limita jobs resolvidos e ainda não concluídos: o atual + 'window' à frente
+        self._lookahead = asyncio.Semaphore(window + 1)
+        self._transfer_tasks = [
+            asyncio.create_task(self._transfer_worker())
+            for _ in range(window + 1)
+        ]
+    
+    async def _finish_pipeline(self, wait: bool = True) -> None:
+        """
+        Encerra o pipeline de transferências.
+        
+        Args:
+            wait: Se True, aguarda todos os jobs pendentes terminarem
+        """
+        if self._transfer_queue is None:
+            return
+        
+        if wait:
+            await self._transfer_queue.join()
+        
+        for task in self._transfer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._transfer_tasks, return_exceptions=True)
+        
+        # Libera reservas de jobs que não chegaram a ser transferidos
+        while not self._transfer_queue.empty():
+            self._release_job(self._transfer_queue.get_nowait())
+        
+        self._transfer_queue = None
+        self._transfer_tasks = []
+    
+    async def _enqueue_transfer(self, job: dict) -> None:
+        """
+        Envia job resolvido para o estágio de transferência.
+        Bloqueia enquanto a janela de antecipação estiver cheia.
+        
+        Args:
+            job: Dados do arquivo (url, file_path, file_name, progress_key...)
+        """
+        if self._transfer_queue is None:
+            # Sem pipeline ativo (uso direto): transfere imediatamente
+            try:
+                await self._transfer_job(job)
+            finally:
+                self._release_job(job)
+            return
+        
+        try:
+            await self._lookahead.acquire()
+        except asyncio.CancelledError:
+            # Não entrou na fila: a reserva volta para quem chamou
+            self._dequeue_policy_bytes(job)
+            raise
+        
+        if job.get('download'):
+            settled = asyncio.get_running_loop().create_future()
+            self._page_downloads.setdefault(job['download'].page, set()).add(settled)
+            job['settled'] = settled
+        
+        await self._transfer_queue.put(job)
+    
+    def _release_job(self, job: dict) -> None:
+        """
+        Libera o que um job reservou ao sair do pipeline, transferido ou não.
+        
+        Args:
+            job: Job de transferência
+        """
+        if job.get('claim'):
+            self.release_item(job['claim'])
+        self._settle_page_download(job)
+        self._dequeue_policy_bytes(job)
+    
+    def _dequeue_policy_bytes(self, job: dict) -> None:
+        """
+        Tira os bytes previstos do job da fila da resolução automática.
+        
+        Args:
+            job: Job de transferência
+        """
+        if self.resolution_policy is not None and job.get('policy_bytes'):
+            self.resolution_policy.dequeue(job['policy_bytes'])
+    
+    def _settle_page_download(self, job: dict) -> None:
+        """
+        Avisa que um download por clique saiu da fila (concluído ou descartado).
+        
+        Args:
+            job: Job de transferência
+        """
+        settled = job.get('settled')
+        if settled is None:
+            return
+        
+        pending = self._page_downloads.get(job['download'].page)
+        if pending is not None:
+            pending.discard(settled)
+            if not pending:
+                del self._page_downloads[job['download'].page]
+        
+        if not settled.done():
+            settled.set_result(None)
+    
+    async def _transfer_worker(self) -> None:
+        """Consome jobs da fila de transferências até ser cancelado"""
+        while True:
+            job = await self._transfer_queue.get()
+            try:
+                if not self.cancel_requested:
+                    await self._transfer_job(job)
+            finally:
+                self._release_job(job)
+                self._lookahead.release()
+                self._transfer_queue.task_done()
+    
+    async def _transfer_job(self, job: dict) -> None:
+        """
+        Baixa, verifica e marca como concluído um arquivo já resolvido.
+        
+        Args:
+            job: Dados do arquivo (url, file_path, file_name, progress_key...)
+        """
+        file_path: Path = job['file_path']
+        file_name = job['file_name']
+        expected_size = job.get('expected_size')
+        reservation = None
+        measured = False
+        
+        try:
+            # Só começa se couber no disco e no orçamento do curso (senão não sobra .tmp)
+            reservation = await self.reserve_space(file_path, expected_size)
+            
+            if expected_size:
+                logger.info(f"⬇️  Baixando: {file_name} ({format_bytes(expected_size)})")
+            else:
+                logger.info(f"⬇️  Baixando: {file_name}")
+            
+            # ✅ Callback de progresso
+            def progress_callback(current, total, speed):
+                if self.log_queue:
+                    try:
+                        self.log_queue.put_nowait({
+                            "type": "progress",
+                            "file": file_name,
+                            "current": current,
+                            "total": total,
+                            "speed": speed
+                        })
+                    except:
+                        pass
+            
+            # Vazão medida nos vídeos alimenta a resolução automática; o relógio
+            # só começa com a vaga do limitador (espera na fila não é transferência)
+            def measure(download_func):
+                if self.resolution_policy is None or job.get('expected_extension') != '.mp4':
+                    return download_func
+                
+                async def measured_download(*args, **kwargs):
+                    nonlocal measured
+                    self.resolution_policy.transfer_started()
+                    measured = True
+                    return await download_func(*args, **kwargs)
+                
+                return measured_download
+            
+            if job.get('download'):
+                # Download disparado por clique: salva o que o navegador já está baixando
+                sha256 = await self.download_with_rate_limit(
+                    measure(self._save_browser_download),
+                    job['download'],
+                    file_path
+                )
+            elif job.get('stream'):
+                # HLS/DASH: segmentos em paralelo num único arquivo (.mp4 ou .ts)
+                sha256, file_path = await self.download_with_rate_limit(
+                    measure(download_stream),
+                    job['url'],
+                    file_path,
+                    logger,
+                    preferred_resolution=job['resolution'],
+                    progress_callback=progress_callback
+                )
+            else:
+                sha256 = await self.download_with_rate_limit(
+                    measure(download_file),
+                    job['url'],
+                    file_path,
+                    logger,
+                    progress_callback=progress_callback,
+                    expected_size=expected_size
+                )
+            
+            await verify_download(
+                file_path,
+                logger,
+                expected_extension=file_path.suffix if job.get('stream') else job.get('expected_extension')
+            )
+            
+            self.mark_as_downloaded(job['progress_key'], file_path, sha256)
+            logger.info(f"✅ Concluído: {job.get('title', file_name)}")
+            
+            # Reescrita em outro processo: a próxima transferência não espera
+            if self.faststart is not None:
+                self.faststart.schedule(file_path, job['progress_key'])
+        
+        except asyncio.CancelledError:
+            if file_path.exists():
+                file_path.unlink()
+                logger.debug(f"✓ Arquivo parcial removido: {file_path.name}")
+            raise
+        
+        except Exception as e:
+            logger.error(f"❌ Falha ao baixar '{file_name}': {e}")
+            self.mark_as_failed(job['progress_key'], e)
+            
+            if file_path.exists():
+                file_path.unlink()
+                logger.debug("✓ Arquivo corrompido removido")
+        
+        finally:
+            if measured:
+                written = file_path.stat().st_size if file_path.exists() else 0
+                self.resolution_policy.transfer_finished(written)
+            await self.release_space(reservation, file_path)
+    
+    async def _save_browser_download(self, download: Download, file_path: Path) -> str:
+        """
+        Salva em disco um download feito pelo próprio navegador.
+        
+        Args:
+            download: Download do Playwright
+            file_path: Caminho final do arquivo
+        
+        Returns:
+            SHA-256 (hex) do arquivo salvo
+        
+        Raises:
+            Exception: Se o navegador reportar falha no download
+        """
+        failure = await download.failure()
+        if failure:
+            raise Exception(f"Download do navegador falhou: {failure}")
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = file_path.with_suffix('.tmp')
+        
+        try:
+            await download.save_as(str(temp_path))
+            sha256 = await asyncio.to_thread(file_sha256, temp_path)
+            temp_path.replace(file_path)
+        except Exception:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+        
+        return sha256
     
     async def _process_lesson(
         self,
@@ -127,7 +777,8 @@ class VideoProcessor(BaseCourseProcessor):
         aula_element: Locator,
         course_dir: Path,
         course_url: str,
-        index: int
+        index: int,
+        expand: bool = True
     ) -> None:
         """
         Processa uma aula específica para download de vídeos.
@@ -137,9 +788,19 @@ class VideoProcessor(BaseCourseProcessor):
             aula_element: Elemento da aula
             course_dir: Diretório do curso
             course_url: URL do curso (para recuperação de erros)
+            index: Índice da aula
+            expand: Se False, a aula já foi expandida por quem chamou
         """
+        aula_id = None
+        
         try:
-            aula_id, lesson_name, _ = await self.extract_lesson_info(aula_element, index)
+            aula_id, lesson_name, lesson_subtitle = await self.extract_lesson_info(aula_element, index)
+            lesson_title = f'{lesson_name} - {lesson_subtitle}'
+            
+            # ✅ SYNC INCREMENTAL: aula sem novidades não é expandida nem clicada
+            if self.can_skip_lesson(aula_id, lesson_title):
+                logger.info(f"⏭️  Aula sem novidades: {lesson_name}")
+                return
             
             lesson_dir = course_dir / lesson_name
             
@@ -151,29 +812,47 @@ class VideoProcessor(BaseCourseProcessor):
             
             logger.info(f"🎬 Processando aula: {lesson_name}")
             
-            await self.expand_lesson(page, aula_id)
+            if expand:
+                await self.expand_lesson(page, aula_id)
             
             videos = await aula_element.locator('.ListVideos-items-video a.VideoItem').all()
             
             if not videos:
                 logger.info(f"ℹ️  Nenhum vídeo encontrado em '{lesson_name}'")
+                self.record_lesson(aula_id, lesson_title)
                 return
             
             logger.info(f"✓ Encontrados {len(videos)} vídeo(s)")
             
+            video_ids = await self._get_video_ids(aula_element, aula_id, len(videos))
+            
             for j, video_element in enumerate(videos, 1):
                 await self.check_cancellation()
                 
+                # Retomada após queda do navegador: vídeos já selecionados
+                if self.cursor is not None and self.cursor.skip_video(index, j):
+                    # Itens pulados não entram no manifesto: a aula é revista na próxima execução
+                    self.mark_lesson_failed(aula_id)
+                    continue
+                
                 await self._process_video(
                     page, video_element, lesson_name, lesson_dir,
-                    aula_id, j, course_url
+                    aula_id, j, course_url, video_ids[j - 1]
                 )
+                
+                if self.cursor is not None:
+                    self.cursor.video_done(index, j)
+            
+            self.record_lesson(aula_id, lesson_title)
         
         except asyncio.CancelledError:
             raise
         
         except Exception as e:
+            self.raise_if_browser_lost(e)
             logger.error(f"❌ Erro ao processar aula: {e}")
+            if aula_id:
+                self.mark_lesson_failed(aula_id)
     
     async def _process_video(
         self,
@@ -183,7 +862,8 @@ class VideoProcessor(BaseCourseProcessor):
         lesson_dir: Path,
         aula_id: str,
         video_index: int,
-        course_url: str
+        course_url: str,
+        video_id: Optional[str] = None
     ) -> None:
         """
         Processa um vídeo individual e seus materiais complementares.
@@ -196,26 +876,42 @@ class VideoProcessor(BaseCourseProcessor):
             aula_id: ID da aula
             video_index: Índice do vídeo
             course_url: URL do curso (para recuperação)
+            video_id: Identidade estável do vídeo (None = usa título + posição)
         """
-        file_path = None
+        claimed_key = None
         
         try:
             video_title_raw = await video_element.locator(".VideoItem-info-title").text_content()
             video_title = sanitize_filename(video_title_raw)
             
-            progress_key = f'{aula_id}-{video_title}-{video_index}'
+            # Identidade estável pelo link do vídeo; chave antiga (título + posição) para migração
+            legacy_key = f'{aula_id}-{video_title}-{video_index}'
+            progress_key = video_id or legacy_key
+            
+            if not self.skip_video:
+                self.track_item(aula_id, progress_key)
             
-            # Se for baixar vídeo, verifica se já está baixado
-            if not self.skip_video and self.is_already_downloaded(progress_key):
+            # Se for baixar vídeo, verifica se já está baixado (renomeado = só move o arquivo)
+            if not self.skip_video and self.adopt_existing(
+                progress_key, legacy_key,
+                self._existing_video_path(progress_key, lesson_dir, lesson_name, video_index, video_title)
+            ):
                 logger.info(f"⏭️  Já baixado: {video_title}")
                 # ✅ MELHORIA: Mesmo se vídeo já foi baixado, tenta baixar extras se habilitado
                 if self.download_extras:
                     await self._download_video_extras(
                         page, video_element, lesson_name, lesson_dir,
-                        aula_id, video_index, video_title
+                        aula_id, video_index, video_title, video_id
                     )
                 return
             
+            # Outra aba/página já está baixando este mesmo item
+            if not self.skip_video:
+                if not self.claim_item(progress_key):
+                    logger.info(f"⏭️  Em andamento em outra aba: {video_title}")
+                    return
+                claimed_key = progress_key
+            
             # Scroll e clique no vídeo (necessário para carregar extras também)
             try:
                 await video_element.scroll_into_view_if_needed()
@@ -225,6 +921,10 @@ class VideoProcessor(BaseCourseProcessor):
                     video_element
                 )
             
+            if page in self._stream_sources:
+                self._stream_sources[page] = None  # Manifesto deve ser do vídeo selecionado agora
+            
+            selected_at = time.monotonic()
             await video_element.click()
             logger.info(f"✓ Selecionado: {video_title}")
             
@@ -240,77 +940,93 @@ class VideoProcessor(BaseCourseProcessor):
                 logger.warning("⚠ Player de vídeo demorou a carregar")
             
             await asyncio.sleep(self.PLAYER_LOAD_DELAY)
+            self._record_step(page, 'selecionar vídeo', selected_at)
+            
+            monitor = self._monitors.get(page)
+            if monitor is not None:
+                monitor.count_video()
             
             # ----- INICIO BLOCO DOWNLOAD DE VIDEO -----
             if not self.skip_video:
                 # Obtém URL do vídeo
+                resolve_started = time.monotonic()
                 video_info = await self._get_video_url_by_resolution(page)
+                self._record_step(page, 'resolver URL', resolve_started)
                 video_url = video_info['url']
                 used_resolution = video_info['resolution']
                 
-                if video_url:
-                    # Define nome e caminho
-                    file_name = f'{lesson_name} - Vídeo {video_index} {video_title} [{used_resolution}].mp4'
-                    file_path = lesson_dir / sanitize_filename(file_name)
-                    
-                    logger.info(f"⬇️  Baixando vídeo: {file_name}")
-                    
-                    # ✅ Callback de progresso
-                    def progress_callback(current, total, speed):
-                        if self.log_queue:
-                            try:
-                                self.log_queue.put_nowait({
-                                    "type": "progress",
-                                    "file": file_name,
-                                    "current": current,
-                                    "total": total,
-                                    "speed": speed
-                                })
-                            except:
-                                pass
-
-                    await self.download_with_rate_limit(
-                        download_file,
-                        video_url,
-                        file_path,
-                        logger,
-                        progress_callback=progress_callback
+                # ✅ STREAMING: src 'blob:' é alimentado por um manifesto HLS/DASH
+                if video_url and video_url.startswith('blob:'):
+                    video_url = self._stream_sources.get(page)
+                    if video_url:
+                        logger.info(f"📺 Player com blob: usando manifesto {stream_kind(video_url).upper()}")
+                    else:
+                        logger.error("❌ Player com blob: e nenhum manifesto HLS/DASH detectado")
+                is_stream = stream_kind(video_url) is not None
+                
+                # ✅ RESOLUÇÃO AUTOMÁTICA: vazão x fila restante x prazo
+                policy_bytes = 0
+                if video_url and not is_stream and self.resolution_policy is not None:
+                    video_url, used_resolution, policy_bytes = await self._auto_resolution(
+                        video_url, used_resolution
                     )
-                    
-                    await verify_download(
-                        file_path,
-                        logger,
-                        expected_extension='.mp4'
+                
+                # ✅ ESPAÇO EM DISCO: resolução menor se o vídeo não couber
+                if video_url and not is_stream and self.disk_admission is not None:
+                    video_url, used_resolution = await self._fit_resolution(
+                        video_url, used_resolution, lesson_dir,
+                        lambda res: sanitize_filename(
+                            self._video_file_name(lesson_name, video_index, video_title, res)
+                        )
                     )
+                
+                if video_url:
+                    # Define nome e caminho
+                    file_name = self._video_file_name(lesson_name, video_index, video_title, used_resolution)
                     
-                    self.mark_as_downloaded(progress_key)
-                    logger.info(f"✅ Vídeo concluído: {video_title}")
+                    # ✅ PIPELINE: a transferência segue em segundo plano enquanto
+                    # a página já seleciona o próximo vídeo
+                    await self._enqueue_transfer({
+                        'url': video_url,
+                        'file_path': lesson_dir / sanitize_filename(file_name),
+                        'file_name': file_name,
+                        'title': video_title,
+                        'progress_key': progress_key,
+                        'expected_extension': '.mp4',
+                        'expected_size': self.get_known_size(video_url),
+                        'policy_bytes': policy_bytes,
+                        'stream': is_stream,
+                        'resolution': (
+                            used_resolution if used_resolution in self.AVAILABLE_RESOLUTIONS
+                            else self.preferred_resolution
+                        ),
+                        'claim': claimed_key
+                    })
+                    # A reserva agora pertence ao job (liberada ao fim da transferência)
+                    claimed_key = None
                 else:
                     logger.error(f"❌ Não foi possível obter URL para '{video_title}'")
             # ----- FIM BLOCO DOWNLOAD DE VIDEO -----
             
             # ✅ NOVA FUNCIONALIDADE: Baixa materiais extras
             if self.download_extras:
+                extras_started = time.monotonic()
                 await self._download_video_extras(
                     page, video_element, lesson_name, lesson_dir,
-                    aula_id, video_index, video_title
+                    aula_id, video_index, video_title, video_id
                 )
+                self._record_step(page, 'materiais extras', extras_started)
             
             await asyncio.sleep(self.VIDEO_SELECTION_DELAY)
         
         except asyncio.CancelledError:
             logger.warning("⚠ Download cancelado")
-            if file_path and file_path.exists():
-                file_path.unlink()
-                logger.debug(f"✓ Arquivo parcial removido: {file_path.name}")
             raise
         
         except Exception as e:
-            logger.error(f"❌ Falha ao baixar vídeo: {e}")
-            
-            if file_path and file_path.exists():
-                file_path.unlink()
-                logger.debug("✓ Arquivo corrompido removido")
+            self.raise_if_browser_lost(e)
+            logger.error(f"❌ Falha ao processar vídeo: {e}")
+            self.mark_lesson_failed(aula_id)
             
             try:
                 logger.info("🔄 Tentando recuperar recarregando a página...")
@@ -318,6 +1034,100 @@ class VideoProcessor(BaseCourseProcessor):
                 await asyncio.sleep(2)
             except Exception as recovery_error:
                 logger.error(f"❌ Falha na recuperação: {recovery_error}")
+        
+        finally:
+            if claimed_key:
+                self.release_item(claimed_key)
+    
+    async def _get_video_ids(
+        self,
+        aula_element: Locator,
+        aula_id: str,
+        count: int
+    ) -> List[Optional[str]]:
+        """
+        Obtém a identidade estável de cada vídeo da aula pelos links.
+        
+        Se os links não distinguirem os vídeos (ausentes ou repetidos), usa
+        None para todos, mantendo as chaves por título + posição.
+        
+        Args:
+            aula_element: Elemento da aula (já expandida)
+            aula_id: ID da aula
+            count: Número de vídeos encontrados
+        
+        Returns:
+            Lista com a chave de cada vídeo (ou None)
+        """
+        try:
+            hrefs = await aula_element.locator('.ListVideos-items-video a.VideoItem').evaluate_all(
+                'els => els.map(el => el.getAttribute("href"))'
+            )
+        except Exception as e:
+            logger.debug(f"Erro ao ler links dos vídeos: {e}")
+            hrefs = []
+        
+        ids = [video_key(aula_id, href) for href in hrefs]
+        
+        if len(ids) != count or None in ids or len(set(ids)) != len(ids):
+            return [None] * count
+        
+        return ids
+    
+    @staticmethod
+    def _video_file_name(lesson_name: str, video_index: int, video_title: str, resolution: str) -> str:
+        """Nome do arquivo de vídeo (antes de sanitizar)"""
+        return f'{lesson_name} - Vídeo {video_index} {video_title} [{resolution}].mp4'
+    
+    def _existing_video_path(
+        self,
+        progress_key: str,
+        lesson_dir: Path,
+        lesson_name: str,
+        video_index: int,
+        video_title: str
+    ) -> Path:
+        """
+        Caminho atual esperado do vídeo já baixado (a resolução só é conhecida depois).
+        
+        Usa a resolução e a extensão (.mp4 ou .ts de stream) do arquivo registrado
+        no progresso ou a primeira combinação que existir no disco; senão, a
+        resolução preferida.
+        
+        Args:
+            progress_key: Chave do vídeo
+            lesson_dir: Diretório da aula
+            lesson_name: Nome da aula
+            video_index: Índice do vídeo
+            video_title: Título atual do vídeo
+        
+        Returns:
+            Caminho do arquivo com o título atual
+        """
+        resolutions = [self.preferred_resolution] + [
+            r for r in self.AVAILABLE_RESOLUTIONS if r != self.preferred_resolution
+        ]
+        
+        suffixes = ['.mp4', '.ts']
+        
+        info = self.progress_manager.get_info(progress_key)
+        if info and info.get("path"):
+            recorded = Path(info["path"])
+            match = re.search(r'\[(\d+p)\]', recorded.name)
+            if match:
+                resolutions.insert(0, match.group(1))
+            if recorded.suffix.lower() in suffixes:
+                suffixes.insert(0, recorded.suffix.lower())
+        
+        candidates = [
+            (lesson_dir / sanitize_filename(
+                self._video_file_name(lesson_name, video_index, video_title, r)
+            )).with_suffix(suffix)
+            for suffix in suffixes
+            for r in resolutions
+        ]
+        
+        return next((c for c in candidates if c.exists()), candidates[0])
     
     # ✅ NOVO MÉTODO: Baixa materiais complementares (Mapas Mentais e Resumos)
     async def _download_video_extras(
@@ -328,10 +1138,14 @@ class VideoProcessor(BaseCourseProcessor):
         lesson_dir: Path,
         aula_id: str,
         video_index: int,
-        video_title: str
+        video_title: str,
+        video_id: Optional[str] = None
     ) -> None:
         """
-        Baixa materiais complementares do vídeo (Mapas Mentais e Resumos).
+        Baixa materiais complementares do vídeo (Mapas Mentais, Resumos e Slides).
+        
+        Todos os materiais são descobertos numa única chamada à página e
+        enfileirados para download simultâneo no pipeline de transferências.
         
         Args:
             page: Página do Playwright
@@ -341,6 +1155,7 @@ class VideoProcessor(BaseCourseProcessor):
             aula_id: ID da aula
             video_index: Índice do vídeo
             video_title: Título do vídeo
+            video_id: Identidade estável do vídeo (None se não houver link)
         """
         try:
             logger.info(f"📚 Buscando materiais complementares de '{video_title}'...")
@@ -348,298 +1163,156 @@ class VideoProcessor(BaseCourseProcessor):
             # Aguarda página carregar completamente após clicar no vídeo
             await asyncio.sleep(self.MATERIAL_CLICK_DELAY)
             
-            # ✅ Tenta baixar Mapa Mental
-            await self._download_mapa_mental(
-                page, lesson_dir, lesson_name, video_index, video_title, aula_id
-            )
+            extras = await self._discover_extras(page)
             
-            # ✅ Tenta baixar Resumo
-            await self._download_resumo(
-                page, lesson_dir, lesson_name, video_index, video_title, aula_id
-            )
+            if not extras:
+                logger.debug(f"   ℹ️  Sem materiais complementares para '{video_title}'")
+                return
             
-            # ✅ Tenta baixar Slides (se disponível)
-            await self._download_slides(
-                page, lesson_dir, lesson_name, video_index, video_title, aula_id
-            )
+            for extra in extras:
+                await self._queue_extra(
+                    page, extra, lesson_dir, lesson_name,
+                    video_index, video_title, aula_id, video_id
+                )
+        
+        except asyncio.CancelledError:
+            raise
         
         except Exception as e:
             logger.warning(f"⚠ Erro ao baixar materiais complementares: {e}")
+            self.mark_lesson_failed(aula_id)
     
-    async def _download_mapa_mental(
-        self,
-        page: Page,
-        lesson_dir: Path,
-        lesson_name: str,
-        video_index: int,
-        video_title: str,
-        aula_id: str
-    ) -> None:
+    async def _discover_extras(self, page: Page) -> List[dict]:
         """
-        Baixa Mapa Mental se disponível.
+        Descobre, numa única consulta ao DOM, todos os materiais do vídeo selecionado.
         
         Args:
             page: Página do Playwright
-            lesson_dir: Diretório da aula
-            lesson_name: Nome da aula
-            video_index: Índice do vídeo
-            video_title: Título do vídeo
-            aula_id: ID da aula
+        
+        Returns:
+            Lista de dicts com 'kind', 'href' e 'needs_click'
         """
-        try:
-            # Procura botão "Baixar Mapa Mental"
-            mapa_button = page.locator('button:has-text("Baixar Mapa Mental"), a:has-text("Baixar Mapa Mental")')
-            
-            if await mapa_button.count() == 0:
-                logger.debug(f"   ℹ️  Sem mapa mental para '{video_title}'")
-                return
-            
-            # Verifica se já foi baixado
-            progress_key = f'{aula_id}-{video_title}-{video_index}-mapa'
-            if self.is_already_downloaded(progress_key):
-                logger.info(f"   ⏭️  Mapa mental já baixado")
-                return
-            
-            # Obtém URL do mapa
-            mapa_url = await mapa_button.first.get_attribute('href')
-            
-            if not mapa_url:
-                # Se não tem href, pode ser um botão que precisa de click
-                logger.debug("   Tentando clicar no botão de mapa mental...")
-                await mapa_button.first.click()
-                await asyncio.sleep(0.5)
-                
-                # Tenta encontrar link de download que apareceu
-                download_link = page.locator('a[download]').last
-                if await download_link.count() > 0:
-                    mapa_url = await download_link.get_attribute('href')
-            
-            if not mapa_url:
-                logger.debug(f"   ⚠ Não foi possível obter URL do mapa mental")
-                return
-            
-            # Normaliza URL
-            if mapa_url.startswith('/'):
-                mapa_url = "https://www.estrategiaconcursos.com.br" + mapa_url
-            
-            # Define nome do arquivo
-            file_name = f'{lesson_name} - Vídeo {video_index} {video_title} - Mapa Mental.pdf'
-            file_path = lesson_dir / sanitize_filename(file_name)
-            
-            logger.info(f"   ⬇️  Baixando mapa mental...")
-            
-            # ✅ Callback de progresso
-            def progress_callback(current, total, speed):
-                if self.log_queue:
-                    try:
-                        self.log_queue.put_nowait({
-                            "type": "progress",
-                            "file": file_name,
-                            "current": current,
-                            "total": total,
-                            "speed": speed
-                        })
-                    except:
-                        pass
-
-            await self.download_with_rate_limit(
-                download_file,
-                mapa_url,
-                file_path,
-                logger,
-                progress_callback=progress_callback
-            )
-            
-            await verify_download(file_path, logger, expected_extension='.pdf')
-            
-            self.mark_as_downloaded(progress_key)
-            
-            logger.info(f"   ✅ Mapa mental baixado")
+        labels = [[kind, info['label']] for kind, info in self.EXTRA_TYPES.items()]
         
-        except Exception as e:
-            logger.debug(f"   ⚠ Erro ao baixar mapa mental: {e}")
+        return await page.evaluate(
+            """(labels) => {
+                const elements = Array.from(document.querySelectorAll('button, a'));
+                const found = [];
+                for (const [kind, label] of labels) {
+                    const wanted = label.toLowerCase();
+                    const el = elements.find(
+                        e => (e.textContent || '').replace(/\\s+/g, ' ').toLowerCase().includes(wanted)
+                    );
+                    if (!el) continue;
+                    const href = el.tagName === 'A' ? el.getAttribute('href') : null;
+                    found.push({kind: kind, href: href, needs_click: !href});
+                }
+                return found;
+            }""",
+            labels
+        )
     
-    async def _download_resumo(
+    async def _queue_extra(
         self,
         page: Page,
+        extra: dict,
         lesson_dir: Path,
         lesson_name: str,
         video_index: int,
         video_title: str,
-        aula_id: str
+        aula_id: str,
+        video_id: Optional[str] = None
     ) -> None:
         """
-        Baixa Resumo se disponível.
+        Enfileira download de um material complementar já descoberto.
         
         Args:
             page: Página do Playwright
+            extra: Material retornado por _discover_extras()
             lesson_dir: Diretório da aula
             lesson_name: Nome da aula
             video_index: Índice do vídeo
             video_title: Título do vídeo
             aula_id: ID da aula
+            video_id: Identidade estável do vídeo (None se não houver link)
         """
+        kind = extra['kind']
+        info = self.EXTRA_TYPES[kind]
+        
+        # Define nome do arquivo
+        file_name = f'{lesson_name} - Vídeo {video_index} {video_title} - {info["suffix"]}.pdf'
+        file_path = lesson_dir / sanitize_filename(file_name)
+        
+        # Verifica se já foi baixado (renomeado = só move o arquivo)
+        legacy_key = f'{aula_id}-{video_title}-{video_index}-{kind}'
+        progress_key = extra_key(video_id, kind) if video_id else legacy_key
+        self.track_item(aula_id, progress_key)
+        
+        if self.adopt_existing(progress_key, legacy_key, file_path):
+            logger.info(f"   ⏭️  {info['name']} já baixado")
+            return
+        
+        if not self.claim_item(progress_key):
+            logger.debug(f"   {info['name']} em andamento em outra aba")
+            return
+        
         try:
-            # Procura botão "Baixar Resumo"
-            resumo_button = page.locator('button:has-text("Baixar Resumo"), a:has-text("Baixar Resumo")')
-            
-            if await resumo_button.count() == 0:
-                logger.debug(f"   ℹ️  Sem resumo para '{video_title}'")
-                return
-            
-            # Verifica se já foi baixado
-            progress_key = f'{aula_id}-{video_title}-{video_index}-resumo'
-            if self.is_already_downloaded(progress_key):
-                logger.info(f"   ⏭️  Resumo já baixado")
-                return
-            
-            # Obtém URL do resumo
-            resumo_url = await resumo_button.first.get_attribute('href')
-            
-            if not resumo_url:
-                logger.debug("   Tentando clicar no botão de resumo...")
-                await resumo_button.first.click()
-                await asyncio.sleep(0.5)
-                
-                download_link = page.locator('a[download]').last
-                if await download_link.count() > 0:
-                    resumo_url = await download_link.get_attribute('href')
-            
-            if not resumo_url:
-                logger.debug(f"   ⚠ Não foi possível obter URL do resumo")
+            url = extra.get('href')
+            download = None
+            
+            if not url:
+                # Se não tem href, o botão dispara o download ao ser clicado
+                download = await self._capture_click_extra(page, info['label'])
+                if download:
+                    url = download.url
+            
+            if not url:
+                logger.debug(f"   ⚠ Não foi possível obter URL: {info['name']}")
+                self.release_item(progress_key)
                 return
             
             # Normaliza URL
-            if resumo_url.startswith('/'):
-                resumo_url = "https://www.estrategiaconcursos.com.br" + resumo_url
-            
-            # Define nome do arquivo
-            file_name = f'{lesson_name} - Vídeo {video_index} {video_title} - Resumo.pdf'
-            file_path = lesson_dir / sanitize_filename(file_name)
-            
-            logger.info(f"   ⬇️  Baixando resumo...")
-            
-            # ✅ Callback de progresso
-            def progress_callback(current, total, speed):
-                if self.log_queue:
-                    try:
-                        self.log_queue.put_nowait({
-                            "type": "progress",
-                            "file": file_name,
-                            "current": current,
-                            "total": total,
-                            "speed": speed
-                        })
-                    except:
-                        pass
-
-            await self.download_with_rate_limit(
-                download_file,
-                resumo_url,
-                file_path,
-                logger,
-                progress_callback=progress_callback
-            )
-            
-            await verify_download(file_path, logger, expected_extension='.pdf')
-            
-            self.mark_as_downloaded(progress_key)
-            
-            logger.info(f"   ✅ Resumo baixado")
+            if url.startswith('/'):
+                url = "https://www.estrategiaconcursos.com.br" + url
+            
+            await self._enqueue_transfer({
+                'url': url,
+                'download': download,  # Já em andamento no navegador (clique)
+                'file_path': file_path,
+                'file_name': file_name,
+                'title': info['name'],
+                'progress_key': progress_key,
+                'expected_extension': '.pdf',
+                'claim': progress_key
+            })
         
-        except Exception as e:
-            logger.debug(f"   ⚠ Erro ao baixar resumo: {e}")
+        except Exception:
+            self.release_item(progress_key)
+            raise
     
-    async def _download_slides(
-        self,
-        page: Page,
-        lesson_dir: Path,
-        lesson_name: str,
-        video_index: int,
-        video_title: str,
-        aula_id: str
-    ) -> None:
+    async def _capture_click_extra(self, page: Page, label: str) -> Optional[Download]:
         """
-        Baixa Slides se disponível.
+        Clica num botão de material sem href e captura o download que ele dispara.
+        
+        Usa o evento de download do Playwright em vez de procurar 'a[download]'
+        na página, o que evitaria pegar o arquivo de um vídeo anterior.
         
         Args:
             page: Página do Playwright
-            lesson_dir: Diretório da aula
-            lesson_name: Nome da aula
-            video_index: Índice do vídeo
-            video_title: Título do vídeo
-            aula_id: ID da aula
+            label: Texto do botão
+        
+        Returns:
+            Download iniciado pelo clique ou None se nada foi disparado
         """
+        button = page.locator(f'button:has-text("{label}"), a:has-text("{label}")').first
+        
         try:
-            # Procura botão "Baixar Slides"
-            slides_button = page.locator('button:has-text("Baixar Slides"), a:has-text("Baixar Slides")')
-            
-            if await slides_button.count() == 0:
-                logger.debug(f"   ℹ️  Sem slides para '{video_title}'")
-                return
-            
-            # Verifica se já foi baixado
-            progress_key = f'{aula_id}-{video_title}-{video_index}-slides'
-            if self.is_already_downloaded(progress_key):
-                logger.info(f"   ⏭️  Slides já baixados")
-                return
-            
-            # Obtém URL dos slides
-            slides_url = await slides_button.first.get_attribute('href')
-            
-            if not slides_url:
-                logger.debug("   Tentando clicar no botão de slides...")
-                await slides_button.first.click()
-                await asyncio.sleep(0.5)
-                
-                download_link = page.locator('a[download]').last
-                if await download_link.count() > 0:
-                    slides_url = await download_link.get_attribute('href')
-            
-            if not slides_url:
-                logger.debug(f"   ⚠ Não foi possível obter URL dos slides")
-                return
-            
-            # Normaliza URL
-            if slides_url.startswith('/'):
-                slides_url = "https://www.estrategiaconcursos.com.br" + slides_url
-            
-            # Define nome do arquivo
-            file_name = f'{lesson_name} - Vídeo {video_index} {video_title} - Slides.pdf'
-            file_path = lesson_dir / sanitize_filename(file_name)
-            
-            logger.info(f"   ⬇️  Baixando slides...")
-            
-            # ✅ Callback de progresso
-            def progress_callback(current, total, speed):
-                if self.log_queue:
-                    try:
-                        self.log_queue.put_nowait({
-                            "type": "progress",
-                            "file": file_name,
-                            "current": current,
-                            "total": total,
-                            "speed": speed
-                        })
-                    except:
-                        pass
-
-            await self.download_with_rate_limit(
-                download_file,
-                slides_url,
-                file_path,
-                logger,
-                progress_callback=progress_callback
-            )
-            
-            await verify_download(file_path, logger, expected_extension='.pdf')
-            
-            self.mark_as_downloaded(progress_key)
-            
-            logger.info(f"   ✅ Slides baixados")
+            async with page.expect_download(timeout=self.MATERIAL_DOWNLOAD_WAIT) as download_info:
+                await button.click()
+            return await download_info.value
         
-        except Exception as e:
-            logger.debug(f"   ⚠ Erro ao baixar slides: {e}")
+        except PlaywrightTimeoutError:
+            return None
     
     async def _get_video_url_by_resolution(self, page: Page) -> dict:
         """
@@ -736,9 +1409,173 @@ class VideoProcessor(BaseCourseProcessor):
             except:
                 return {'url': None, 'resolution': 'erro'}
     
+    @staticmethod
+    def _url_pattern(path: str) -> str:
+        """
+        Reduz o caminho de uma URL de vídeo ao padrão comum às aulas do curso.
+        
+        Trechos com dígitos (ids de aula/vídeo, hashes) viram '*'; a pasta da
+        resolução e a extensão do arquivo são mantidas.
+        
+        Args:
+            path: Caminho da URL (ex: '/videos/123/720/abc9.mp4')
+        
+        Returns:
+            Padrão do caminho (ex: '/videos/*/720/*.mp4')
+        """
+        segments = path.split('/')
+        for i, segment in enumerate(segments):
+            if segment in ('720', '480', '360') or not re.search(r"\d", segment):
+                continue
+            suffix = Path(segment).suffix if i == len(segments) - 1 else ''
+            segments[i] = '*' + suffix
+        return '/'.join(segments)
+    
+    async def _probe_cached(
+        self,
+        url: str,
+        label: str,
+        need_size: bool = True
+    ) -> Optional[Tuple[bool, Optional[int]]]:
+        """
+        Verifica uma URL (HEAD/Range) com cache por curso e padrão do caminho.
+        
+        Uma resposta válida vale para todas as aulas com o mesmo padrão; uma
+        inválida e o tamanho são de cada vídeo, então só valem para o mesmo caminho.
+        
+        Args:
+            url: URL do vídeo
+            label: Descrição para o log (ex: '720p')
+            need_size: Se False, basta a validade em cache (sem tamanho)
+        
+        Returns:
+            Tupla (válida, tamanho) ou None se a verificação falhou
+        """
+        path = urlparse(url).path
+        course = self.course_id or ''
+        cache_key = (course, self._url_pattern(path))
+        
+        if path in self.known_sizes:
+            return True, self.known_sizes[path]
+        
+        if (course, path) in self._probe_failures:
+            logger.debug(f"Verificação de {label} reaproveitada do cache")
+            return False, None
+        
+        if cache_key in self._probe_cache and not need_size:
+            logger.debug(f"Verificação de {label} reaproveitada do cache")
+            return True, None
+        
+        try:
+            session = await self.get_http_session()
+            is_valid, size = await probe_url(session, url)
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"⚠ Não foi possível validar {label}: {e}")
+            return None
+        
+        except Exception as e:
+            logger.debug(f"Erro ao verificar {label}: {e}")
+            return None
+        
+        if is_valid:
+            self._probe_cache.add(cache_key)
+        else:
+            self._probe_failures.add((course, path))
+        
+        if is_valid and size:
+            self.known_sizes[path] = size
+        
+        return is_valid, size
+    
+    async def _auto_resolution(self, url: str, resolution: str) -> Tuple[str, str, int]:
+        """
+        Escolhe, pela política automática, a resolução deste vídeo.
+        
+        Sonda (HEAD/Range, em cache) o tamanho da resolução obtida no player e
+        das menores, e deixa a política decidir.
+        
+        Args:
+            url: URL do vídeo na resolução selecionada no player
+            resolution: Resolução selecionada no player
+        
+        Returns:
+            Tupla (url, resolução, bytes previstos); sem tamanhos, mantém a original
+        """
+        if resolution not in self.AVAILABLE_RESOLUTIONS:
+            return url, resolution, 0
+        
+        urls: Dict[str, str] = {}
+        sizes: Dict[str, int] = {}
+        
+        for candidate in self.AVAILABLE_RESOLUTIONS[self.AVAILABLE_RESOLUTIONS.index(resolution):]:
+            candidate_url = url if candidate == resolution else re.sub(
+                r"/(720|480|360)/", f"/{candidate[:-1]}/", url
+            )
+            if candidate != resolution and candidate_url == url:
+                continue
+            
+            probe = await self._probe_cached(candidate_url, candidate)
+            if probe is not None and probe[0] and probe[1]:
+                urls[candidate] = candidate_url
+                sizes[candidate] = probe[1]
+        
+        if not sizes:
+            return url, resolution, 0
+        
+        chosen = self.resolution_policy.choose(sizes)
+        return urls[chosen], chosen, sizes[chosen]
+    
+    async def _fit_resolution(
+        self,
+        url: str,
+        resolution: str,
+        lesson_dir: Path,
+        file_name: Callable[[str], str]
+    ) -> Tuple[str, str]:
+        """
+        Troca por uma resolução menor se o vídeo não couber no disco/orçamento do curso.
+        
+        Args:
+            url: URL do vídeo na resolução escolhida
+            resolution: Resolução escolhida
+            lesson_dir: Diretório da aula
+            file_name: Nome do arquivo para uma resolução
+        
+        Returns:
+            Tupla (url, resolução) a baixar
+        """
+        size = self.get_known_size(url)
+        if size is None:
+            probe = await self._probe_cached(url, resolution)
+            size = probe[1] if probe else None
+        
+        if self.disk_admission.fits(self.course_id, lesson_dir / file_name(resolution), size):
+            return url, resolution
+        
+        if not self.reduce_resolution or resolution not in self.AVAILABLE_RESOLUTIONS:
+            return url, resolution
+        
+        lower = self.AVAILABLE_RESOLUTIONS[self.AVAILABLE_RESOLUTIONS.index(resolution) + 1:]
+        for candidate in lower:
+            candidate_url = re.sub(r"/(720|480|360)/", f"/{candidate[:-1]}/", url)
+            if candidate_url == url:
+                continue
+            
+            probe = await self._probe_cached(candidate_url, candidate)
+            if probe is None or not probe[0]:
+                continue
+            
+            if self.disk_admission.fits(self.course_id, lesson_dir / file_name(candidate), probe[1]):
+                logger.info(f"📉 Pouco espaço/orçamento: baixando em {candidate} em vez de {resolution}")
+                return candidate_url, candidate
+        
+        return url, resolution
+    
     async def _force_resolution(self, url: str, resolution: str) -> str:
         """
         Tenta forçar uma resolução modificando a URL.
+        A validação usa HEAD/Range (sem baixar o vídeo) e fica em cache por curso.
         
         Args:
             url: URL original
@@ -748,24 +1585,10 @@ class VideoProcessor(BaseCourseProcessor):
             URL forçada se válida, None caso contrário
         """
         forced_url = re.sub(r"/(360|480)/", f"/{resolution}/", url)
+        probe = await self._probe_cached(forced_url, f"{resolution}p", need_size=False)
         
-        try:
-            timeout_config = aiohttp.ClientTimeout(total=10, connect=5)
-            connector = aiohttp.TCPConnector(limit_per_host=2)
-            
-            async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout_config
-            ) as session:
-                async with session.get(forced_url) as resp:
-                    if resp.status == 200:
-                        logger.info(f"✓ Forçado para {resolution}p com sucesso")
-                        return forced_url
-        
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.warning(f"⚠ Não foi possível validar {resolution}p: {e}")
-        
-        except Exception as e:
-            logger.debug(f"Erro ao forçar resolução: {e}")
+        if probe is None or not probe[0]:
+            return None
         
-        return None
+        logger.info(f"✓ Forçado para {resolution}p com sucesso")
+        return forced_url